@@ -9,12 +9,13 @@ class BuildLoop:
         self.running = False
         self.iteration = 0
         self.researcher = ResearchAgent()
+        self._task = None
 
     async def run_approach(self, approach_description, iteration):
         print(f"Build iteration {iteration} started for approach: {approach_description}")
 
         # Call researcher before build
-        research_results = self.researcher.research_before_build(approach_description)
+        research_results = await self.researcher.research_before_build(approach_description)
         print(f"Research results for approach {iteration}: {research_results}")
 
         # 1. Build the feature
@@ -74,6 +75,19 @@ class BuildLoop:
 
     async def run(self, depth=0):
         self.running = True
+        self._task = asyncio.current_task()
+        try:
+            await self._loop(depth)
+        except asyncio.CancelledError:
+            # Swallow only the cancellation requested by stop()
+            if self.running:
+                raise
+            print("Build loop cancelled.")
+        finally:
+            self.running = False
+            self._task = None
+
+    async def _loop(self, depth):
         while self.running:
             self.iteration += 1
             print(f"Planning build iteration {self.iteration}...")
@@ -104,5 +118,8 @@ class BuildLoop:
 
     def stop(self):
         self.running = False
+        # Cancel in-flight orchestrator runs instead of waiting for the iteration to end
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
 
 build_loop = BuildLoop()
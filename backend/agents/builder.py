@@ -1,10 +1,12 @@
 """Builder agent - writes and updates Python and JS/TS files."""
 from typing import Dict, Any
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from ..core import get_llm, state_manager, BuildStep, SystemCapability
-from ..tools import BASE_TOOLS
+from ..core.lazy import Lazy
+from ..core.metrics import metrics_scope
+from ..core.tasks import with_deadline, DeadlineExceeded
+from ..tools import BASE_TOOLS, prepare_tools
 import uuid
+import asyncio
 import os
 
 
@@ -64,12 +66,15 @@ class BuilderAgent:
     
     def __init__(self):
         self.llm = get_llm(temperature=0.1)  # Slightly higher for code generation
-        self.tools = BASE_TOOLS
+        self.tools = prepare_tools(BASE_TOOLS)
         self.agent_executor = None
         self._initialize_agent()
     
     def _initialize_agent(self):
         """Initialize the LangChain agent with tools."""
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", BUILDER_PROMPT),
             MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -166,10 +171,11 @@ class BuilderAgent:
         
         try:
             # Run agent
-            result = await self.agent_executor.ainvoke({
-                "input": task,
-                **full_context
-            })
+            with metrics_scope("builder", step_id):
+                result = await with_deadline(self.agent_executor.ainvoke({
+                    "input": task,
+                    **full_context
+                }))
             
             # Update step
             await state_manager.update_build_step(
@@ -180,6 +186,22 @@ class BuilderAgent:
             
             return result
         
+        except asyncio.CancelledError:
+            await state_manager.update_build_step(
+                step_id,
+                status="cancelled",
+                error="Task was cancelled"
+            )
+            raise
+
+        except DeadlineExceeded as e:
+            await state_manager.update_build_step(
+                step_id,
+                status="timed_out",
+                error=str(e)
+            )
+            raise
+
         except Exception as e:
             await state_manager.update_build_step(
                 step_id,
@@ -190,4 +212,4 @@ class BuilderAgent:
 
 
 # Global builder instance
-builder = BuilderAgent()
+builder: BuilderAgent = Lazy(BuilderAgent)
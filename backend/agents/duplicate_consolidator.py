@@ -1,21 +1,44 @@
 """DuplicateConsolidator agent - detects and consolidates duplicate implementations."""
-import os
 import difflib
 import asyncio
-from typing import List, Dict, Any, Tuple
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from ..core import get_llm, state_manager, BuildStep
-from ..tools import BASE_TOOLS
+import os
+import re
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+from ..core import get_llm, settings, state_manager, BuildStep
+from ..core.ast_fingerprint import definition_index, extract_definitions, find_duplicate_definitions
+from ..core.content_cache import content_cache
+from ..core.lazy import Lazy
+from ..core.metrics import metrics_scope
+from ..core.minhash import MinHashLSH
+from ..tools import BASE_TOOLS, prepare_tools
 import uuid
 
 
+# Confirmed line-level similarity above which the less complete of two
+# versions of one file (module.py, module_v2.py) is removed
+SIMILARITY_THRESHOLD = 0.7
+
+# Files with different names are never removed automatically, since their
+# importers would break. At this similarity, and defining exactly the same
+# functions and classes, they are reported as renamed copies for the agent
+# to merge; distinct agent modules built from one template score up to ~0.7
+COPY_SIMILARITY_THRESHOLD = 0.95
+
+# Suffixes marking another version of the same file
+_VERSION_SUFFIX = re.compile(r"([_\-.](v?\d+|copy|new|old|backup|bak))+$", re.IGNORECASE)
+
+# Most similar pairs reported, with a similarity matrix of their files
+TOP_K_PAIRS = 10
+
+
 DUPLICATE_CONSOLIDATOR_PROMPT = """You are the DuplicateConsolidator agent for a self-building LangChain system.
 
 Your responsibility is to detect and consolidate duplicate implementations in the codebase.
 
 Tasks:
-1. Identify files with similar names, signatures, or purposes.
+1. Identify files with near-identical content (renamed or lightly edited copies), signatures, or purposes,
+   and functions or classes duplicated within or across files.
 2. Analyze which implementation is more complete.
 3. Consolidate automatically by merging or replacing duplicates.
 
@@ -38,12 +61,15 @@ class DuplicateConsolidatorAgent:
 
     def __init__(self):
         self.llm = get_llm(temperature=0.1)
-        self.tools = BASE_TOOLS
+        self.tools = prepare_tools(BASE_TOOLS)
         self.agent_executor = None
         self._initialize_agent()
 
     def _initialize_agent(self):
         """Initialize the LangChain agent with tools."""
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", DUPLICATE_CONSOLIDATOR_PROMPT),
             MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -61,36 +87,88 @@ class DuplicateConsolidatorAgent:
         )
 
     async def _read_file_content(self, file_path: str) -> str:
-        """Read file content asynchronously."""
-        read_tool = next((t for t in self.tools if t.name == "read_file"), None)
-        if not read_tool:
-            raise RuntimeError("read_file tool not found")
-        content = await read_tool.arun(file_path=file_path)
-        return content
-
-    async def _list_similar_files(self, files: List[str]) -> List[Tuple[str, str]]:
-        """Identify pairs of files with similar names or purposes."""
-        similar_pairs = []
-        # Simple heuristic: files with same base name ignoring suffixes or extensions
-        base_names = {}
-        for f in files:
-            base = os.path.splitext(os.path.basename(f))[0]
-            # Normalize base by removing trailing digits or common suffixes
-            base_norm = base.rstrip('0123456789_').lower()
-            if base_norm in base_names:
-                similar_pairs.append((base_names[base_norm], f))
-            else:
-                base_names[base_norm] = f
-        return similar_pairs
-
-    async def _compare_files(self, file1: str, file2: str) -> Dict[str, Any]:
+        """Read file content asynchronously (straight from disk, not through the tool layer)."""
+        content = await content_cache.read(settings.project_root / file_path)
+        return content.decode("utf-8")
+
+    async def _load_files(self, files: List[str]) -> Dict[str, str]:
+        """Contents of the readable text files among files."""
+        contents = {}
+        for file_path in dict.fromkeys(files):
+            try:
+                contents[file_path] = await self._read_file_content(file_path)
+            except (OSError, UnicodeDecodeError):
+                continue  # deleted, or not a text file
+        return contents
+
+    @staticmethod
+    def _same_base(file1: str, file2: str) -> bool:
+        """Whether two files are versions of one file, like pkg/module.py and pkg/module_v2.py."""
+        if os.path.dirname(file1) != os.path.dirname(file2):
+            return False  # pkg_a/__init__.py and pkg_b/__init__.py are different modules
+        (base1, ext1), (base2, ext2) = (os.path.splitext(os.path.basename(f)) for f in (file1, file2))
+        return ext1 == ext2 and _VERSION_SUFFIX.sub("", base1).lower() == _VERSION_SUFFIX.sub("", base2).lower()
+
+    @staticmethod
+    def _same_definitions(content1: str, content2: str) -> bool:
+        """Whether two Python sources define structurally identical functions and classes."""
+        try:
+            defs1, defs2 = (Counter(d.fingerprint for d in extract_definitions(c)) for c in (content1, content2))
+        except (SyntaxError, ValueError):
+            return False
+        return bool(defs1) and defs1 == defs2
+
+    def _is_duplicate(self, file1: str, file2: str, similarity: float) -> bool:
+        """Whether a confirmed pair is safe to consolidate automatically.
+
+        Only versions of one file in one directory are: removing one of
+        them leaves the module its importers name in place. Other pairs are
+        only reported as candidates.
+        """
+        return self._same_base(file1, file2) and similarity > SIMILARITY_THRESHOLD
+
+    def _is_renamed_copy(self, file1: str, file2: str, content1: str, content2: str, similarity: float) -> bool:
+        """Whether two differently named Python files are one module twice."""
+        return (
+            similarity >= COPY_SIMILARITY_THRESHOLD
+            and file1.endswith(".py") and file2.endswith(".py")
+            and self._same_definitions(content1, content2)
+        )
+
+    @staticmethod
+    def _index_files(contents: Dict[str, str]) -> MinHashLSH:
+        lsh = MinHashLSH()
+        for file_path, content in contents.items():
+            lsh.add(file_path, content)
+        return lsh
+
+    async def _list_similar_files(self, files: List[str], contents: Optional[Dict[str, str]] = None) -> List[Tuple[str, str]]:
+        """Identify candidate pairs of near-duplicate files, most similar first.
+
+        Every file is MinHashed and LSH-bucketed, so candidates are found
+        in near-linear time whatever the files are called.
+        """
+        if contents is None:
+            contents = await self._load_files(files)
+        lsh = await asyncio.to_thread(self._index_files, contents)
+        return [(file1, file2) for file1, file2, _ in lsh.candidates()]
+
+    async def _compare_files(
+        self,
+        file1: str,
+        file2: str,
+        content1: Optional[str] = None,
+        content2: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """Compare two files and analyze which is more complete."""
-        content1 = await self._read_file_content(file1)
-        content2 = await self._read_file_content(file2)
+        if content1 is None:
+            content1 = await self._read_file_content(file1)
+        if content2 is None:
+            content2 = await self._read_file_content(file2)
 
-        # Use difflib to get similarity ratio
-        seq = difflib.SequenceMatcher(None, content1, content2)
-        similarity = seq.ratio()
+        # Exact line diff to confirm a candidate; lines keep it fast on big files
+        seq = difflib.SequenceMatcher(None, content1.splitlines(), content2.splitlines(), autojunk=False)
+        similarity = await asyncio.to_thread(seq.ratio)
 
         # Heuristic for completeness: file with more lines and more functions/classes
         lines1 = content1.count('\n')
@@ -116,6 +194,15 @@ class DuplicateConsolidatorAgent:
             "content2": content2
         }
 
+    async def report_duplicate_definitions(self, directory: str = "") -> Dict[str, Any]:
+        """Report structurally identical functions and classes across the repository.
+
+        Args:
+            directory: Only scan Python files under this directory, relative to the project root
+        """
+        report = await definition_index.scan(directory)
+        return report.to_dict()
+
     async def _consolidate_files(self, file_keep: str, file_remove: str) -> str:
         """Consolidate by removing the less complete file and updating state."""
         # Remove the file_remove
@@ -125,38 +212,65 @@ class DuplicateConsolidatorAgent:
 
         # Remove file by writing empty content or deleting
         # Here we delete by writing empty content and removing from generated files
-        await write_tool.arun(file_path=file_remove, content="")
+        await write_tool.ainvoke({"file_path": file_remove, "content": ""})
 
         # Update state to remove file_remove from generated_files
         state = await state_manager.get_state()
         if file_remove in state.generated_files:
             state.generated_files.remove(file_remove)
-            await state_manager.save_state(state)
+            await state_manager.save()
 
         return f"Removed duplicate file {file_remove}, kept {file_keep}."
 
     async def detect_and_consolidate(self) -> Dict[str, Any]:
         """Detect duplicates and consolidate them."""
         state = await state_manager.get_state()
-        generated_files = state.generated_files
+        contents = await self._load_files(list(state.generated_files))
 
-        # Identify similar files
-        similar_pairs = await self._list_similar_files(generated_files)
+        # Candidate pairs from MinHash/LSH, confirmed by an exact diff; only
+        # versions of one file in one directory are consolidated
+        lsh = await asyncio.to_thread(self._index_files, contents)
+        candidates = lsh.candidates()
 
         consolidation_results = []
-
-        for file1, file2 in similar_pairs:
-            comparison = await self._compare_files(file1, file2)
-            if comparison["similarity"] > 0.7:  # threshold for similarity
+        pairs = []
+        removed = set()
+
+        for file1, file2, estimate in candidates:
+            if file1 in removed or file2 in removed:
+                continue
+            comparison = await self._compare_files(file1, file2, contents[file1], contents[file2])
+            similarity = comparison["similarity"]
+            duplicate = self._is_duplicate(file1, file2, similarity)
+            pairs.append({
+                "file1": file1,
+                "file2": file2,
+                "estimated_similarity": round(estimate, 3),
+                "similarity": round(similarity, 3),
+                "consolidated": duplicate,
+                # Left for the agent to merge, rewriting the importers of the removed module
+                "renamed_copy": not duplicate and self._is_renamed_copy(file1, file2, contents[file1], contents[file2], similarity),
+            })
+            if duplicate:
                 # Consolidate by keeping more complete
-                result = await self._consolidate_files(
-                    comparison["more_complete"],
-                    file2 if comparison["more_complete"] == file1 else file1
-                )
+                file_remove = file2 if comparison["more_complete"] == file1 else file1
+                result = await self._consolidate_files(comparison["more_complete"], file_remove)
                 consolidation_results.append(result)
+                removed.add(file_remove)
+
+        # Duplicated helpers inside the files that remain
+        sources = [(path, content) for path, content in contents.items() if path.endswith(".py") and path not in removed]
+        definitions = await asyncio.to_thread(find_duplicate_definitions, sources)
 
+        top_pairs = sorted(pairs, key=lambda pair: -pair["similarity"])[:TOP_K_PAIRS]
+        top_files = [f for pair in top_pairs for f in (pair["file1"], pair["file2"])]
         return {
-            "duplicates_found": len(similar_pairs),
+            "duplicates_found": len(removed),
+            "candidates": len(candidates),
+            "files_scanned": len(contents),
+            "top_pairs": top_pairs,
+            "similarity_matrix": lsh.matrix(top_files),
+            "duplicate_definitions": definitions.to_dict(),
             "consolidation_results": consolidation_results
         }
 
@@ -173,13 +287,21 @@ class DuplicateConsolidatorAgent:
         await state_manager.add_build_step(step)
 
         try:
-            result = await self.detect_and_consolidate()
+            with metrics_scope("duplicate_consolidator", step_id):
+                result = await self.detect_and_consolidate()
             await state_manager.update_build_step(
                 step_id,
                 status="completed",
                 result=str(result)
             )
             return result
+        except asyncio.CancelledError:
+            await state_manager.update_build_step(
+                step_id,
+                status="cancelled",
+                error="Task was cancelled"
+            )
+            raise
         except Exception as e:
             await state_manager.update_build_step(
                 step_id,
@@ -190,4 +312,4 @@ class DuplicateConsolidatorAgent:
 
 
 # Global duplicate consolidator instance
-duplicate_consolidator = DuplicateConsolidatorAgent()
+duplicate_consolidator: DuplicateConsolidatorAgent = Lazy(DuplicateConsolidatorAgent)
@@ -1,11 +1,12 @@
 """Orchestrator agent - the core agent responsible for planning and coordination."""
 from typing import List, Dict, Any, AsyncIterator, Optional
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
-from ..core import get_llm, state_manager, BuildStep, SystemCapability
-from ..tools import BASE_TOOLS
-from .researcher import ResearchAgent
+from ..core import get_llm, state_manager, BuildStep, SystemCapability, TaskCheckpoint, vocabulary_index
+from ..core.lazy import Lazy
+from ..core.metrics import metrics_scope
+from ..core.tasks import with_deadline, deadline_scope, check_deadline, remaining_time, DeadlineExceeded
+from ..tools import BASE_TOOLS, prepare_tools
+from .researcher import ResearchAgent, ResearchSession
 from .planner import PlannerAgent, planner
 import uuid
 import re
@@ -29,11 +30,13 @@ Current system state:
 - Capabilities: {capabilities}
 
 You have access to tools for:
+- Searching code (search_code finds definitions and usages in one call)
+- Recalling documentation and past build results by meaning (semantic_search)
 - Reading and writing files
 - Listing directories
 - Validating Python syntax
 - Running commands
-- Checking system state
+- Checking system state (query_state: start with the summary, then filter and page)
 
 When analyzing the system:
 1. Check what files exist
@@ -60,7 +63,7 @@ class OrchestratorAgent:
     
     def __init__(self):
         self.llm = get_llm()
-        self.tools = BASE_TOOLS
+        self.tools = prepare_tools(BASE_TOOLS)
         self.agent_executor = None
         self.research_agent = ResearchAgent()
         self.planner_agent = planner
@@ -70,6 +73,9 @@ class OrchestratorAgent:
 
     def _initialize_agent(self):
         """Initialize the LangChain agent with tools."""
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", ORCHESTRATOR_PROMPT),
             MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -88,31 +94,27 @@ class OrchestratorAgent:
 
     def _detect_unfamiliar_apis(self, text: str) -> List[str]:
         """Detect unfamiliar APIs or libraries mentioned in the text.
-        For demonstration, we check for known libraries and return those not recognized.
+
+        Only API-shaped identifiers (dotted, snake_case, camelCase, scoped
+        packages or names given as packages/imports) that are absent from the
+        project vocabulary are returned.
         """
-        known_libs = set(self.research_agent.DOC_SITES.keys())
-        # Simple regex to find words that look like library names (alphanumeric and dots)
-        candidates = set(re.findall(r"\b[a-zA-Z0-9_.]+\b", text.lower()))
-        # Filter candidates to those that look like known libs or common libs
-        # For demo, consider any candidate not in known_libs as unfamiliar
-        unfamiliar = [lib for lib in candidates if lib not in known_libs and len(lib) > 2]
+        known_libs = self.research_agent.DOC_SITES.keys()
         # Limit to a few
-        return unfamiliar[:3]
+        return vocabulary_index.detect_unknown(text, extra_known=known_libs, limit=3)
 
-    async def _research_apis(self, apis: List[str]) -> Dict[str, List[str]]:
-        """Use ResearchAgent to fetch documentation snippets for given APIs."""
+    async def _research_apis(self, apis: List[str], session: ResearchSession) -> Dict[str, List[str]]:
+        """Use ResearchAgent to fetch documentation snippets for given APIs.
+
+        All supported doc sites are scanned once for every API together,
+        within the session's deadline; pages parsed by earlier phases are
+        reused. Each API gets the best-ranked snippets that mention it.
+        """
+        timeout = min(session.timeout, max(remaining_time(), 0))
+        found = await session.retrieve(apis, top_k=4 * len(apis), timeout=timeout)
         results = {}
         for api in apis:
-            # For demo, try to search in all supported docs
-            snippets = []
-            for lib in self.research_agent.DOC_SITES.keys():
-                try:
-                    found = self.research_agent.search(lib, api, max_results=2)
-                    if found:
-                        snippets.extend([f"[{lib}] {s}" for s in found])
-                except Exception:
-                    continue
-            results[api] = snippets
+            results[api] = [f"[{s.library}] {s.text}" for s in found if api.lower() in s.terms][:2]
         return results
 
     def _is_complex_prompt(self, prompt: str) -> bool:
@@ -132,17 +134,61 @@ class OrchestratorAgent:
             return True
         return False
 
-    async def run(self, task: str, context: Optional[Dict[str, Any]] = None, depth: int = 0) -> Dict[str, Any]:
+    async def _plan_phases(self, task: str) -> List[str]:
+        """Use PlannerAgent to decompose a complex task into phases."""
+        plan_result = await self.planner_agent.plan(task)
+        plan_output = plan_result.get("output", "")
+
+        # Parse plan output to extract phases (planner uses "Description: ..." format)
+        phases = re.findall(r"Description:\s*(.+)", plan_output)
+        if not phases:
+            # Fallback: try numbered list format "1. ..."
+            phases = re.findall(r"\d+\.\s*(.+)", plan_output)
+        return phases
+
+    async def run(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        depth: int = 0,
+        research_session: Optional[ResearchSession] = None,
+    ) -> Dict[str, Any]:
         """Run the orchestrator with a specific task.
         
         Args:
             task: The task description
             context: Additional context for the agent
             depth: Recursion depth counter to prevent infinite recursion
+            research_session: Research session shared by the phases of a
+                decomposed task; created (and closed) here when omitted
         
         Returns:
             Agent execution result
+
+        Decomposed tasks are checkpointed after every phase; running the same
+        task again (or calling resume()) continues from the first unfinished
+        phase. The whole run, including every phase, is bounded by
+        settings.task_timeout_seconds (or a shorter enclosing deadline).
         """
+        if research_session is not None:
+            return await self._run(task, context, depth, research_session)
+
+        from ..core import settings
+        research_session = self.research_agent.new_session()
+        try:
+            with deadline_scope(settings.task_timeout_seconds):
+                return await self._run(task, context, depth, research_session)
+        finally:
+            await research_session.aclose()
+
+    async def _run(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]],
+        depth: int,
+        research_session: ResearchSession,
+    ) -> Dict[str, Any]:
+        """Body of run() with the research session resolved."""
         # Limit recursion depth to 2
         if depth > 2:
             return {"output": "Max recursion depth reached, stopping further decomposition."}
@@ -183,33 +229,45 @@ class OrchestratorAgent:
         # Detect unfamiliar APIs in the task
         unfamiliar_apis = self._detect_unfamiliar_apis(task)
         if unfamiliar_apis:
-            research_results = await self._research_apis(unfamiliar_apis)
+            research_results = await self._research_apis(unfamiliar_apis, research_session)
             # Add research results to context
             full_context["research_results"] = research_results
 
         # Detect if task is complex
         if self._is_complex_prompt(task):
-            # Use PlannerAgent to decompose into phases
-            plan_result = await self.planner_agent.plan(task)
-            plan_output = plan_result.get("output", "")
-
-            # Parse plan output to extract phases (planner uses "Description: ..." format)
-            phases = re.findall(r"Description:\s*(.+)", plan_output)
-            if not phases:
-                # Fallback: try numbered list format "1. ..."
-                phases = re.findall(r"\d+\.\s*(.+)", plan_output)
-
-            aggregated_results = []
-            for phase in phases:
+            # Continue from the last completed phase if an earlier run was interrupted
+            checkpoint = await state_manager.get_checkpoint(task_hash)
+            if checkpoint is None:
+                checkpoint = TaskCheckpoint(
+                    task_hash=task_hash,
+                    task=task,
+                    phases=await self._plan_phases(task),
+                    depth=depth,
+                    context=context or {},
+                )
+                await state_manager.save_checkpoint(checkpoint)
+            phases = checkpoint.phases
+
+            for phase in phases[checkpoint.next_phase:]:
+                # Stop between phases once the task deadline has passed
+                check_deadline()
                 # Execute each phase sequentially, incrementing depth
-                phase_result = await self.run(phase, context=full_context, depth=depth+1)
-                aggregated_results.append({"phase": phase, "result": phase_result})
+                phase_result = await self.run(
+                    phase,
+                    context=full_context,
+                    depth=depth+1,
+                    research_session=research_session,
+                )
+                # Checkpoint each finished phase so a restart does not repeat it
+                checkpoint.results.append({"phase": phase, "output": str(phase_result.get("output", ""))})
+                await state_manager.save_checkpoint(checkpoint)
 
             # Aggregate results into a summary
-            summary = "\n".join([f"Phase: {r['phase']}\nResult: {r['result'].get('output', '')}" for r in aggregated_results])
+            summary = "\n".join([f"Phase: {r['phase']}\nResult: {r['output']}" for r in checkpoint.results])
 
             # Cache the aggregated summary
             await state_manager.add_cached_result(task_hash, summary)
+            await state_manager.clear_checkpoint(task_hash)
 
             return {"output": summary, "phases_executed": len(phases)}
 
@@ -225,10 +283,11 @@ class OrchestratorAgent:
         
         try:
             # Run agent
-            result = await self.agent_executor.ainvoke({
-                "input": task,
-                **full_context
-            })
+            with metrics_scope("orchestrator", step_id):
+                result = await with_deadline(self.agent_executor.ainvoke({
+                    "input": task,
+                    **full_context
+                }))
             
             output_str = str(result.get("output", ""))
 
@@ -246,6 +305,22 @@ class OrchestratorAgent:
             
             return result
         
+        except asyncio.CancelledError:
+            await state_manager.update_build_step(
+                step_id,
+                status="cancelled",
+                error="Task was cancelled"
+            )
+            raise
+
+        except DeadlineExceeded as e:
+            await state_manager.update_build_step(
+                step_id,
+                status="timed_out",
+                error=str(e)
+            )
+            raise
+
         except Exception as e:
             # Update step with error
             await state_manager.update_build_step(
@@ -255,6 +330,26 @@ class OrchestratorAgent:
             )
             raise
 
+    async def resume(self, task_hash: str) -> Dict[str, Any]:
+        """Resume a decomposed task from its last checkpoint.
+
+        The task runs again at the depth and with the context it had, so a
+        phase of a larger task keeps its parent's context and depth limit.
+
+        Args:
+            task_hash: Hash of the task, as listed by state_manager.list_checkpoints()
+
+        Returns:
+            Agent execution result
+
+        Raises:
+            KeyError: if there is no checkpoint for task_hash
+        """
+        checkpoint = await state_manager.get_checkpoint(task_hash)
+        if checkpoint is None:
+            raise KeyError(f"No checkpoint for task {task_hash}")
+        return await self.run(checkpoint.task, context=checkpoint.context or None, depth=checkpoint.depth)
+
     async def analyze_system(self) -> Dict[str, Any]:
         """Analyze current system state and identify gaps.
         
@@ -294,4 +389,4 @@ class OrchestratorAgent:
 
 
 # Global orchestrator instance
-orchestrator = OrchestratorAgent()
+orchestrator: OrchestratorAgent = Lazy(OrchestratorAgent)
@@ -1,10 +1,12 @@
 """Planner agent - decomposes goals into executable steps."""
 from typing import List, Dict, Any
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from ..core import get_llm, state_manager, BuildStep
-from ..tools import BASE_TOOLS
+from ..core.lazy import Lazy
+from ..core.metrics import metrics_scope
+from ..core.tasks import with_deadline, DeadlineExceeded
+from ..tools import BASE_TOOLS, prepare_tools
 import uuid
+import asyncio
 
 
 PLANNER_PROMPT = """You are the Planner agent for a self-building LangChain system.
@@ -38,12 +40,15 @@ class PlannerAgent:
     
     def __init__(self):
         self.llm = get_llm()
-        self.tools = BASE_TOOLS
+        self.tools = prepare_tools(BASE_TOOLS)
         self.agent_executor = None
         self._initialize_agent()
     
     def _initialize_agent(self):
         """Initialize the LangChain agent with tools."""
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", PLANNER_PROMPT),
             MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -84,11 +89,12 @@ class PlannerAgent:
         
         try:
             # Run agent
-            result = await self.agent_executor.ainvoke({
-                "input": f"Create a detailed plan to achieve this goal: {goal}",
-                "capabilities": [cap.model_dump() for cap in state.capabilities],
-                "generated_files": state.generated_files,
-            })
+            with metrics_scope("planner", step_id):
+                result = await with_deadline(self.agent_executor.ainvoke({
+                    "input": f"Create a detailed plan to achieve this goal: {goal}",
+                    "capabilities": [cap.model_dump() for cap in state.capabilities],
+                    "generated_files": state.generated_files,
+                }))
             
             # Update step
             await state_manager.update_build_step(
@@ -99,6 +105,22 @@ class PlannerAgent:
             
             return result
         
+        except asyncio.CancelledError:
+            await state_manager.update_build_step(
+                step_id,
+                status="cancelled",
+                error="Task was cancelled"
+            )
+            raise
+
+        except DeadlineExceeded as e:
+            await state_manager.update_build_step(
+                step_id,
+                status="timed_out",
+                error=str(e)
+            )
+            raise
+
         except Exception as e:
             await state_manager.update_build_step(
                 step_id,
@@ -109,4 +131,4 @@ class PlannerAgent:
 
 
 # Global planner instance
-planner = PlannerAgent()
+planner: PlannerAgent = Lazy(PlannerAgent)
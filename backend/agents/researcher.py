@@ -1,19 +1,45 @@
 import os
 import re
-import time
-import hashlib
+import asyncio
+import mmap
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
-from typing import Optional, List, Dict
+from pathlib import Path
+from typing import Optional, List, Dict, Iterable, Union
+from ..core.doc_crawler import doc_crawler
+from ..core.doc_index import DOC_SITES, doc_index, html_to_text
+from ..core.docs_cache import docs_cache
+from ..core.fileio import MMAP_THRESHOLD
+from ..core.http_cache import http_client
+from ..core.snippets import Snippet, TermMatcher, extract_terms, rank_snippets
 
-CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'cache', 'docs')
-if not os.path.exists(CACHE_DIR):
-    os.makedirs(CACHE_DIR)
+# Extracted page text: a str, or a read-only memory map (UTF-8 bytes) for large pages
+PageText = Union[str, mmap.mmap]
+
+
+def _query_terms(query: Union[str, Iterable[str]]) -> List[str]:
+    # Free text is reduced to its key terms; a list is taken as the terms themselves
+    return extract_terms(query) if isinstance(query, str) else [term.lower() for term in query]
+
+
+def _top_snippets(ranked: Iterable[List[Snippet]], top_k: int) -> List[Snippet]:
+    return sorted((s for snippets in ranked for s in snippets), key=lambda s: -s.score)[:top_k]
+
+
+# Sections fetched from the index per snippet wanted; the best windows are
+# ranked within them
+INDEX_SECTIONS_PER_SNIPPET = 2
 
 class ResearchAgent:
     """
     ResearchAgent fetches and searches official documentation for supported libraries.
-    It uses simple web scraping with caching to avoid repeated downloads.
+    It uses simple web scraping with caching to avoid repeated downloads;
+    the page cache (docs_cache) is bounded in size and age and refreshes
+    stale pages in the background.
+    Pages are ingested once into the local full-text index (doc_index), so
+    searches run offline; ingest() refreshes them, crawl() follows their
+    links in the background and ingest_directory() loads local
+    documentation dumps.
 
     Supported docs:
     - LangChain (https://python.langchain.com/en/latest/)
@@ -28,84 +54,175 @@ class ResearchAgent:
     - Github (https://docs.github.com/en)
     """
 
-    DOC_SITES = {
-        'langchain': 'https://python.langchain.com/en/latest/',
-        'nextjs': 'https://nextjs.org/docs',
-        'react': 'https://react.dev',
-        'tailwindcss': 'https://tailwindcss.com/docs',
-        'fastapi': 'https://fastapi.tiangolo.com/en/latest/',
-        'python': 'https://docs.python.org/3/',
-        'nodejs': 'https://nodejs.org/en/docs/',
-        'react-native': 'https://reactnative.dev/docs/getting-started',
-        'flyio': 'https://fly.io/docs/',
-        'github': 'https://docs.github.com/en',
-    }
+    # Shared with the doc search tools, so each landing page has one URL in the index
+    DOC_SITES = DOC_SITES
+
+    # Default for the async research path
+    RESEARCH_TIMEOUT = 10.0  # seconds for one concurrent research pass
 
     def __init__(self):
         self.session = requests.Session()
 
-    def _cache_path(self, url: str) -> str:
-        # Use a hash of the url for cache filename
-        h = hashlib.sha256(url.encode('utf-8')).hexdigest()
-        return os.path.join(CACHE_DIR, f'{h}.html')
+    def new_session(self, timeout: Optional[float] = None) -> "ResearchSession":
+        """Create an async research session that shares parsed pages across calls."""
+        return ResearchSession(self, timeout=timeout if timeout is not None else self.RESEARCH_TIMEOUT)
 
-    def _fetch_url(self, url: str) -> Optional[str]:
-        cache_file = self._cache_path(url)
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return f.read()
+    def _download(self, url: str) -> Optional[str]:
+        # Blocking path (background cache refreshes): spaced by the same
+        # per-host gate as the async downloads
+        http_client.host(url).wait()
         try:
             resp = self.session.get(url, timeout=10)
             if resp.status_code == 200:
-                content = resp.text
-                with open(cache_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                time.sleep(1)  # polite delay
-                return content
+                return resp.text
         except Exception as e:
             print(f"ResearchAgent: Failed to fetch {url}: {e}")
         return None
 
+    def _fetch_url(self, url: str) -> Optional[str]:
+        cache_file = docs_cache.lookup(url, refresh=self._download)
+        if cache_file is not None:
+            try:
+                return cache_file.read_text(encoding='utf-8')
+            except OSError:
+                pass  # evicted or refreshed since the lookup
+        content = self._download(url)
+        if content is not None:
+            docs_cache.write(url, '.html', content)
+        return content
+
     def _extract_text(self, html: str) -> str:
-        soup = BeautifulSoup(html, 'html.parser')
-        # Remove script and style
-        for script in soup(['script', 'style', 'noscript']):
-            script.decompose()
-        text = soup.get_text(separator=' ')
-        # Collapse whitespace
-        text = re.sub(r'\s+', ' ', text)
+        return html_to_text(html)[1]
+
+    @staticmethod
+    def _read_text(path: Path) -> PageText:
+        if os.path.getsize(path) >= MMAP_THRESHOLD:
+            with open(path, 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def cached_text(self, url: str, lower: bool = False) -> Optional[PageText]:
+        """
+        Extracted text of url from the text cache, without parsing any HTML.
+        Returns None if the text was never extracted or the HTML has changed since.
+        """
+        path = docs_cache.lookup(url, '.lower.txt' if lower else '.txt', refresh=self._download)
+        if path is None:
+            return None
+        try:
+            return self._read_text(path)
+        except OSError:
+            return None  # evicted or refreshed since the lookup
+
+    def store_text(self, url: str, html: str, lower: bool = False) -> PageText:
+        """
+        Extract the text of html and cache it, with a lowercased variant, next to the HTML.
+        Returns the requested variant.
+        """
+        text = self._extract_text(html)
+        paths = [docs_cache.write(url, suffix, content) for suffix, content in (('.txt', text), ('.lower.txt', text.lower()))]
+        return self._read_text(paths[lower])
+
+    def page_text(self, url: str, lower: bool = False) -> Optional[PageText]:
+        """
+        Extracted text of a page; the HTML is downloaded and parsed only the first time.
+        """
+        text = self.cached_text(url, lower)
+        if text is None:
+            html = self._fetch_url(url)
+            if not html:
+                return None
+            text = self.store_text(url, html, lower)
         return text
 
     def search(self, library: str, query: str, max_results: int = 3) -> List[str]:
         """
         Search the documentation of the given library for the query.
-        Returns a list of text snippets containing the query.
+        Returns snippets of the best-matching sections, best first.
+
+        Libraries are searched in the local index. A DOC_SITES library that
+        was never ingested has its page fetched and indexed first.
         """
         library = library.lower()
-        if library not in self.DOC_SITES:
+        if library not in self.DOC_SITES and not doc_index.has_library(library):
             raise ValueError(f"Unsupported library for research: {library}")
 
-        base_url = self.DOC_SITES[library]
+        if not doc_index.has_library(library):
+            base_url = self.DOC_SITES[library]
+            html = self._fetch_url(base_url)
+            if not html:
+                return []
+            doc_index.add_html(library, base_url, html)
 
-        # For simplicity, fetch the base doc page and search text
-        html = self._fetch_url(base_url)
-        if not html:
-            return []
+        return [hit.text for hit in doc_index.search(query, [library], limit=max_results)]
+
+    async def ingest(self, libraries: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Download DOC_SITES pages concurrently and (re)index them.
+
+        Args:
+            libraries: DOC_SITES keys to ingest, defaults to all of them.
+
+        Returns:
+            Mapping of library -> "indexed", "unchanged" or an error message.
+        """
+        libraries = [lib.lower() for lib in (libraries or self.DOC_SITES.keys())]
+        for lib in libraries:
+            if lib not in self.DOC_SITES:
+                raise ValueError(f"Unsupported library for research: {lib}")
+
+        async def ingest_one(lib: str) -> str:
+            url = self.DOC_SITES[lib]
+            try:
+                async with http_client.host(url):
+                    response = await http_client.get(url)
+            except Exception as e:
+                return f"failed: {e}"
+            if not response.ok:
+                return f"failed: HTTP {response.status}"
+            changed = await asyncio.to_thread(doc_index.add_html, lib, url, response.text)
+            return "indexed" if changed else "unchanged"
 
-        text = self._extract_text(html).lower()
-        query_lower = query.lower()
+        results = await asyncio.gather(*(ingest_one(lib) for lib in libraries))
+        return dict(zip(libraries, results))
 
-        # Find all occurrences of query in text and extract snippets
-        snippets = []
-        for match in re.finditer(re.escape(query_lower), text):
-            start = max(match.start() - 50, 0)
-            end = min(match.end() + 50, len(text))
-            snippet = text[start:end].strip()
-            snippets.append(snippet)
-            if len(snippets) >= max_results:
-                break
+    def crawl(self, libraries: Optional[Iterable[str]] = None, resume: bool = True) -> Dict[str, Dict]:
+        """
+        Crawl DOC_SITES into the index in the background, following links
+        under each site's URL. Must be called from a running event loop.
 
-        return snippets
+        Args:
+            libraries: DOC_SITES keys to crawl, defaults to all of them.
+            resume: Continue unfinished crawls instead of starting over.
+
+        Returns:
+            Mapping of library -> crawl progress (see doc_crawler.status()).
+        """
+        libraries = [lib.lower() for lib in (libraries or self.DOC_SITES.keys())]
+        for lib in libraries:
+            if lib not in self.DOC_SITES:
+                raise ValueError(f"Unsupported library for research: {lib}")
+        return doc_crawler.start({lib: self.DOC_SITES[lib] for lib in libraries}, resume=resume)
+
+    def ingest_directory(self, library: str, directory: str) -> int:
+        """
+        Index a local documentation dump (.html, .htm, .md, .rst and .txt files).
+
+        Returns the number of pages added or changed.
+        """
+        changed = 0
+        for path in sorted(Path(directory).rglob('*')):
+            suffix = path.suffix.lower()
+            if not path.is_file() or suffix not in ('.html', '.htm', '.md', '.rst', '.txt'):
+                continue
+            content = path.read_text(encoding='utf-8', errors='replace')
+            url = path.resolve().as_uri()
+            if suffix in ('.html', '.htm'):
+                changed += doc_index.add_html(library, url, content)
+            else:
+                changed += doc_index.add_page(library, url, content, title=path.stem)
+        return changed
 
     def fetch_page(self, library: str, page_path: str) -> Optional[str]:
         """
@@ -123,18 +240,24 @@ class ResearchAgent:
         return self._fetch_url(url)
 
     def clear_cache(self):
-        """Clear all cached documentation pages."""
-        for filename in os.listdir(CACHE_DIR):
-            if filename.endswith('.html'):
-                os.remove(os.path.join(CACHE_DIR, filename))
+        """Clear all cached documentation pages and their extracted text."""
+        docs_cache.clear()
 
-    def research_before_build(self, task_description: str) -> Dict[str, List[str]]:
+    async def research_before_build(
+        self,
+        task_description: str,
+        session: Optional["ResearchSession"] = None,
+    ) -> Dict[str, List[str]]:
         """
         Parse the task description to extract relevant core stack technologies and
         search their documentation for relevant snippets.
 
+        Runs on a ResearchSession, so pages that still have to be downloaded
+        never block the event loop and are bounded by the session timeout.
+
         Args:
             task_description: The textual description of the task.
+            session: Session to research in, defaults to a new one for this call.
 
         Returns:
             Dictionary mapping each detected library to a list of relevant snippets.
@@ -160,9 +283,254 @@ class ResearchAgent:
             if re.search(pattern, lower_desc):
                 detected_tech.append(tech)
 
-        results = {}
-        for tech in detected_tech:
-            snippets = self.search(tech, task_description, max_results=3)
-            results[tech] = snippets
+        results = {tech: [] for tech in detected_tech}
+        if not detected_tech:
+            return results
+
+        # Indexed libraries are searched through the full-text index; only
+        # libraries without indexed pages fall back to scanning their page
+        own_session = session is None
+        if own_session:
+            session = self.new_session()
+        try:
+            snippets = await session.retrieve(task_description, detected_tech, top_k=3 * len(detected_tech))
+        finally:
+            if own_session:
+                await session.aclose()
+        for snippet in snippets:
+            results[snippet.library].append(snippet.text)
 
         return results
+
+    def index_snippets(
+        self,
+        query: Union[str, Iterable[str]],
+        libraries: Optional[Iterable[str]] = None,
+        top_k: int = 5,
+    ) -> List[Snippet]:
+        """
+        Rank snippets for the key terms of query within the best index sections.
+
+        The full-text index picks the best sections by BM25; each section is
+        then scanned once for all terms and its densest windows ranked, so
+        results are short excerpts rather than whole sections. A section
+        where no term matches verbatim (a stemmed match) contributes its
+        index snippet.
+
+        Args:
+            query: Free text (its key terms are extracted) or a list of terms.
+            libraries: Indexed libraries to search, defaults to all of them.
+            top_k: Number of snippets to return.
+        """
+        terms = _query_terms(query)
+        matcher = TermMatcher(terms)
+        hits = doc_index.search(" ".join(terms), libraries, limit=INDEX_SECTIONS_PER_SNIPPET * top_k)
+        # Sorting is stable, so equally dense windows stay in BM25 order
+        ranked = [
+            rank_snippets(hit.body.lower(), matcher, top_k, library=hit.source)
+            or [Snippet(hit.source, hit.text, 0.0, [])]
+            for hit in hits
+        ]
+        return _top_snippets(ranked, top_k)
+
+    def retrieve(
+        self,
+        query: Union[str, Iterable[str]],
+        libraries: Optional[Iterable[str]] = None,
+        top_k: int = 5,
+    ) -> List[Snippet]:
+        """
+        Rank snippets for all key terms of query across the DOC_SITES pages.
+        Used for libraries that have no pages in the full-text index yet
+        (see index_snippets).
+
+        Each page is scanned once for every term together; windows dense in
+        distinct terms rank highest, and the best top_k across all libraries
+        are returned, best first.
+
+        Args:
+            query: Free text (its key terms are extracted) or a list of terms.
+            libraries: DOC_SITES keys to search, defaults to all of them.
+            top_k: Number of snippets to return.
+        """
+        libraries = [lib.lower() for lib in (libraries or self.DOC_SITES.keys())]
+        for lib in libraries:
+            if lib not in self.DOC_SITES:
+                raise ValueError(f"Unsupported library for research: {lib}")
+        matcher = TermMatcher(_query_terms(query))
+        ranked = []
+        for lib in libraries:
+            text = self.page_text(self.DOC_SITES[lib], lower=True)
+            if not text:
+                continue
+            try:
+                ranked.append(rank_snippets(text, matcher, top_k, library=lib))
+            finally:
+                if isinstance(text, mmap.mmap):
+                    text.close()
+        return _top_snippets(ranked, top_k)
+
+
+
+class ResearchSession:
+    """
+    Async, time-bounded research over the DOC_SITES pages.
+
+    A session downloads and parses each documentation page at most once, with
+    downloads running concurrently through http_client and its per-host gate. The parsed text is
+    kept for the lifetime of the session, so the phases of a decomposed task
+    can share one session and only the first phase pays for the network.
+    Every search_many call is bounded by a global deadline: sites that are not
+    ready in time are skipped for that call but keep downloading in the
+    background for later calls.
+    """
+
+    def __init__(self, agent: ResearchAgent, timeout: float):
+        self.agent = agent
+        self.timeout = timeout
+        self._texts: Dict[str, asyncio.Task] = {}
+
+    def _read_cache(self, url: str) -> Optional[str]:
+        cache_file = docs_cache.lookup(url, refresh=self.agent._download)
+        if cache_file is not None:
+            try:
+                return cache_file.read_text(encoding='utf-8')
+            except OSError:
+                pass  # evicted or refreshed since the lookup
+        return None
+
+    def _write_cache(self, url: str, content: str) -> None:
+        docs_cache.write(url, '.html', content)
+
+    async def _fetch_url(self, url: str) -> Optional[str]:
+        """Async counterpart of ResearchAgent._fetch_url sharing its disk cache."""
+        cached = await asyncio.to_thread(self._read_cache, url)
+        if cached is not None:
+            return cached
+
+        try:
+            async with http_client.host(url):
+                response = await http_client.get(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"ResearchAgent: Failed to fetch {url}: {e}")
+            return None
+        if not response.ok:
+            return None
+        content = response.text
+        await asyncio.to_thread(self._write_cache, url, content)
+        return content
+
+    async def _load_text(self, url: str) -> Optional[PageText]:
+        # Extracted text is cached next to the HTML, so a page is parsed once, not once per session
+        text = await asyncio.to_thread(self.agent.cached_text, url, True)
+        if text is not None:
+            return text
+        html = await self._fetch_url(url)
+        if not html:
+            return None
+        # BeautifulSoup parsing is CPU bound, keep it off the event loop
+        return await asyncio.to_thread(self.agent.store_text, url, html, True)
+
+    def _text_task(self, url: str) -> asyncio.Task:
+        """Return the (possibly shared, possibly finished) task producing url's text."""
+        task = self._texts.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._load_text(url))
+            self._texts[url] = task
+        return task
+
+    async def retrieve(
+        self,
+        query: Union[str, Iterable[str]],
+        libraries: Optional[Iterable[str]] = None,
+        top_k: int = 5,
+        timeout: Optional[float] = None,
+    ) -> List[Snippet]:
+        """
+        Async retrieval across libraries: indexed libraries through
+        ResearchAgent.index_snippets, the others over the session's pages.
+
+        Pages not loaded before the deadline are skipped. Pages are scanned
+        concurrently in worker threads, each in a single pass for all terms.
+        """
+        libraries = [lib.lower() for lib in (libraries or self.agent.DOC_SITES.keys())]
+        for lib in libraries:
+            if lib not in self.agent.DOC_SITES:
+                raise ValueError(f"Unsupported library for research: {lib}")
+        matcher = TermMatcher(_query_terms(query))
+
+        indexed = await asyncio.to_thread(lambda: [lib for lib in libraries if doc_index.has_library(lib)])
+        tasks = {lib: self._text_task(self.agent.DOC_SITES[lib]) for lib in libraries if lib not in indexed}
+        if tasks:
+            await asyncio.wait(set(tasks.values()), timeout=timeout if timeout is not None else self.timeout)
+        scans = [
+            asyncio.to_thread(rank_snippets, task.result(), matcher, top_k, lib)
+            for lib, task in tasks.items()
+            if task.done() and not task.cancelled() and task.exception() is None and task.result()
+        ]
+        if indexed:
+            scans.append(asyncio.to_thread(self.agent.index_snippets, query, indexed, top_k))
+        return _top_snippets(await asyncio.gather(*scans), top_k)
+
+    async def search_many(
+        self,
+        queries: Iterable[str],
+        libraries: Optional[Iterable[str]] = None,
+        max_results: int = 3,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Search several libraries for several queries concurrently.
+
+        Args:
+            queries: Query strings to look for.
+            libraries: DOC_SITES keys to search, defaults to all of them.
+            max_results: Maximum snippets per (query, library) pair.
+            timeout: Deadline in seconds for this call, defaults to the session timeout.
+
+        Returns:
+            Mapping of query -> library -> snippets. Libraries whose page could
+            not be loaded before the deadline are omitted.
+        """
+        queries = list(queries)
+        libraries = [lib.lower() for lib in (libraries or self.agent.DOC_SITES.keys())]
+        for lib in libraries:
+            if lib not in self.agent.DOC_SITES:
+                raise ValueError(f"Unsupported library for research: {lib}")
+
+        # Indexed libraries are searched offline; the others need their page
+        indexed = await asyncio.to_thread(lambda: {lib for lib in libraries if doc_index.has_library(lib)})
+        tasks = {lib: self._text_task(self.agent.DOC_SITES[lib]) for lib in libraries if lib not in indexed}
+        if tasks:
+            # asyncio.wait does not cancel on timeout: unfinished downloads keep
+            # running so a later call in this session can still use them.
+            await asyncio.wait(set(tasks.values()), timeout=timeout if timeout is not None else self.timeout)
+        texts = {
+            lib: task.result()
+            for lib, task in tasks.items()
+            if task.done() and not task.cancelled() and task.exception() is None and task.result()
+        }
+
+        searches = []
+        for query in queries:
+            matcher = TermMatcher(_query_terms(query))
+            for lib in indexed:
+                searches.append((query, lib, asyncio.to_thread(self.agent.index_snippets, query, [lib], max_results)))
+            for lib, text in texts.items():
+                searches.append((query, lib, asyncio.to_thread(rank_snippets, text, matcher, max_results, lib)))
+        found = await asyncio.gather(*(search for _, _, search in searches))
+
+        results: Dict[str, Dict[str, List[str]]] = {query: {} for query in queries}
+        for (query, lib, _), snippets in zip(searches, found):
+            if snippets:
+                results[query][lib] = [snippet.text for snippet in snippets]
+        return results
+
+    async def aclose(self) -> None:
+        """Cancel outstanding downloads and release the session's pages."""
+        for task in self._texts.values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is None and isinstance(task.result(), mmap.mmap):
+                task.result().close()
+        self._texts.clear()
@@ -1,10 +1,12 @@
 """Toolsmith agent - creates new LangChain tools when gaps are detected."""
 from typing import Dict, Any
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from ..core import get_llm, state_manager, BuildStep
-from ..tools import BASE_TOOLS
+from ..core.lazy import Lazy
+from ..core.metrics import metrics_scope
+from ..core.tasks import with_deadline, DeadlineExceeded
+from ..tools import BASE_TOOLS, prepare_tools
 import uuid
+import asyncio
 
 
 TOOLSMITH_PROMPT = """You are the Toolsmith agent for a self-building LangChain system.
@@ -49,7 +51,7 @@ async def my_new_tool(param: str) -> str:
 ```
 
 Save new tools to: backend/tools/custom_tools.py
-Update backend/tools/__init__.py to export them
+Register them in backend/tools/__init__.py with register_tool, which adds them to BASE_TOOLS with the output budget and metrics applied
 
 Current tools available: {current_tools}
 Generated files: {generated_files}
@@ -61,12 +63,15 @@ class ToolsmithAgent:
     
     def __init__(self):
         self.llm = get_llm(temperature=0.1)
-        self.tools = BASE_TOOLS
+        self.tools = prepare_tools(BASE_TOOLS)
         self.agent_executor = None
         self._initialize_agent()
     
     def _initialize_agent(self):
         """Initialize the LangChain agent with tools."""
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", TOOLSMITH_PROMPT),
             MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -110,11 +115,12 @@ class ToolsmithAgent:
         
         try:
             # Run agent
-            result = await self.agent_executor.ainvoke({
-                "input": f"Create a new LangChain tool for this requirement: {requirement}",
-                "current_tools": [tool.name for tool in self.tools],
-                "generated_files": state.generated_files,
-            })
+            with metrics_scope("toolsmith", step_id):
+                result = await with_deadline(self.agent_executor.ainvoke({
+                    "input": f"Create a new LangChain tool for this requirement: {requirement}",
+                    "current_tools": [tool.name for tool in self.tools],
+                    "generated_files": state.generated_files,
+                }))
             
             # Update step
             await state_manager.update_build_step(
@@ -125,6 +131,22 @@ class ToolsmithAgent:
             
             return result
         
+        except asyncio.CancelledError:
+            await state_manager.update_build_step(
+                step_id,
+                status="cancelled",
+                error="Task was cancelled"
+            )
+            raise
+
+        except DeadlineExceeded as e:
+            await state_manager.update_build_step(
+                step_id,
+                status="timed_out",
+                error=str(e)
+            )
+            raise
+
         except Exception as e:
             await state_manager.update_build_step(
                 step_id,
@@ -135,4 +157,4 @@ class ToolsmithAgent:
 
 
 # Global toolsmith instance
-toolsmith = ToolsmithAgent()
+toolsmith: ToolsmithAgent = Lazy(ToolsmithAgent)
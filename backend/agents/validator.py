@@ -1,10 +1,12 @@
 """Validator agent - runs static checks and logical validation on generated code."""
 from typing import Dict, Any, List
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from ..core import get_llm, state_manager, BuildStep
-from ..tools import BASE_TOOLS
+from ..core.lazy import Lazy
+from ..core.metrics import metrics_scope
+from ..core.tasks import with_deadline, DeadlineExceeded
+from ..tools import BASE_TOOLS, prepare_tools
 import uuid
+import asyncio
 
 
 VALIDATOR_PROMPT = """You are the Validator agent for a self-building LangChain system.
@@ -22,7 +24,7 @@ Validation checks:
 
 For Python files:
 - Check syntax with validate_python_syntax tool
-- Verify imports are available
+- Run check_project to compile the whole backend and verify imports resolve
 - Check for common anti-patterns
 - Ensure async/await is used correctly
 
@@ -49,12 +51,15 @@ class ValidatorAgent:
     
     def __init__(self):
         self.llm = get_llm()
-        self.tools = BASE_TOOLS
+        self.tools = prepare_tools(BASE_TOOLS)
         self.agent_executor = None
         self._initialize_agent()
     
     def _initialize_agent(self):
         """Initialize the LangChain agent with tools."""
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", VALIDATOR_PROMPT),
             MessagesPlaceholder(variable_name="chat_history", optional=True),
@@ -101,10 +106,11 @@ class ValidatorAgent:
         
         try:
             # Run agent
-            result = await self.agent_executor.ainvoke({
-                "input": task,
-                "generated_files": state.generated_files,
-            })
+            with metrics_scope("validator", step_id):
+                result = await with_deadline(self.agent_executor.ainvoke({
+                    "input": task,
+                    "generated_files": state.generated_files,
+                }))
             
             # Update step
             await state_manager.update_build_step(
@@ -115,6 +121,22 @@ class ValidatorAgent:
             
             return result
         
+        except asyncio.CancelledError:
+            await state_manager.update_build_step(
+                step_id,
+                status="cancelled",
+                error="Task was cancelled"
+            )
+            raise
+
+        except DeadlineExceeded as e:
+            await state_manager.update_build_step(
+                step_id,
+                status="timed_out",
+                error=str(e)
+            )
+            raise
+
         except Exception as e:
             await state_manager.update_build_step(
                 step_id,
@@ -136,4 +158,4 @@ class ValidatorAgent:
 
 
 # Global validator instance
-validator = ValidatorAgent()
+validator: ValidatorAgent = Lazy(ValidatorAgent)
@@ -1,6 +1,6 @@
 """FastAPI server for frontend communication."""
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -15,6 +15,19 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.core import state_manager, build_loop, settings
 from backend.core.file_guardian import file_guardian
+from backend.core.file_index import file_index
+from backend.core.content_cache import content_cache
+from backend.core.docs_cache import docs_cache
+from backend.core.metrics import tool_metrics
+from backend.core.http_cache import http_client
+from backend.core.doc_index import doc_index
+from backend.core.doc_crawler import doc_crawler
+from backend.core.lazy import is_constructed
+from backend.core.project_check import project_checker
+from backend.core.ast_fingerprint import definition_index
+from backend.core.tasks import task_registry
+from backend.core.jobs import job_queue, Job, QueueFull, JOB_STATUSES
+from backend.core.patching import apply_patch_text, PatchError
 from backend.agents import orchestrator
 from backend.agents.flyio_agent import flyio_agent
 
@@ -46,9 +59,26 @@ class TaskRequest(BaseModel):
     """Request to execute a task."""
     task: str
     context: Dict[str, Any] = {}
+    task_id: Optional[str] = None  # lets the client cancel via /api/task/{task_id}/cancel
+    timeout: Optional[float] = None  # seconds, defaults to settings.task_timeout_seconds
+    priority: int = 0  # higher priorities leave the job queue first
+    wait: bool = False  # True holds the response until the job finishes
 
 
 # Launcher service models
+class DocIngestRequest(BaseModel):
+    """Request to (re)index documentation."""
+    libraries: Optional[List[str]] = None  # ResearchAgent.DOC_SITES keys, defaults to all
+    library: Optional[str] = None  # with directory: name to index a local dump under
+    directory: Optional[str] = None  # local documentation dump to load
+
+
+class DocCrawlRequest(BaseModel):
+    """Request to crawl documentation sites into the index."""
+    libraries: Optional[List[str]] = None  # ResearchAgent.DOC_SITES keys, defaults to all
+    resume: bool = True  # continue unfinished crawls instead of starting over
+
+
 class LaunchRequest(BaseModel):
     branch: str
     repo_url: str
@@ -86,6 +116,76 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+async def run_job(job: Job) -> Dict[str, Any]:
+    """Execute a queued job with the orchestrator."""
+    result = await orchestrator.run(job.task, job.context)
+    # Keep only the compact parts of the result, it is persisted with the job
+    return {key: result[key] for key in ("output", "cached", "phases_executed") if key in result}
+
+
+def job_response(job: Job) -> Dict[str, Any]:
+    """Serialize a job for API responses."""
+    return job.model_dump(mode="json")
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    """Start the job workers, resuming jobs persisted before a restart."""
+    await job_queue.start(run_job)
+
+
+@app.on_event("startup")
+async def start_file_index():
+    """Index the repository and keep the index fresh while the server runs."""
+    await file_index.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+
+
+@app.on_event("shutdown")
+async def stop_file_index():
+    await file_index.stop()
+
+
+@app.on_event("shutdown")
+async def stop_project_checker():
+    project_checker.close()
+
+
+@app.on_event("shutdown")
+async def stop_definition_index():
+    if is_constructed(definition_index):
+        definition_index.close()
+
+
+@app.on_event("shutdown")
+async def stop_doc_crawler():
+    """Stop background crawls; they resume from their saved progress."""
+    if is_constructed(doc_crawler):
+        await doc_crawler.stop()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.close()
+
+
+@app.on_event("shutdown")
+async def flush_docs_cache():
+    if is_constructed(docs_cache):
+        docs_cache.flush()
+
+
+@app.on_event("shutdown")
+async def dump_tool_metrics():
+    """Keep this run's tool metrics for offline analysis."""
+    if tool_metrics.query()["total"]["calls"]:
+        tool_metrics.dump()
+
+
 # Routes
 @app.get("/")
 async def root():
@@ -165,17 +265,143 @@ async def stop_build():
     }
 
 
+def submit_job(request: TaskRequest) -> Job:
+    """Submit a task request to the job queue, mapping queue errors to HTTP errors."""
+    try:
+        return job_queue.submit(
+            request.task,
+            context=request.context,
+            priority=request.priority,
+            timeout=request.timeout,
+            job_id=request.task_id,
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 @app.post("/api/task")
 async def execute_task(request: TaskRequest):
-    """Execute a task with the orchestrator."""
-    try:
-        result = await orchestrator.run(request.task, request.context)
+    """Execute a task with the orchestrator.
+
+    The task runs on the job queue. By default the response is sent
+    immediately with the job id, and the job is polled at
+    /api/jobs/{task_id}; with wait=true the response is held until the job
+    finishes.
+    """
+    job = submit_job(request)
+    if not request.wait:
         return {
-            "status": "completed",
-            "result": result
+            "status": job.status,
+            "task_id": job.id,
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+    job = await job_queue.wait(job.id)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    return {
+        "status": job.status,
+        "task_id": job.id,
+        "result": job.result
+    }
+
+
+@app.get("/api/tasks")
+async def list_running_tasks():
+    """List tasks currently being executed."""
+    tasks = task_registry.list_running()
+    return {
+        "tasks": tasks,
+        "count": len(tasks),
+    }
+
+
+@app.post("/api/task/{task_id}/cancel")
+async def cancel_task(task_id: str):
+    """Cancel a queued or running task, including its in-flight LLM and tool calls."""
+    if not job_queue.cancel(task_id) and not task_registry.cancel(task_id):
+        raise HTTPException(status_code=404, detail="Task not found or already finished")
+    return {
+        "status": "cancelling",
+        "task_id": task_id,
+    }
+
+
+# --- Job queue ---
+
+@app.post("/api/jobs")
+async def submit_job_endpoint(request: TaskRequest):
+    """Queue a task and return its job id without waiting for it to run."""
+    job = submit_job(request)
+    return job_response(job)
+
+
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[str] = None, limit: int = 50, offset: int = 0):
+    """List jobs, newest first. Filter by status: queued, running, completed, failed, cancelled."""
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown job status: {status}")
+    jobs = job_queue.list(status=status, limit=limit, offset=offset)
+    return {
+        "jobs": [job_response(job) for job in jobs],
+        "count": len(jobs),
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll a job's status, result and error."""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or already finished")
+    return job_response(job)
+
+
+# --- Phase checkpoints of decomposed tasks ---
+
+@app.get("/api/checkpoints")
+async def list_checkpoints():
+    """List decomposed tasks that stopped before all their phases finished."""
+    checkpoints = await state_manager.list_checkpoints()
+    return {
+        "checkpoints": [
+            {**c.model_dump(mode="json"), "next_phase": c.next_phase}
+            for c in checkpoints
+        ],
+        "count": len(checkpoints),
+    }
+
+
+@app.post("/api/checkpoints/{task_hash}/resume")
+async def resume_checkpoint(task_hash: str, priority: int = 0):
+    """Queue a decomposed task to continue from its first unfinished phase."""
+    checkpoint = await state_manager.get_checkpoint(task_hash)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="Checkpoint not found")
+    if checkpoint.depth > 0:
+        # Jobs run at depth 0; rerunning the top-level task resumes this phase too
+        raise HTTPException(status_code=409, detail="Checkpoint belongs to a phase of a larger task; resume that task instead")
+    # The orchestrator picks the checkpoint up by task hash
+    job = submit_job(TaskRequest(task=checkpoint.task, context=checkpoint.context, priority=priority, wait=False))
+    return job_response(job)
+
+
+@app.delete("/api/checkpoints/{task_hash}")
+async def delete_checkpoint(task_hash: str):
+    """Discard a checkpoint so the task is planned from scratch next time."""
+    if not await state_manager.clear_checkpoint(task_hash):
+        raise HTTPException(status_code=404, detail="Checkpoint not found")
+    return {"status": "deleted", "task_hash": task_hash}
 
 
 @app.get("/api/status")
@@ -190,10 +416,100 @@ async def get_status():
         "implemented_capabilities": sum(1 for c in state.capabilities if c.implemented),
         "total_files": len(state.generated_files),
         "total_steps": len(state.build_steps),
+        "queued_jobs": len(job_queue.list(status="queued", limit=settings.max_queued_jobs)),
+        "running_jobs": len(task_registry.list_running()),
         "last_updated": state.last_updated.isoformat() if state.last_updated else None,
     }
 
 
+@app.get("/api/cache/content")
+async def get_content_cache_stats():
+    """Hit rate and bytes saved by the shared file content cache."""
+    return content_cache.stats()
+
+
+@app.get("/api/cache/docs")
+async def get_docs_cache_stats():
+    """Hits, evictions and background refreshes of the documentation page cache."""
+    return docs_cache.stats()
+
+
+@app.get("/api/metrics/tools")
+async def get_tool_metrics(
+    tool: Optional[str] = None,
+    agent: Optional[str] = None,
+    step_id: Optional[str] = None,
+    group_by: str = "tool",
+):
+    """Call counts, latency percentiles and histograms, bytes and error rates of agent tools.
+
+    group_by is "tool", "agent" or "tool_agent"; step_id limits the numbers
+    to one build step.
+    """
+    try:
+        return tool_metrics.query(tool=tool, agent=agent, step_id=step_id, group_by=group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/metrics/tools/steps")
+async def list_tool_metric_steps():
+    """Build steps with recorded tool calls, most recent first."""
+    return {"steps": tool_metrics.steps()}
+
+
+@app.post("/api/metrics/tools/dump")
+async def dump_tool_metrics_file():
+    """Write all tool metrics to memory/tool_metrics.json."""
+    path = await asyncio.to_thread(tool_metrics.dump)
+    return {"status": "dumped", "path": str(path)}
+
+
+@app.delete("/api/metrics/tools")
+async def reset_tool_metrics():
+    """Start collecting tool metrics from scratch."""
+    tool_metrics.reset()
+    return {"status": "reset"}
+
+
+@app.get("/api/docs/index")
+async def get_doc_index():
+    """Pages per library in the local documentation index."""
+    return {"libraries": await asyncio.to_thread(doc_index.libraries)}
+
+
+@app.post("/api/docs/ingest")
+async def ingest_docs(request: DocIngestRequest):
+    """Download documentation pages (or load a local dump) into the index."""
+    research_agent = orchestrator.research_agent
+    if request.directory:
+        if not request.library:
+            raise HTTPException(status_code=400, detail="library is required with directory")
+        if not Path(request.directory).is_dir():
+            raise HTTPException(status_code=400, detail=f"Not a directory: {request.directory}")
+        changed = await asyncio.to_thread(research_agent.ingest_directory, request.library, request.directory)
+        return {"library": request.library.lower(), "pages_changed": changed}
+    try:
+        return {"results": await research_agent.ingest(request.libraries)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/docs/crawl")
+async def get_doc_crawls(library: Optional[str] = None):
+    """Progress of running and saved documentation crawls."""
+    return doc_crawler.status(library)
+
+
+@app.post("/api/docs/crawl")
+async def crawl_docs(request: DocCrawlRequest):
+    """Start crawling documentation sites into the index in the background."""
+    try:
+        return orchestrator.research_agent.crawl(request.libraries, resume=request.resume)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # --- File Guardian: Human-in-the-loop approval endpoints ---
 
 @app.get("/api/approvals")
@@ -224,17 +540,36 @@ async def get_approval(approval_id: str):
 
 @app.post("/api/approvals/{approval_id}/approve")
 async def approve_write(approval_id: str):
-    """Approve a pending file write. This will execute the write."""
+    """Approve a pending file write. This will execute the write.
+
+    Patch approvals are applied to the file as it is now; if the patch no
+    longer applies, the approval stays pending and 409 is returned.
+    """
+    approval = await file_guardian.get_approval(approval_id)
+    if not approval or approval.status != "pending":
+        raise HTTPException(status_code=404, detail="Approval not found or already resolved")
+
+    full_path = settings.project_root / approval.file_path
+    content = approval.content
+    if approval.patch is not None:
+        try:
+            # Read as bytes so CRLF line endings reach the patch unchanged
+            current = full_path.read_bytes().decode("utf-8") if full_path.exists() else ""
+            content = apply_patch_text(current, approval.patch)
+        except PatchError as e:
+            raise HTTPException(status_code=409, detail=f"Patch no longer applies: {str(e)}")
+
     approval = await file_guardian.approve(approval_id)
     if not approval:
         raise HTTPException(status_code=404, detail="Approval not found or already resolved")
 
     # Execute the approved write
-    full_path = settings.project_root / approval.file_path
     try:
         full_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(full_path, "w") as f:
-            f.write(approval.content)
+        with open(full_path, "w", newline="") as f:
+            f.write(content)
+        content_cache.invalidate(full_path)
+        file_index.update_path(approval.file_path)
         await state_manager.add_generated_file(approval.file_path)
         return {
             "status": "approved_and_written",
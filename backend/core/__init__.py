@@ -1,9 +1,21 @@
 """Core infrastructure for the self-building system."""
 from .config import settings
-from .state import state_manager, SystemState, BuildStep, SystemCapability
+from .state import state_manager, SystemState, BuildStep, SystemCapability, TaskCheckpoint
 from .llm import get_llm
 from .build_loop import build_loop, BuildLoop
 from .file_guardian import file_guardian, FileGuardian
+from .vocabulary import vocabulary_index, VocabularyIndex
+from .file_index import file_index, FileIndex
+from .code_search import code_search_index, CodeSearchIndex
+from .project_check import project_checker, ProjectChecker
+from .content_cache import content_cache, ContentCache
+from .metrics import tool_metrics, ToolMetrics, metrics_scope
+from .http_cache import http_client, CachedHttpClient
+from .doc_index import doc_index, DocIndex
+from .docs_cache import docs_cache, DocsCache
+from .doc_crawler import doc_crawler, DocCrawler
+from .semantic_index import semantic_index, SemanticIndex
+from .ast_fingerprint import definition_index, DefinitionIndex
 
 __all__ = [
     "settings",
@@ -11,9 +23,35 @@ __all__ = [
     "SystemState",
     "BuildStep",
     "SystemCapability",
+    "TaskCheckpoint",
     "get_llm",
     "build_loop",
     "BuildLoop",
     "file_guardian",
     "FileGuardian",
+    "vocabulary_index",
+    "VocabularyIndex",
+    "file_index",
+    "FileIndex",
+    "code_search_index",
+    "CodeSearchIndex",
+    "project_checker",
+    "ProjectChecker",
+    "content_cache",
+    "ContentCache",
+    "tool_metrics",
+    "ToolMetrics",
+    "metrics_scope",
+    "http_client",
+    "CachedHttpClient",
+    "doc_index",
+    "DocIndex",
+    "docs_cache",
+    "DocsCache",
+    "doc_crawler",
+    "DocCrawler",
+    "semantic_index",
+    "SemanticIndex",
+    "definition_index",
+    "DefinitionIndex",
 ]
@@ -0,0 +1,308 @@
+"""Structural fingerprints of Python functions and classes, for finding duplicate definitions."""
+import ast
+import asyncio
+import gc
+import hashlib
+import itertools
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .file_scan import CachedFileScanner
+from .lazy import Lazy
+
+
+# Definitions smaller than this many AST nodes (one-line getters, "pass"
+# stubs) are too generic to call duplicates
+MIN_NODES = 20
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# Fields that never change what code does
+_SKIPPED_FIELDS = frozenset(("ctx", "type_comment", "kind"))
+
+
+def _strip_docstring(body: List[ast.stmt]) -> List[ast.stmt]:
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+        return body[1:]
+    return body
+
+
+# Marks identifier tokens, which are canonicalized per definition
+_IDENT = "\1"
+
+# node type -> fields that matter
+_fields_cache: Dict[type, Tuple[str, ...]] = {}
+
+
+class _Serializer:
+    """Serializes a module's AST once, recording where each definition's tokens are.
+
+    Every node contributes its type name; literals contribute only their type
+    and docstrings nothing. Identifiers are kept, marked, so that each
+    definition's span can be canonicalized on its own (see _digest). The
+    module is walked once however deeply definitions are nested.
+    """
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.nodes = 0
+        # (node, qualname, scope, first token, end token, first node number, end node number)
+        self.spans: List[Tuple[ast.AST, str, int, int, int, int, int]] = []
+        self._blocks = itertools.count()
+
+    def visit(self, node: ast.AST, prefix: str = "", scope: int = -1) -> None:
+        definition = isinstance(node, _DEFINITIONS)
+        if definition:
+            qualname = f"{prefix}{node.name}"
+            prefix = f"{qualname}."
+            start, first = len(self.tokens), self.nodes
+        self.nodes += 1
+        tokens = self.tokens
+        cls = type(node)
+        tokens.append(cls.__name__)
+        if cls is ast.Constant:
+            tokens.append(type(node.value).__name__)
+            return
+        fields = _fields_cache.get(cls)
+        if fields is None:
+            fields = _fields_cache[cls] = tuple(f for f in cls._fields if f not in _SKIPPED_FIELDS)
+        for field in fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                if definition and field == "body":
+                    value = _strip_docstring(value)
+                # The branches of an if/else or try are separate blocks, so
+                # alternative definitions of one name are not redefinitions
+                block = next(self._blocks)
+                tokens.append("[")
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item, prefix, block)
+                    else:
+                        tokens.append(_IDENT + item if isinstance(item, str) else repr(item))
+                tokens.append("]")
+            elif isinstance(value, ast.AST):
+                self.visit(value, prefix)
+            elif isinstance(value, str):
+                tokens.append(_IDENT + value)
+            else:
+                tokens.append(repr(value))  # None, ImportFrom.level
+        if definition:
+            self.spans.append((node, qualname, scope, start, len(tokens), first, self.nodes))
+
+
+def _digest(tokens: List[str]) -> str:
+    """Hash of tokens with identifiers replaced by v0, v1, ... in order of first appearance.
+
+    A consistently renamed copy of a definition hashes the same, while code
+    using its names in a different pattern does not.
+    """
+    aliases: Dict[str, str] = {}
+    canonical = []
+    for token in tokens:
+        if token[:1] == _IDENT:
+            alias = aliases.get(token)
+            if alias is None:
+                alias = aliases[token] = f"v{len(aliases)}"
+            token = alias
+        canonical.append(token)
+    return hashlib.blake2b("\0".join(canonical).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def fingerprint(node: ast.AST) -> Tuple[str, int]:
+    """Fingerprint of a node's canonicalized structure, and its size in AST nodes."""
+    serializer = _Serializer()
+    serializer.visit(node)
+    return _digest(serializer.tokens), serializer.nodes
+
+
+class Definition:
+    """A function or class definition in a source file."""
+
+    def __init__(self, path: str, qualname: str, kind: str, lineno: int, end_lineno: int, fingerprint: str, nodes: int, scope: int = 0):
+        self.path = path
+        self.qualname = qualname  # e.g. "StateManager.get_cached_result"
+        self.kind = kind  # "function" or "class"
+        self.lineno = lineno
+        self.end_lineno = end_lineno
+        self.fingerprint = fingerprint
+        self.nodes = nodes
+        self.scope = scope  # statement block the definition sits in, numbered per file
+
+    def contains(self, other: "Definition") -> bool:
+        return self.path == other.path and self.lineno <= other.lineno and other.end_lineno <= self.end_lineno and self is not other
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "name": self.qualname, "kind": self.kind, "lines": [self.lineno, self.end_lineno]}
+
+    def __repr__(self) -> str:
+        return f"Definition({self.path}:{self.lineno} {self.qualname})"
+
+
+def extract_definitions(source: str, path: str = "") -> List[Definition]:
+    """Every function and class in source, nested ones included, with their fingerprints.
+
+    Raises:
+        SyntaxError: source is not valid Python
+    """
+    # ASTs hold no reference cycles; pausing the collector while the many
+    # small node objects are created makes parsing much faster
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        tree = ast.parse(source)
+    finally:
+        if enabled:
+            gc.enable()
+    serializer = _Serializer()
+    serializer.visit(tree)
+    tokens = serializer.tokens
+    definitions = []
+    for node, qualname, scope, start, end, first, last in serializer.spans:
+        kind = "class" if isinstance(node, ast.ClassDef) else "function"
+        digest = _digest(tokens[start:end])
+        definitions.append(Definition(path, qualname, kind, node.lineno, node.end_lineno, digest, last - first, scope))
+    definitions.sort(key=lambda d: d.lineno)
+    return definitions
+
+
+def _extract_file(job: Tuple[str, str]) -> Optional[List[Definition]]:
+    """Definitions of one file, None if it cannot be read or parsed. Runs in worker processes."""
+    path, abs_path = job
+    try:
+        with open(abs_path, encoding="utf-8") as f:
+            return extract_definitions(f.read(), path)
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError):  # ValueError: null bytes
+        return None
+
+
+class DuplicateGroup:
+    """Definitions with the same structure."""
+
+    def __init__(self, fingerprint: str, definitions: List[Definition]):
+        self.fingerprint = fingerprint
+        self.definitions = definitions
+
+    @property
+    def cross_file(self) -> bool:
+        return len({d.path for d in self.definitions}) > 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        first = self.definitions[0]
+        return {
+            "kind": first.kind,
+            "nodes": first.nodes,
+            "cross_file": self.cross_file,
+            "definitions": [d.to_dict() for d in self.definitions],
+        }
+
+
+class DefinitionReport:
+    """Duplicate definitions found across a set of source files."""
+
+    def __init__(self, files: int, definitions: int, duplicates: List[DuplicateGroup], redefinitions: List[List[Definition]], errors: List[str]):
+        self.files = files
+        self.definitions = definitions
+        self.duplicates = duplicates  # structurally identical, largest first
+        self.redefinitions = redefinitions  # same name defined twice in one block; the last one wins
+        self.errors = errors  # files that could not be parsed
+        self.parsed = files  # files parsed for this report, the rest came from cache
+        self.duration = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "parsed": self.parsed,
+            "definitions": self.definitions,
+            "duplicates": [group.to_dict() for group in self.duplicates],
+            "redefinitions": [[d.to_dict() for d in group] for group in self.redefinitions],
+            "errors": self.errors,
+            "duration": round(self.duration, 3),
+        }
+
+
+def group_definitions(per_file: Dict[str, Optional[List[Definition]]], min_nodes: int = MIN_NODES) -> DefinitionReport:
+    """Bucket the definitions of every file by fingerprint.
+
+    Args:
+        per_file: path -> its definitions, None for a file that could not be parsed
+        min_nodes: Ignore definitions smaller than this
+
+    A group whose definitions all sit inside definitions of another group
+    (the methods of a duplicated class) is left out, since the outer group
+    already reports them.
+    """
+    buckets: Dict[str, List[Definition]] = {}
+    redefinitions: List[List[Definition]] = []
+    errors: List[str] = []
+    files = total = 0
+    for path, definitions in per_file.items():
+        if definitions is None:
+            errors.append(path)
+            continue
+        files += 1
+        total += len(definitions)
+        by_name: Dict[Tuple[str, int], List[Definition]] = {}
+        for definition in definitions:
+            by_name.setdefault((definition.qualname, definition.scope), []).append(definition)
+            if definition.nodes >= min_nodes:
+                buckets.setdefault(definition.fingerprint, []).append(definition)
+        redefinitions.extend(group for group in by_name.values() if len(group) > 1)
+
+    groups = [DuplicateGroup(digest, members) for digest, members in buckets.items() if len(members) > 1]
+    outer: Dict[str, List[Definition]] = {}
+    for group in groups:
+        for definition in group.definitions:
+            outer.setdefault(definition.path, []).append(definition)
+
+    def nested(group: DuplicateGroup) -> bool:
+        return all(any(o.contains(d) for o in outer[d.path]) for d in group.definitions)
+
+    duplicates = [group for group in groups if not nested(group)]
+    duplicates.sort(key=lambda group: (-group.definitions[0].nodes * len(group.definitions), group.definitions[0].path))
+    return DefinitionReport(files, total, duplicates, redefinitions, errors)
+
+
+def find_duplicate_definitions(sources: Iterable[Tuple[str, str]], min_nodes: int = MIN_NODES) -> DefinitionReport:
+    """Duplicate definitions among in-memory (path, source) pairs."""
+    per_file: Dict[str, Optional[List[Definition]]] = {}
+    for path, source in sources:
+        try:
+            per_file[path] = extract_definitions(source, path)
+        except (SyntaxError, ValueError):
+            per_file[path] = None
+    return group_definitions(per_file, min_nodes)
+
+
+class DefinitionIndex(CachedFileScanner):
+    """Duplicate definitions across the repository's Python files.
+
+    Definitions are cached by (path, content hash), so a rescan only parses
+    files that changed since the last one; large batches of changed files
+    are parsed in a process pool.
+    """
+
+    def scan_sync(self, directory: str = "", paths: Optional[Iterable[str]] = None, min_nodes: int = MIN_NODES) -> DefinitionReport:
+        """Find duplicate definitions (blocking).
+
+        Args:
+            directory: Scan every Python file under this directory, relative to the project root
+            paths: Scan only these files instead
+            min_nodes: Ignore definitions smaller than this
+        """
+        started = time.perf_counter()
+        with self._lock:
+            if paths is None:
+                paths = self.files.files([".py"], under=directory)
+            per_file, todo = self._scan(paths, _extract_file)
+            report = group_definitions(per_file, min_nodes)
+        report.parsed = len(todo)
+        report.duration = time.perf_counter() - started
+        return report
+
+    async def scan(self, directory: str = "", paths: Optional[Iterable[str]] = None, min_nodes: int = MIN_NODES) -> DefinitionReport:
+        """Find duplicate definitions without blocking the event loop."""
+        return await asyncio.to_thread(self.scan_sync, directory, paths, min_nodes)
+
+
+# Global definition index
+definition_index: DefinitionIndex = Lazy(DefinitionIndex)
@@ -1,9 +1,9 @@
 """Self-build loop - continuous system improvement cycle."""
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 from .state import state_manager, SystemCapability
-from .config import settings
+from .file_index import file_index
 
 
 class BuildLoop:
@@ -13,6 +13,7 @@ class BuildLoop:
         self.running = False
         self.iteration = 0
         self.max_iterations = 10  # Safety limit
+        self._task: Optional[asyncio.Task] = None
         
     async def initialize_capabilities(self):
         """Initialize the list of required system capabilities."""
@@ -88,28 +89,15 @@ class BuildLoop:
         Returns:
             Repository state information
         """
-        backend_path = settings.backend_root
-        frontend_path = settings.project_root / "frontend"
-        
-        # Check what exists
-        backend_files = []
-        if backend_path.exists():
-            for file in backend_path.rglob("*.py"):
-                backend_files.append(str(file.relative_to(settings.project_root)))
-        
-        frontend_files = []
-        if frontend_path.exists():
-            for file in frontend_path.rglob("*.tsx"):
-                frontend_files.append(str(file.relative_to(settings.project_root)))
-            for file in frontend_path.rglob("*.ts"):
-                if "node_modules" not in str(file):
-                    frontend_files.append(str(file.relative_to(settings.project_root)))
+        # Answered from the file index, which skips node_modules and other ignored paths
+        backend_exists = file_index.is_dir("backend")
+        frontend_exists = file_index.is_dir("frontend")
         
         return {
-            "backend_files": backend_files,
-            "frontend_files": frontend_files,
-            "backend_exists": backend_path.exists(),
-            "frontend_exists": frontend_path.exists(),
+            "backend_files": file_index.files([".py"], under="backend"),
+            "frontend_files": file_index.files([".tsx", ".ts"], under="frontend"),
+            "backend_exists": backend_exists,
+            "frontend_exists": frontend_exists,
         }
     
     async def identify_gaps(self) -> List[SystemCapability]:
@@ -125,8 +113,7 @@ class BuildLoop:
         gaps = []
         for cap in state.capabilities:
             if cap.file_path:
-                full_path = settings.project_root / cap.file_path
-                if full_path.exists():
+                if file_index.exists(cap.file_path):
                     # File exists, mark as implemented if not already
                     if not cap.implemented:
                         await state_manager.update_capability(cap.name, implemented=True, file_path=cap.file_path)
@@ -243,6 +230,7 @@ class BuildLoop:
     async def run(self):
         """Run the self-build loop until completion or max iterations."""
         self.running = True
+        self._task = asyncio.current_task()
         
         print("Starting self-build loop...")
         
@@ -263,12 +251,21 @@ class BuildLoop:
             if self.iteration >= self.max_iterations:
                 print(f"\n⚠ Reached maximum iterations ({self.max_iterations})")
         
+        except asyncio.CancelledError:
+            # Swallow only the cancellation requested by stop()
+            if self.running:
+                raise
+            print("\n=== Build loop cancelled ===")
+        
         finally:
             self.running = False
+            self._task = None
     
     def stop(self):
-        """Stop the build loop."""
+        """Stop the build loop, cancelling any in-flight agent work."""
         self.running = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
 
 
 # Global build loop instance
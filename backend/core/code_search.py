@@ -0,0 +1,241 @@
+"""Trigram-indexed code search over the repository."""
+import fnmatch
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from .file_index import file_index, FileIndex
+from .lazy import Lazy
+
+
+# Files searched by search_code
+SEARCHABLE_SUFFIXES = [
+    ".py", ".ts", ".tsx", ".js", ".jsx", ".mjs", ".css", ".html",
+    ".md", ".txt", ".json", ".toml", ".yml", ".yaml", ".sh", ".cfg", ".ini",
+]
+
+# Larger files (state dumps, lockfiles) are not indexed
+MAX_FILE_BYTES = 256 * 1024
+
+# Matched lines are cut to this many characters in results
+MAX_LINE_CHARS = 200
+
+_REGEX_SPECIAL = set(".^$*+?{}[]()|\\")
+
+# A {m}, {m,n}, {m,} or {,n} repetition; any other "{" is a literal brace
+_QUANTIFIER = re.compile(r"\{(?:\d+(?:,\d*)?|,\d+)\}")
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Literal substrings every match of a regex must contain.
+
+    Only literals at the top level of the pattern are considered; groups,
+    character classes and escapes such as \\w end a literal run. Returns an
+    empty list when nothing is required (e.g. a top-level alternation).
+    """
+    literals: List[str] = []
+    run: List[str] = []
+    depth = 0
+    i = 0
+
+    def end_run():
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            if depth == 0 and not escaped.isalnum():
+                run.append(escaped)
+            else:
+                end_run()
+            i += 2
+            continue
+        if char == "[":
+            # Skip the character class
+            end_run()
+            i += 2 if pattern[i + 1:i + 2] == "]" else 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            continue
+        if char == "(":
+            depth += 1
+            end_run()
+        elif char == ")":
+            depth = max(depth - 1, 0)
+            end_run()
+        elif char == "|":
+            if depth == 0:
+                return []
+            end_run()
+        elif char in "*?" or (char == "{" and _QUANTIFIER.match(pattern, i)):
+            # The previous character is optional or repeated
+            if run:
+                run.pop()
+            end_run()
+            if char == "{":
+                # Skip the quantifier's bounds; its digits are not text
+                i = _QUANTIFIER.match(pattern, i).end()
+                continue
+        elif char in _REGEX_SPECIAL:
+            end_run()
+        elif depth == 0:
+            run.append(char)
+        i += 1
+    end_run()
+    return literals
+
+
+class CodeSearchIndex:
+    """Trigram index over the text files known to the file index.
+
+    Each file's lowercased trigrams are kept in an inverted index, so a query
+    only scans files that contain every trigram of its required literals.
+    The index follows the file index: changed files are re-read and removed
+    files dropped whenever a search runs.
+    """
+
+    def __init__(self, files: Optional[FileIndex] = None):
+        self.files = files or file_index
+        self._postings: Dict[str, Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._lines: Dict[str, List[str]] = {}
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, path: str) -> None:
+        for trigram in self._trigrams.pop(path, ()):
+            postings = self._postings.get(trigram)
+            if postings is not None:
+                postings.discard(path)
+                if not postings:
+                    del self._postings[trigram]
+        self._lines.pop(path, None)
+        self._versions.pop(path, None)
+
+    def _add(self, path: str, text: str, version: Tuple[int, int]) -> None:
+        trigrams = _trigrams(text.lower())
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, set()).add(path)
+        self._trigrams[path] = trigrams
+        self._lines[path] = text.splitlines()
+        self._versions[path] = version
+
+    def sync(self) -> int:
+        """Re-index files that changed since the last sync.
+
+        Returns:
+            Number of files (re)indexed or dropped
+        """
+        with self._lock:
+            current = {
+                entry.path: (entry.size, entry.mtime_ns)
+                for entry in self.files.entries(SEARCHABLE_SUFFIXES)
+                if entry.size <= MAX_FILE_BYTES
+            }
+            changes = 0
+            for path in set(self._versions) - set(current):
+                self._remove(path)
+                changes += 1
+            for path, version in current.items():
+                if self._versions.get(path) == version:
+                    continue
+                self._remove(path)
+                try:
+                    data = (self.files.root / path).read_bytes()
+                except OSError:
+                    continue
+                if b"\0" in data[:8192]:
+                    continue  # binary
+                self._add(path, data.decode("utf-8", errors="replace"), version)
+                changes += 1
+            return changes
+
+    def _candidates(self, literals: List[str]) -> Set[str]:
+        trigrams = set()
+        for literal in literals:
+            trigrams |= _trigrams(literal.lower())
+        if not trigrams:
+            return set(self._lines)
+        # Intersect the rarest postings first
+        postings = sorted((self._postings.get(t, set()) for t in trigrams), key=len)
+        result = set(postings[0])
+        for other in postings[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        path_glob: Optional[str] = None,
+        case_sensitive: bool = False,
+        max_results: int = 20,
+    ) -> List[Tuple[str, int]]:
+        """Find lines matching a literal string or regular expression.
+
+        Args:
+            query: Text or pattern to search for
+            regex: Treat query as a Python regular expression
+            path_glob: Only search paths matching this glob ("*" also matches "/")
+            case_sensitive: Match case exactly
+            max_results: Maximum number of matching lines
+
+        Returns:
+            (path, line number) pairs, 1-based, ordered by path and line
+
+        Raises:
+            re.error: if regex is set and query is not a valid pattern
+        """
+        self.sync()
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        literals = required_literals(query) if regex else [query]
+
+        hits: List[Tuple[str, int]] = []
+        with self._lock:
+            for path in sorted(self._candidates(literals)):
+                if path_glob and not fnmatch.fnmatchcase(path, path_glob):
+                    continue
+                for number, line in enumerate(self._lines[path], start=1):
+                    if pattern.search(line):
+                        hits.append((path, number))
+                        if len(hits) >= max_results:
+                            return hits
+        return hits
+
+    def format_hits(self, hits: List[Tuple[str, int]], context_lines: int = 1) -> str:
+        """Render hits grep-style: "path:line:text" for matches, "path-line-text" for context."""
+        blocks: List[List[str]] = []
+        last: Optional[Tuple[str, int]] = None
+        hit_set = set(hits)
+        with self._lock:
+            for path, number in hits:
+                lines = self._lines.get(path, [])
+                start = max(number - context_lines, 1)
+                end = min(number + context_lines, len(lines))
+                if last is not None and last[0] == path and start <= last[1] + 1:
+                    # Overlaps the previous hit's context: extend its block
+                    start = last[1] + 1
+                else:
+                    blocks.append([])
+                for n in range(start, end + 1):
+                    separator = ":" if (path, n) in hit_set else "-"
+                    text = lines[n - 1]
+                    if len(text) > MAX_LINE_CHARS:
+                        text = text[:MAX_LINE_CHARS] + "..."
+                    blocks[-1].append(f"{path}{separator}{n}{separator}{text}")
+                last = (path, max(end, start - 1))
+        return "\n--\n".join("\n".join(block) for block in blocks)
+
+
+# Global code search index
+code_search_index: CodeSearchIndex = Lazy(CodeSearchIndex)
@@ -2,6 +2,7 @@
 import os
 from pathlib import Path
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from .lazy import Lazy
 
 
 class Settings(BaseSettings):
@@ -27,6 +28,49 @@ class Settings(BaseSettings):
     # API Configuration
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+
+    # Task Limits
+    task_timeout_seconds: float = 900.0  # deadline for one orchestrator task
+    max_concurrent_jobs: int = 2  # job queue worker pool size
+    max_queued_jobs: int = 100  # submissions beyond this are rejected
+    job_history_limit: int = 200  # finished jobs kept in memory/jobs.json
+
+    # Command Execution (run_command tool)
+    command_timeout_seconds: float = 30.0  # default per-command timeout
+    command_max_timeout_seconds: float = 600.0  # upper bound for timeouts requested by agents
+    command_output_limit: int = 20000  # bytes of output kept (head and tail)
+
+    # File Tools
+    read_file_max_bytes: int = 32000  # cap on bytes returned by one read_file call
+    file_index_poll_seconds: float = 2.0  # how often the file index checks for changes
+    content_cache_max_bytes: int = 32 * 1024 * 1024  # file contents kept in memory across agents
+
+    # Tool Output
+    tool_output_max_chars: int = 40000  # hard cap on what any tool returns to an agent
+    tool_metrics_step_limit: int = 500  # build steps whose per-step tool metrics are kept
+
+    # Documentation HTTP client
+    http_cache_ttl_seconds: float = 3600.0  # cached pages younger than this skip the network
+    http_cache_max_bytes: int = 128 * 1024 * 1024  # cached responses on disk
+    http_cache_max_age_seconds: float = 30 * 86400.0  # older responses are deleted, never served
+    http_timeout_seconds: float = 15.0  # total time for one request
+    http_max_connections: int = 20  # pooled connections across all hosts
+    http_connections_per_host: int = 4  # pooled connections to one host
+    http_requests_per_host: int = 2  # simultaneous requests to one documentation host
+    http_host_delay_seconds: float = 1.0  # minimum spacing between requests to one host
+
+    # Documentation Cache
+    docs_cache_max_bytes: int = 256 * 1024 * 1024  # pages and extracted text on disk
+    docs_cache_ttl_seconds: float = 86400.0  # older pages are served while refreshed in the background
+    docs_cache_max_age_seconds: float = 90 * 86400.0  # older pages are deleted, never served
+
+    # Documentation Crawler
+    crawl_max_pages: int = 200  # pages fetched per library and crawl
+    crawl_connections_per_host: int = 2  # simultaneous requests to one documentation host
+    crawl_delay_seconds: float = 1.0  # minimum spacing between requests to one host
+
+    # Semantic Search
+    semantic_index_dim: int = 1024  # hashed embedding size; changing it rebuilds the index
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -34,5 +78,5 @@ class Settings(BaseSettings):
         self.memory_dir.mkdir(parents=True, exist_ok=True)
 
 
-# Global settings instance
-settings = Settings()
+# Global settings instance (read from the environment on first use)
+settings: Settings = Lazy(Settings)
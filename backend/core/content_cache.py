@@ -0,0 +1,120 @@
+"""Process-wide cache of file contents shared by every agent's file tools."""
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+import aiofiles
+
+from .config import settings
+from .lazy import Lazy
+
+
+class ContentCache:
+    """Byte-bounded LRU cache of file contents keyed by path.
+
+    Every read stats the file and only serves the cached bytes while its
+    (mtime, size) is unchanged, so edits made outside the tools are picked
+    up on the next read. Writers call invalidate() so their own changes
+    are never served stale, even within one mtime tick.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.content_cache_max_bytes
+        # absolute path -> ((mtime_ns, size), content)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0  # bytes served from memory instead of disk
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(path: Union[str, os.PathLike]) -> str:
+        return os.path.abspath(path)
+
+    def _lookup(self, key: str, version: Tuple[int, int]) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += len(entry[1])
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def _store(self, key: str, version: Tuple[int, int], content: bytes) -> None:
+        with self._lock:
+            self._drop(key)
+            if len(content) > self.max_bytes:
+                return
+            self._entries[key] = (version, content)
+            self._bytes += len(content)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= len(entry[1])
+        return True
+
+    async def read(self, path: Union[str, os.PathLike], stat: Optional[os.stat_result] = None) -> bytes:
+        """Return the content of a file, from memory when it is unchanged.
+
+        Args:
+            path: File to read
+            stat: Result of os.stat(path) if the caller already has it
+
+        Raises:
+            OSError: if the file cannot be read
+        """
+        key = self._key(path)
+        if stat is None:
+            stat = await asyncio.to_thread(os.stat, key)
+        version = (stat.st_mtime_ns, stat.st_size)
+        content = self._lookup(key, version)
+        if content is None:
+            async with aiofiles.open(key, "rb") as f:
+                content = await f.read()
+            self._store(key, version, content)
+        return content
+
+    def invalidate(self, path: Union[str, os.PathLike]) -> None:
+        """Forget a file after it was written or deleted."""
+        with self._lock:
+            if self._drop(self._key(path)):
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Forget every file."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, bytes saved and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Global content cache shared by all agents
+content_cache: ContentCache = Lazy(ContentCache)
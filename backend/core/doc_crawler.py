@@ -0,0 +1,327 @@
+"""Polite, resumable crawler that fills the documentation index in the background."""
+import asyncio
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+from bs4 import BeautifulSoup
+from pydantic import BaseModel, Field
+
+from .config import settings
+from .doc_index import doc_index, soup_to_text
+from .http_cache import USER_AGENT, HostGate, http_client
+from .lazy import Lazy
+
+
+# Links to these are never followed: they are not documentation pages
+SKIP_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".mp4", ".pdf",
+    ".zip", ".gz", ".tar", ".css", ".js", ".json", ".xml", ".txt", ".woff", ".woff2",
+)
+
+# Progress is written to disk after this many pages (and when a crawl stops)
+SAVE_EVERY = 10
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Normal form of url used to recognise the same page under different links.
+
+    Resolves url against base, lowercases the scheme and host, drops the
+    fragment, default ports, tracking parameters and a trailing index.html,
+    and sorts the query. Returns None for anything but http(s) URLs.
+    """
+    if base is not None:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+    if parts.scheme.lower() not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != DEFAULT_PORTS[parts.scheme.lower()]:
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    if path.endswith(("/index.html", "/index.htm")):
+        path = path.rsplit("/", 1)[0] + "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+    ))
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def in_scope(url: str, prefix: str) -> bool:
+    """Whether url lies under prefix ("/docs" covers "/docs/x", not "/docs-old")."""
+    if not url.startswith(prefix):
+        return False
+    rest = url[len(prefix):]
+    return prefix.endswith("/") or not rest or rest[0] in "/?"
+
+
+def parse_page(html: str, url: str) -> Tuple[str, str, str, List[str]]:
+    """(canonical URL, title, text, canonical links) of a page, parsing it once."""
+    soup = BeautifulSoup(html, "html.parser")
+    canonical = url
+    tag = soup.find("link", rel="canonical", href=True)
+    if tag is not None:
+        canonical = canonical_url(tag["href"], url) or url
+    links = []
+    for anchor in soup.find_all("a", href=True):
+        link = canonical_url(anchor["href"], url)
+        if link is not None and not urlsplit(link).path.lower().endswith(SKIP_EXTENSIONS):
+            links.append(link)
+    title, text = soup_to_text(soup)
+    return canonical, title, text, list(dict.fromkeys(links))
+
+
+class CrawlProgress(BaseModel):
+    """State of one library's crawl, saved so an interrupted crawl can resume."""
+    library: str
+    start_url: str
+    prefix: str
+    status: str = "pending"  # running, completed, cancelled, failed
+    pending: List[str] = Field(default_factory=list)  # queued, not yet visited
+    seen: List[str] = Field(default_factory=list)  # every URL queued or indexed so far
+    fetched: int = 0
+    indexed: int = 0
+    unchanged: int = 0
+    duplicates: int = 0  # pages whose canonical URL was already crawled
+    blocked: int = 0  # disallowed by robots.txt
+    errors: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def summary(self) -> Dict[str, Any]:
+        data = self.model_dump(mode="json", exclude={"pending", "seen"})
+        data["queued"] = len(self.pending)
+        return data
+
+
+class DocCrawler:
+    """Crawls documentation sites into the documentation index.
+
+    Starting from a page, the crawler follows links that stay under the
+    site's prefix, at most max_pages pages per crawl. Requests go through
+    the pooled, disk-cached HTTP client and its per-host gate, which they
+    share with every other documentation download: starts to one host are
+    spaced at least delay seconds apart (longer if robots.txt asks for a
+    Crawl-delay), and per_host workers fetch pages. Disallowed pages are
+    skipped. Pages are deduplicated by canonical URL, both normalised links
+    and <link rel="canonical">. Progress is saved as the crawl runs, so a
+    crawl that was stopped resumes where it left off.
+    """
+
+    def __init__(
+        self,
+        state_dir: Optional[Path] = None,
+        max_pages: Optional[int] = None,
+        per_host: Optional[int] = None,
+        delay: Optional[float] = None,
+        client=None,
+        index=None,
+    ):
+        self.state_dir = Path(state_dir or settings.backend_root / "cache" / "crawl")
+        self.max_pages = max_pages or settings.crawl_max_pages
+        self.per_host = per_host or settings.crawl_connections_per_host
+        self.delay = delay if delay is not None else settings.crawl_delay_seconds
+        self.client = client if client is not None else http_client
+        self.index = index if index is not None else doc_index
+        self._robots: Dict[str, RobotFileParser] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+        self._progress: Dict[str, CrawlProgress] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    # --- Progress ---
+
+    def _state_file(self, library: str) -> Path:
+        return self.state_dir / f"{library}.json"
+
+    def _load(self, library: str) -> Optional[CrawlProgress]:
+        try:
+            return CrawlProgress.model_validate_json(self._state_file(library).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, progress: CrawlProgress, seen: set, pending: dict) -> None:
+        progress.seen = sorted(seen)
+        progress.pending = list(pending)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self._state_file(progress.library)
+        temp = path.with_suffix(".tmp")
+        temp.write_text(progress.model_dump_json())
+        temp.replace(path)
+
+    def status(self, library: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Progress of current and saved crawls, by library."""
+        progress = {}
+        if self.state_dir.exists():
+            for path in sorted(self.state_dir.glob("*.json")):
+                saved = self._load(path.stem)
+                if saved is not None:
+                    progress[saved.library] = saved
+        progress.update(self._progress)
+        return {
+            lib: p.summary() for lib, p in progress.items()
+            if library is None or lib == library.lower()
+        }
+
+    # --- Politeness ---
+
+    def _host(self, url: str) -> HostGate:
+        gate = self.client.host(url)
+        gate.delay = max(gate.delay, self.delay)
+        return gate
+
+    async def _allowed(self, url: str) -> bool:
+        host = urlsplit(url).netloc
+        async with self._robots_locks.setdefault(host, asyncio.Lock()):
+            if host not in self._robots:
+                parts = urlsplit(url)
+                robots = RobotFileParser()
+                lines: List[str] = []
+                gate = self._host(url)
+                try:
+                    async with gate:
+                        response = await self.client.get(f"{parts.scheme}://{parts.netloc}/robots.txt")
+                    if response.ok:
+                        lines = response.text.splitlines()
+                except Exception as e:
+                    print(f"DocCrawler: Could not read robots.txt of {parts.netloc}: {e}")
+                robots.parse(lines)  # no rules (missing robots.txt) allows everything
+                crawl_delay = robots.crawl_delay(USER_AGENT)
+                if crawl_delay:
+                    gate.delay = max(gate.delay, float(crawl_delay))
+                self._robots[host] = robots
+        return self._robots[host].can_fetch(USER_AGENT, url)
+
+    # --- Crawling ---
+
+    async def crawl(self, library: str, start_url: str, prefix: Optional[str] = None, resume: bool = True) -> CrawlProgress:
+        """Crawl one documentation site into the index under library.
+
+        Args:
+            library: Name the pages are indexed under
+            start_url: First page to fetch
+            prefix: Only links under this URL are followed (default: start_url)
+            resume: Continue an unfinished crawl of library instead of starting over
+        """
+        library = library.lower()
+        start = canonical_url(start_url)
+        prefix = canonical_url(prefix or start_url)
+        if start is None or prefix is None:
+            raise ValueError(f"Not an http(s) URL: {start_url}")
+        progress = self._load(library) if resume else None
+        if progress is None or progress.status == "completed" or progress.prefix != prefix:
+            progress = CrawlProgress(library=library, start_url=start, prefix=prefix, pending=[start], seen=[start])
+        progress.status, progress.error, progress.finished_at = "running", None, None
+        progress.started_at = progress.started_at or datetime.now()
+        self._progress[library] = progress
+
+        seen = set(progress.seen)
+        pending = dict.fromkeys(progress.pending)  # ordered set
+        queue: asyncio.Queue = asyncio.Queue()
+        for url in pending:
+            queue.put_nowait(url)
+
+        async def worker():
+            while True:
+                url = await queue.get()
+                try:
+                    await self._visit(progress, url, seen, pending, queue)
+                except asyncio.CancelledError:
+                    raise  # url stays pending and is visited on resume
+                except Exception as e:
+                    progress.errors += 1
+                    print(f"DocCrawler: Failed to crawl {url}: {e}")
+                pending.pop(url, None)
+                queue.task_done()
+                if progress.fetched and progress.fetched % SAVE_EVERY == 0:
+                    await asyncio.to_thread(self._save, progress, set(seen), dict(pending))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.per_host)]
+        try:
+            await queue.join()
+            progress.status = "completed"
+        except asyncio.CancelledError:
+            progress.status = "cancelled"
+            raise
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            progress.finished_at = datetime.now()
+            self._save(progress, seen, pending)
+        return progress
+
+    async def _visit(self, progress: CrawlProgress, url: str, seen: set, pending: dict, queue: asyncio.Queue) -> None:
+        if not await self._allowed(url):
+            progress.blocked += 1
+            return
+        if progress.fetched >= self.max_pages:
+            return  # over the page budget: drain the queue
+        progress.fetched += 1  # counted before the request so concurrent workers respect the budget
+        async with self._host(url):
+            response = await self.client.get(url)
+        if not response.ok:
+            progress.errors += 1
+            return
+
+        canonical, title, text, links = await asyncio.to_thread(parse_page, response.text, url)
+        if canonical != url and in_scope(canonical, progress.prefix):
+            if canonical in seen:
+                progress.duplicates += 1
+                return
+            seen.add(canonical)
+        else:
+            canonical = url
+        changed = await asyncio.to_thread(self.index.add_page, progress.library, canonical, text, title)
+        if changed:
+            progress.indexed += 1
+        else:
+            progress.unchanged += 1
+
+        for link in links:
+            if link not in seen and in_scope(link, progress.prefix):
+                seen.add(link)
+                pending[link] = None
+                queue.put_nowait(link)
+
+    # --- Background crawls ---
+
+    def start(self, sites: Dict[str, str], resume: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Crawl sites (library -> start URL) in background tasks.
+
+        Libraries already being crawled are left alone. Returns their progress.
+        """
+        for library, url in sites.items():
+            library = library.lower()
+            task = self._tasks.get(library)
+            if task is None or task.done():
+                self._tasks[library] = asyncio.create_task(self._run(library, url, resume))
+        status = self.status()
+        return {lib.lower(): status.get(lib.lower(), {"status": "pending"}) for lib in sites}
+
+    async def _run(self, library: str, url: str, resume: bool) -> None:
+        try:
+            await self.crawl(library, url, resume=resume)
+        except Exception as e:
+            print(f"DocCrawler: Crawl of {library} failed: {e}")
+            progress = self._progress.get(library)
+            if progress is not None:
+                progress.status, progress.error = "failed", str(e)
+
+    async def stop(self) -> None:
+        """Cancel background crawls; their progress is saved for resuming."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+# Global documentation crawler
+doc_crawler: DocCrawler = Lazy(DocCrawler)
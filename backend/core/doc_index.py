@@ -0,0 +1,228 @@
+"""Offline full-text index of documentation pages (SQLite FTS5, BM25 ranked)."""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from .config import settings
+from .lazy import Lazy
+
+
+# Landing page of each library's documentation, the one URL it is fetched
+# and indexed under
+DOC_SITES = {
+    'langchain': 'https://python.langchain.com/en/latest/',
+    'nextjs': 'https://nextjs.org/docs',
+    'react': 'https://react.dev',
+    'tailwindcss': 'https://tailwindcss.com/docs',
+    'fastapi': 'https://fastapi.tiangolo.com/en/latest/',
+    'python': 'https://docs.python.org/3/',
+    'nodejs': 'https://nodejs.org/en/docs/',
+    'react-native': 'https://reactnative.dev/docs/getting-started',
+    'flyio': 'https://fly.io/docs/',
+    'github': 'https://docs.github.com/en',
+}
+
+# Pages are split into sections of about this many characters, so results
+# point at the relevant part of a long page
+SECTION_CHARS = 1500
+
+# At most this many query terms are used; long task descriptions are cut
+MAX_QUERY_TERMS = 32
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    library TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_library ON pages (library);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+    title, body, page_id UNINDEXED, tokenize = 'porter unicode61'
+);
+"""
+
+
+def html_to_text(html: str) -> Tuple[str, str]:
+    """(title, visible text with whitespace collapsed) of an HTML page."""
+    return soup_to_text(BeautifulSoup(html, 'html.parser'))
+
+
+def soup_to_text(soup: BeautifulSoup) -> Tuple[str, str]:
+    """Like html_to_text, for a parsed page. Removes the page's scripts and styles."""
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    # Remove script and style
+    for script in soup(['script', 'style', 'noscript']):
+        script.decompose()
+    text = soup.get_text(separator=' ')
+    return title, re.sub(r'\s+', ' ', text).strip()
+
+
+def split_sections(text: str, size: int = SECTION_CHARS) -> List[str]:
+    """Cut text into pieces of about size characters, at sentence or word boundaries."""
+    sections = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            boundary = max(text.rfind(". ", start, end), text.rfind("\n", start, end))
+            if boundary <= start + size // 2:
+                boundary = text.rfind(" ", start, end)
+            if boundary > start + size // 2:
+                end = boundary + 1
+        sections.append(text[start:end].strip())
+        start = end
+    return [s for s in sections if s]
+
+
+def fts_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching any of its terms.
+
+    BM25 ranks sections containing more (and rarer) terms first. Returns
+    None when the text has no searchable terms.
+    """
+    terms = list(dict.fromkeys(t.lower() for t in _TERM.findall(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+@dataclass
+class SearchHit:
+    """One ranked result of DocIndex.search or SemanticIndex.search."""
+
+    source: str  # library of a documentation section, or semantic index source
+    ref: str  # page URL or build step id
+    title: str
+    text: str  # snippet or preview of the match
+    score: float  # BM25 for DocIndex (lower is better), cosine for SemanticIndex (higher is better)
+    body: str = ""  # full text of a documentation section
+
+
+class DocIndex:
+    """Documentation pages stored once and searched offline.
+
+    Pages are added from HTML or plain text, split into sections and kept in
+    an FTS5 table. Re-adding an unchanged page is a no-op; a changed page
+    replaces its old sections.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or settings.backend_root / "cache" / "docs_index.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def add_page(self, library: str, url: str, text: str, title: str = "") -> bool:
+        """Index a page's text.
+
+        Returns:
+            False if the page was already indexed with the same content
+        """
+        library = library.lower()
+        content_hash = hashlib.sha256(f"{title}\0{text}".encode("utf-8")).hexdigest()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT id, content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is not None and row[1] == content_hash:
+                return False
+            if row is not None:
+                self._db.execute("DELETE FROM sections WHERE page_id = ?", (row[0],))
+                self._db.execute("DELETE FROM pages WHERE id = ?", (row[0],))
+            page_id = self._db.execute(
+                "INSERT INTO pages (library, url, title, content_hash, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (library, url, title, content_hash, time.time()),
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO sections (title, body, page_id) VALUES (?, ?, ?)",
+                [(title, section, page_id) for section in split_sections(text)],
+            )
+            return True
+
+    def add_html(self, library: str, url: str, html: str) -> bool:
+        """Index an HTML page. See add_page."""
+        title, text = html_to_text(html)
+        return self.add_page(library, url, text, title)
+
+    def search(self, query: str, libraries: Optional[Iterable[str]] = None, limit: int = 5) -> List[SearchHit]:
+        """Best-matching sections for free-text query, best first.
+
+        Args:
+            query: Words to look for; sections matching more of them rank higher
+            libraries: Only search these libraries (default: all)
+            limit: Maximum number of sections
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        sql = (
+            "SELECT pages.library, pages.url, pages.title,"
+            " snippet(sections, 1, '', '', ' ... ', 32), bm25(sections), sections.body"
+            " FROM sections JOIN pages ON pages.id = sections.page_id"
+            " WHERE sections MATCH ?"
+        )
+        params: list = [match]
+        if libraries is not None:
+            libraries = [lib.lower() for lib in libraries]
+            sql += f" AND pages.library IN ({', '.join('?' * len(libraries))})"
+            params.extend(libraries)
+        sql += " ORDER BY bm25(sections) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def has_library(self, library: str) -> bool:
+        """Whether any page of library is indexed."""
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM pages WHERE library = ? LIMIT 1", (library.lower(),)).fetchone()
+        return row is not None
+
+    def libraries(self) -> Dict[str, int]:
+        """Number of indexed pages per library."""
+        with self._lock:
+            return dict(self._db.execute("SELECT library, COUNT(*) FROM pages GROUP BY library ORDER BY library"))
+
+    def pages(self) -> Dict[str, Tuple[str, str, str]]:
+        """url -> (library, title, content hash) of every indexed page."""
+        with self._lock:
+            rows = self._db.execute("SELECT url, library, title, content_hash FROM pages").fetchall()
+        return {url: (library, title, content_hash) for url, library, title, content_hash in rows}
+
+    def page_sections(self, url: str) -> List[str]:
+        """Text of a page's sections, in page order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT sections.body FROM sections JOIN pages ON pages.id = sections.page_id"
+                " WHERE pages.url = ? ORDER BY sections.rowid",
+                (url,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove_library(self, library: str) -> int:
+        """Drop every page of library. Returns the number of pages removed."""
+        with self._lock, self._db:
+            ids = [row[0] for row in self._db.execute("SELECT id FROM pages WHERE library = ?", (library.lower(),))]
+            for page_id in ids:
+                self._db.execute("DELETE FROM sections WHERE page_id = ?", (page_id,))
+            self._db.execute("DELETE FROM pages WHERE library = ?", (library.lower(),))
+            return len(ids)
+
+
+# Global documentation index
+doc_index: DocIndex = Lazy(DocIndex)
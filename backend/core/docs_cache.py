@@ -0,0 +1,277 @@
+"""Size- and age-bounded disk cache of documentation pages."""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+from .lazy import Lazy
+
+
+INDEX_FILE = "index.json"
+
+# Access times are written back at most this often; stores and evictions
+# are written at once
+FLUSH_INTERVAL = 60.0
+
+
+class DocsCache:
+    """Documentation pages on disk, bounded by total size and by age.
+
+    Each URL owns a group of files named after the hash of the URL: the
+    page HTML and any text derived from it. An entry younger than its TTL
+    is fresh. An older entry is still served, and is refreshed in the
+    background when the caller passes a fetch function
+    (stale-while-revalidate). Entries older than max_age are never served
+    and are deleted. When the files outgrow max_bytes, the least recently
+    used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_age: Optional[float] = None,
+    ):
+        self.cache_dir = Path(cache_dir or settings.backend_root / "cache" / "docs")
+        self.max_bytes = max_bytes if max_bytes is not None else settings.docs_cache_max_bytes
+        self.ttl = ttl if ttl is not None else settings.docs_cache_ttl_seconds
+        self.max_age = max_age if max_age is not None else settings.docs_cache_max_age_seconds
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._last_flush = time.time()
+        self._dirty = False
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        # url hash -> {"url", "fetched_at", "accessed_at", "ttl", "files": {suffix: size}}
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self.prune()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def path(self, url: str, suffix: str = ".html") -> Path:
+        """Where the file of url with this suffix is (or would be) stored."""
+        return self.cache_dir / f"{self._key(url)}{suffix}"
+
+    # --- Index ---
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.cache_dir / INDEX_FILE) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+
+        # The directory is the source of truth: drop entries whose files are
+        # gone and adopt files written without the index (older versions)
+        files: Dict[str, Dict[str, os.stat_result]] = {}
+        for path in self.cache_dir.iterdir():
+            if path.name == INDEX_FILE or path.name.endswith(".tmp") or "." not in path.name[1:]:
+                continue
+            key, suffix = path.name.split(".", 1)
+            files.setdefault(key, {})[f".{suffix}"] = path.stat()
+
+        loaded = {}
+        for key, stats in files.items():
+            entry = entries.get(key)
+            if entry is None:
+                mtime = max(stat.st_mtime for stat in stats.values())
+                entry = {"url": None, "fetched_at": mtime, "accessed_at": mtime, "ttl": None}
+            entry["files"] = {suffix: stat.st_size for suffix, stat in stats.items()}
+            loaded[key] = entry
+        return loaded
+
+    def _save(self) -> None:
+        temp = self.cache_dir / f"{INDEX_FILE}.tmp"
+        with open(temp, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(temp, self.cache_dir / INDEX_FILE)
+        self._last_flush = time.time()
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Write pending access times to disk."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    # --- Entries ---
+
+    @property
+    def _bytes(self) -> int:
+        return sum(sum(entry["files"].values()) for entry in self._entries.values())
+
+    def _age(self, entry: Dict[str, Any]) -> float:
+        return time.time() - entry["fetched_at"]
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        ttl = entry.get("ttl")
+        return self._age(entry) < (ttl if ttl is not None else self.ttl)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for suffix in entry["files"]:
+            (self.cache_dir / f"{key}{suffix}").unlink(missing_ok=True)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        total = self._bytes
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["accessed_at"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= sum(self._entries[key]["files"].values())
+            self._remove(key)
+            self.evictions += 1
+
+    def lookup(
+        self,
+        url: str,
+        suffix: str = ".html",
+        refresh: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> Optional[Path]:
+        """Path of url's cached file with this suffix, or None on a miss.
+
+        Records the access for LRU eviction. An entry past max_age is deleted
+        and counts as a miss.
+
+        Args:
+            url: Page URL
+            suffix: ".html" for the page itself, or the suffix of a derived file
+            refresh: Downloads the page HTML; if the entry is stale it is
+                called in a background thread and the stale file is served
+        """
+        key = self._key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._age(entry) >= self.max_age:
+                self._remove(key)
+                self.expirations += 1
+                self._save()
+                entry = None
+            if entry is None or suffix not in entry["files"]:
+                self.misses += 1
+                return None
+            entry["accessed_at"] = time.time()
+            entry["url"] = url
+            self._dirty = True
+            if self._fresh(entry):
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if refresh is not None and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(url, refresh), daemon=True).start()
+            if time.time() - self._last_flush >= FLUSH_INTERVAL:
+                self._save()
+        return self.cache_dir / f"{key}{suffix}"
+
+    def _refresh(self, url: str, fetch: Callable[[str], Optional[str]]) -> None:
+        refreshed = False
+        try:
+            content = fetch(url)
+            if content is not None:
+                self.write(url, ".html", content)
+                refreshed = True
+        except Exception:
+            pass
+        with self._lock:
+            self._refreshing.discard(self._key(url))
+            if refreshed:
+                self.refreshes += 1
+            else:
+                self.refresh_errors += 1
+
+    def write(self, url: str, suffix: str, content: str, ttl: Optional[float] = None) -> Path:
+        """Store a file of url and return its path.
+
+        Writing the page itself (".html") starts a new generation of the
+        entry: it becomes fresh again and, if the HTML changed, files derived
+        from the old HTML are deleted.
+
+        Args:
+            url: Page URL
+            suffix: ".html" for the page, another suffix for text derived from it
+            content: File content
+            ttl: Seconds this entry stays fresh (default: the cache's TTL)
+        """
+        key = self._key(url)
+        path = self.cache_dir / f"{key}{suffix}"
+        data = content.encode("utf-8")
+        with self._lock:
+            now = time.time()
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {"url": url, "fetched_at": now, "accessed_at": now, "ttl": ttl, "files": {}}
+            if suffix == ".html":
+                unchanged = ".html" in entry["files"] and path.exists() and path.read_bytes() == data
+                if not unchanged:
+                    for derived in [s for s in entry["files"] if s != ".html"]:
+                        (self.cache_dir / f"{key}{derived}").unlink(missing_ok=True)
+                        del entry["files"][derived]
+                entry["fetched_at"] = now
+                if ttl is not None:
+                    entry["ttl"] = ttl
+            entry.update(url=url, accessed_at=now)
+            temp = path.with_name(path.name + ".tmp")
+            temp.write_bytes(data)
+            os.replace(temp, path)
+            entry["files"][suffix] = len(data)
+            self._evict(keep=key)
+            self._save()
+        return path
+
+    def prune(self) -> int:
+        """Delete entries past max_age and evict down to max_bytes. Returns the number removed."""
+        with self._lock:
+            before = len(self._entries)
+            for key in [k for k, entry in self._entries.items() if self._age(entry) >= self.max_age]:
+                self._remove(key)
+                self.expirations += 1
+            self._evict()
+            self._save()
+            return before - len(self._entries)
+
+    def clear(self) -> None:
+        """Delete every cached page and its derived files."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "refreshing": len(self._refreshing),
+                "entries": len(self._entries),
+                "stale_entries": sum(1 for entry in self._entries.values() if not self._fresh(entry)),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "max_age_seconds": self.max_age,
+            }
+
+
+# Global documentation page cache
+docs_cache: DocsCache = Lazy(DocsCache)
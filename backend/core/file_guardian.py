@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 import json
+from .lazy import Lazy
 
 
 # Core files that define Auto's identity and architecture.
@@ -58,7 +59,8 @@ class PendingApproval(BaseModel):
     """A queued file write awaiting human approval."""
     id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
     file_path: str
-    content: str
+    content: str = ""  # full new content (empty when a patch is stored instead)
+    patch: Optional[str] = None  # unified diff or SEARCH/REPLACE blocks, applied on approval
     reason: str = ""
     requested_at: datetime = Field(default_factory=datetime.now)
     status: str = "pending"  # pending, approved, denied
@@ -118,12 +120,23 @@ class FileGuardian:
         except Exception as e:
             print(f"Failed to save approvals to disk: {e}")
 
-    async def request_approval(self, file_path: str, content: str, reason: str = "") -> PendingApproval:
-        """Queue a write for human approval. Returns the pending approval."""
+    async def request_approval(
+        self,
+        file_path: str,
+        content: str = "",
+        reason: str = "",
+        patch: Optional[str] = None,
+    ) -> PendingApproval:
+        """Queue a write for human approval. Returns the pending approval.
+
+        Either the full new content or a patch is stored; a patch is applied
+        to the file as it is at approval time.
+        """
         async with self._lock:
             approval = PendingApproval(
                 file_path=file_path,
                 content=content,
+                patch=patch,
                 reason=reason,
             )
             self._approvals[approval.id] = approval
@@ -177,5 +190,5 @@ class FileGuardian:
             return len(resolved)
 
 
-# Global instance
-file_guardian = FileGuardian()
+# Global instance (approvals are loaded from disk on first use)
+file_guardian: FileGuardian = Lazy(FileGuardian)
@@ -0,0 +1,337 @@
+"""In-process index of the repository's files, kept fresh by an mtime poller."""
+import asyncio
+import fnmatch
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .config import settings
+from .lazy import Lazy
+
+
+# Always skipped, in addition to the patterns in the root .gitignore
+DEFAULT_IGNORES = [
+    ".git/",
+    "node_modules/",
+    "__pycache__/",
+    ".next/",
+    ".venv/",
+    "venv/",
+    ".pytest_cache/",
+    ".mypy_cache/",
+    ".ruff_cache/",
+    "*.py[cod]",
+    "/backend/cache/",
+]
+
+
+class IgnoreRules:
+    """A small subset of .gitignore semantics.
+
+    Supports comments, trailing "/" for directory-only patterns, leading "/"
+    (or an inner "/") to anchor a pattern at the root, and fnmatch globs.
+    Negations ("!pattern") are not supported and are skipped.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._rules: List[Tuple[str, bool, bool]] = []  # (pattern, anchored, dir_only)
+        for line in patterns:
+            line = line.strip()
+            if not line or line.startswith("#") or line.startswith("!"):
+                continue
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            self._rules.append((line.lstrip("/"), anchored, dir_only))
+
+    @classmethod
+    def for_root(cls, root: Path) -> "IgnoreRules":
+        patterns = list(DEFAULT_IGNORES)
+        gitignore = root / ".gitignore"
+        if gitignore.exists():
+            patterns.extend(gitignore.read_text(encoding="utf-8", errors="replace").splitlines())
+        return cls(patterns)
+
+    def match(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether rel_path (posix, relative to the root) is ignored."""
+        name = rel_path.rsplit("/", 1)[-1]
+        for pattern, anchored, dir_only in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatch.fnmatchcase(rel_path if anchored else name, pattern):
+                return True
+        return False
+
+
+class FileEntry:
+    """An indexed file."""
+
+    __slots__ = ("path", "size", "mtime_ns", "_sha256")
+
+    def __init__(self, path: str, size: int, mtime_ns: int):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._sha256: Optional[str] = None
+
+
+class DirEntry:
+    """An indexed directory and the names it contains."""
+
+    __slots__ = ("mtime_ns", "files", "dirs")
+
+    def __init__(self, mtime_ns: int, files: Set[str], dirs: Set[str]):
+        self.mtime_ns = mtime_ns
+        self.files = files
+        self.dirs = dirs
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+def _normalize(path: str) -> str:
+    """Turn a user-supplied relative path into the index's posix form."""
+    normalized = os.path.normpath(path.replace("\\", "/")).replace("\\", "/")
+    return "" if normalized == "." else normalized.lstrip("/")
+
+
+class FileIndex:
+    """Index of every non-ignored file under the project root.
+
+    Holds each file's size, mtime and (lazily computed) SHA-256, plus the
+    contents of every directory, so existence checks, directory listings and
+    suffix queries are answered without touching the filesystem.
+
+    The index is refreshed by a background poller once start() is called.
+    Without a poller, lookups rescan whenever the last scan is older than the
+    poll interval. Rescans only re-list directories whose mtime changed, but
+    stat every indexed file to catch in-place edits.
+    """
+
+    def __init__(self, root: Optional[Path] = None, poll_interval: Optional[float] = None):
+        self.root = Path(root or settings.project_root).resolve()
+        self.poll_interval = poll_interval if poll_interval is not None else settings.file_index_poll_seconds
+        self.ignore = IgnoreRules.for_root(self.root)
+        self._files: Dict[str, FileEntry] = {}
+        self._dirs: Dict[str, DirEntry] = {}
+        self._by_suffix: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._scanned_at: Optional[float] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    # --- Scanning ---
+
+    def _add_file(self, rel: str, stat: os.stat_result) -> bool:
+        """Record a file. Returns True if it is new or changed."""
+        entry = self._files.get(rel)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return False
+        self._files[rel] = FileEntry(rel, stat.st_size, stat.st_mtime_ns)
+        self._by_suffix.setdefault(Path(rel).suffix.lower(), set()).add(rel)
+        return True
+
+    def _remove_file(self, rel: str) -> None:
+        if self._files.pop(rel, None) is not None:
+            self._by_suffix.get(Path(rel).suffix.lower(), set()).discard(rel)
+
+    def _list_dir(self, rel: str, mtime_ns: int) -> DirEntry:
+        files, dirs = set(), set()
+        with os.scandir(self.root / rel if rel else self.root) as entries:
+            for entry in entries:
+                child = _join(rel, entry.name)
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if self.ignore.match(child, is_dir):
+                    continue
+                if is_dir:
+                    dirs.add(entry.name)
+                elif entry.is_file():
+                    files.add(entry.name)
+        return DirEntry(mtime_ns, files, dirs)
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the filesystem.
+
+        Returns:
+            Number of files added, changed or removed
+        """
+        with self._lock:
+            changes = 0
+            seen_dirs: Set[str] = set()
+            seen_files: Set[str] = set()
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                try:
+                    mtime_ns = os.stat(self.root / rel if rel else self.root).st_mtime_ns
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                directory = self._dirs.get(rel)
+                if directory is None or directory.mtime_ns != mtime_ns:
+                    try:
+                        directory = self._list_dir(rel, mtime_ns)
+                    except OSError:
+                        continue
+                    self._dirs[rel] = directory
+                seen_dirs.add(rel)
+                for name in directory.files:
+                    child = _join(rel, name)
+                    try:
+                        stat = os.stat(self.root / child)
+                    except FileNotFoundError:
+                        continue
+                    seen_files.add(child)
+                    changes += self._add_file(child, stat)
+                stack.extend(_join(rel, name) for name in directory.dirs)
+
+            for rel in set(self._dirs) - seen_dirs:
+                del self._dirs[rel]
+            for rel in set(self._files) - seen_files:
+                self._remove_file(rel)
+                changes += 1
+            self._scanned_at = time.monotonic()
+            return changes
+
+    def update_path(self, path: str) -> None:
+        """Re-index one file right after it was written or deleted."""
+        rel = _normalize(path)
+        if not rel or self.is_ignored(rel):
+            return
+        with self._lock:
+            if self._scanned_at is None:
+                return  # The first scan will pick it up
+            full_path = self.root / rel
+            parts = rel.split("/")
+            if full_path.is_file():
+                # Register any new parent directories
+                for depth in range(len(parts)):
+                    parent = "/".join(parts[:depth])
+                    directory = self._dirs.get(parent)
+                    if directory is None:
+                        directory = self._dirs[parent] = DirEntry(0, set(), set())
+                    if depth < len(parts) - 1:
+                        directory.dirs.add(parts[depth])
+                    else:
+                        directory.files.add(parts[depth])
+                self._add_file(rel, full_path.stat())
+            else:
+                self._remove_file(rel)
+                parent = self._dirs.get("/".join(parts[:-1]))
+                if parent is not None:
+                    parent.files.discard(parts[-1])
+
+    def _ensure_fresh(self) -> None:
+        if self._scanned_at is None:
+            self.refresh()
+        elif self._poller is None and time.monotonic() - self._scanned_at > self.poll_interval:
+            self.refresh()
+
+    async def start(self) -> None:
+        """Scan once and keep the index fresh in the background."""
+        if self._poller is not None:
+            return
+        await asyncio.to_thread(self.refresh)
+        self._poller = asyncio.ensure_future(self._poll())
+
+    async def stop(self) -> None:
+        poller, self._poller = self._poller, None
+        if poller is not None:
+            poller.cancel()
+            await asyncio.gather(poller, return_exceptions=True)
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"File index refresh failed: {e}")
+
+    # --- Queries ---
+
+    def is_ignored(self, path: str) -> bool:
+        """Whether path, or any directory above it, is excluded from the index."""
+        parts = _normalize(path).split("/")
+        if parts[0] == "..":
+            return True
+        for depth in range(1, len(parts) + 1):
+            if self.ignore.match("/".join(parts[:depth]), is_dir=depth < len(parts)):
+                return True
+        return False
+
+    def get(self, path: str) -> Optional[FileEntry]:
+        """Return the entry for a file, or None if it is not indexed."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._files.get(_normalize(path))
+
+    def is_dir(self, path: str) -> bool:
+        with self._lock:
+            self._ensure_fresh()
+            return _normalize(path) in self._dirs
+
+    def exists(self, path: str) -> bool:
+        """Whether path is an indexed file or directory."""
+        rel = _normalize(path)
+        with self._lock:
+            self._ensure_fresh()
+            return rel in self._files or rel in self._dirs
+
+    def list_dir(self, path: str = "") -> Optional[List[Tuple[str, bool]]]:
+        """List a directory as sorted (name, is_dir) pairs, or None if it is not indexed."""
+        with self._lock:
+            self._ensure_fresh()
+            directory = self._dirs.get(_normalize(path))
+            if directory is None:
+                return None
+            items = [(name, True) for name in directory.dirs] + [(name, False) for name in directory.files]
+        return sorted(items)
+
+    def files(self, suffixes: Optional[Iterable[str]] = None, under: str = "") -> List[str]:
+        """Return sorted paths of indexed files, optionally filtered.
+
+        Args:
+            suffixes: File extensions to include, e.g. [".py"]
+            under: Only return files below this directory
+        """
+        prefix = _normalize(under)
+        prefix = f"{prefix}/" if prefix else ""
+        with self._lock:
+            self._ensure_fresh()
+            if suffixes is None:
+                candidates: Iterable[str] = self._files
+            else:
+                candidates = [p for s in suffixes for p in self._by_suffix.get(s.lower(), ())]
+            return sorted(p for p in candidates if p.startswith(prefix))
+
+    def entries(self, suffixes: Optional[Iterable[str]] = None) -> List[FileEntry]:
+        """Snapshot of the indexed file entries, optionally filtered by suffix."""
+        with self._lock:
+            self._ensure_fresh()
+            if suffixes is None:
+                return list(self._files.values())
+            return [self._files[p] for s in suffixes for p in self._by_suffix.get(s.lower(), ())]
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """SHA-256 of a file's content, computed once per indexed version."""
+        entry = self.get(path)
+        if entry is None:
+            return None
+        if entry._sha256 is None:
+            digest = hashlib.sha256()
+            with open(self.root / entry.path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            entry._sha256 = digest.hexdigest()
+        return entry._sha256
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._files)
+
+
+# Global file index instance (polling starts with the API server)
+file_index: FileIndex = Lazy(FileIndex)
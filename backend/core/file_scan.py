@@ -0,0 +1,68 @@
+"""Per-file analysis of the repository, cached by content hash and fanned out to a process pool."""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .file_index import file_index, FileIndex
+
+
+# Fewer changed files than this are analyzed in-process; the pool only pays off for more
+INLINE_THRESHOLD = 8
+
+
+class CachedFileScanner:
+    """Base for indexes that analyze every file on its own.
+
+    A file's analysis is cached by (path, content hash), so a rescan only
+    analyzes the files that changed since the last one. Large batches of
+    changed files are analyzed in a process pool, started on first use.
+    Subclasses hold self._lock around a scan.
+    """
+
+    def __init__(self, files: Optional[FileIndex] = None, workers: Optional[int] = None):
+        self.files = files or file_index
+        self.workers = workers or min(os.cpu_count() or 1, 8)
+        # (path, sha256) -> analysis
+        self._cache: Dict[Tuple[str, str], Any] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _scan(self, paths: Iterable[str], analyze: Callable[[Tuple[str, str]], Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """Analysis of every indexed file among paths, and the paths analyzed in this call.
+
+        Args:
+            paths: Files relative to the project root
+            analyze: Module-level (picklable) function of (path, absolute path)
+        """
+        keys = {}
+        for path in paths:
+            digest = self.files.content_hash(path)
+            if digest is not None:
+                keys[path] = (path, digest)
+
+        todo = [path for path, key in keys.items() if key not in self._cache]
+        jobs = [(path, str(self.files.root / path)) for path in todo]
+        if len(jobs) < INLINE_THRESHOLD:
+            results = [analyze(job) for job in jobs]
+        else:
+            results = list(self._get_pool().map(analyze, jobs, chunksize=max(len(jobs) // (self.workers * 4), 1)))
+        for path, result in zip(todo, results):
+            self._cache[keys[path]] = result
+
+        # Forget analyses of content that no longer exists
+        live = set(keys.values())
+        for key in [k for k in self._cache if k[0] in keys and k not in live]:
+            del self._cache[key]
+
+        return {path: self._cache[key] for path, key in keys.items()}, todo
@@ -0,0 +1,138 @@
+"""Non-blocking, ranged file reads and transactional writes for agent tools."""
+import asyncio
+import mmap
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .content_cache import content_cache
+
+
+# Files at least this large are sliced through mmap instead of being read whole
+MMAP_THRESHOLD = 1024 * 1024
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class FileSlice:
+    """Part of a text file returned by read_text_range."""
+
+    def __init__(self, text: str, size: int, truncated: bool):
+        self.text = text
+        self.size = size  # size of the whole file in bytes
+        self.truncated = truncated  # max_bytes cut the requested range short
+
+
+def _line_offset(data: Buffer, line: int, start: int = 0) -> int:
+    """Byte offset where the line-th line after start begins (1-based)."""
+    pos = start
+    for _ in range(line - 1):
+        newline = data.find(b"\n", pos)
+        if newline == -1:
+            return len(data)
+        pos = newline + 1
+    return pos
+
+
+def _slice(data: Buffer, start_line: Optional[int], end_line: Optional[int], max_bytes: Optional[int]) -> Tuple[bytes, bool]:
+    """Cut lines start_line..end_line (inclusive) out of data, at most max_bytes long."""
+    first = max(start_line or 1, 1)
+    start = _line_offset(data, first)
+    end = len(data)
+    if end_line is not None:
+        end = _line_offset(data, end_line - first + 2, start) if end_line >= first else start
+
+    truncated = False
+    if max_bytes is not None and end - start > max_bytes:
+        truncated = True
+        end = start + max_bytes
+        # Prefer to stop at a line boundary
+        newline = data.rfind(b"\n", start, end)
+        if newline > start:
+            end = newline + 1
+    return data[start:end], truncated
+
+
+def _read_mapped(path: Union[str, os.PathLike], start_line: Optional[int], end_line: Optional[int], max_bytes: Optional[int]) -> Tuple[bytes, bool]:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _slice(data, start_line, end_line, max_bytes)
+
+
+async def read_text_range(
+    path: Union[str, os.PathLike],
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> FileSlice:
+    """Read part of a text file without blocking the event loop.
+
+    Args:
+        path: File to read
+        start_line: First line to return, 1-based (default: first line)
+        end_line: Last line to return, inclusive (default: last line)
+        max_bytes: Maximum bytes returned; cut at a line boundary when possible
+
+    Returns:
+        FileSlice with the decoded text
+    """
+    stat = await asyncio.to_thread(os.stat, path)
+    if stat.st_size >= MMAP_THRESHOLD:
+        # Only the pages covering the requested range are touched
+        data, truncated = await asyncio.to_thread(_read_mapped, path, start_line, end_line, max_bytes)
+    else:
+        # Smaller files are shared between agents through the content cache
+        data, truncated = _slice(await content_cache.read(path, stat), start_line, end_line, max_bytes)
+    return FileSlice(data.decode("utf-8", errors="replace"), stat.st_size, truncated)
+
+
+def write_files_atomically(root: Union[str, os.PathLike], changes: Dict[str, str]) -> None:
+    """Write several text files as one transaction.
+
+    Every file is first written to a temporary file next to its target; the
+    targets are only replaced once all of them were written. If anything
+    fails, files already replaced get their previous content back, new files
+    and directories are removed, and the error is re-raised.
+
+    Args:
+        root: Directory the paths are relative to
+        changes: Mapping of relative path to new content
+    """
+    root = Path(root)
+    created_dirs: List[Path] = []
+    staged: List[Tuple[Path, Path]] = []  # (temp file, target)
+    backups: List[Tuple[Path, Optional[bytes]]] = []  # previous content of replaced targets
+    try:
+        for rel_path, content in changes.items():
+            target = root / rel_path
+            missing = [p for p in reversed(target.parents) if not p.exists()]
+            for directory in missing:
+                directory.mkdir()
+                created_dirs.append(directory)
+            temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+            staged.append((temp, target))
+            with open(temp, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        for temp, target in staged:
+            previous = target.read_bytes() if target.exists() else None
+            os.replace(temp, target)
+            backups.append((target, previous))
+    except BaseException:
+        for target, previous in reversed(backups):
+            try:
+                if previous is None:
+                    target.unlink()
+                else:
+                    target.write_bytes(previous)
+            except OSError as e:
+                print(f"Rollback of {target} failed: {e}")
+        for temp, _ in staged:
+            temp.unlink(missing_ok=True)
+        for directory in reversed(created_dirs):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+        raise
@@ -0,0 +1,345 @@
+"""Pooled HTTP client with a conditional-request cache on local disk."""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .config import settings
+from .lazy import Lazy
+
+
+# Identifies documentation requests (and matches robots.txt rules for this product)
+USER_AGENT = "self-building-system-docs/1.0"
+
+class HostGate:
+    """Limits concurrent requests to one host and spaces out their starts.
+
+    One gate per host is shared by every caller of CachedHttpClient.host(),
+    so the crawler, the research agent and the doc search tools never hit
+    a host faster than delay between them. Coroutines use "async with",
+    which also holds one of limit slots; threads call wait().
+    """
+
+    def __init__(self, limit: int, delay: float):
+        self.limit = limit
+        self.delay = delay
+        self._next = 0.0
+        self._lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _reserve(self) -> float:
+        """Take the next start slot if it is due; otherwise seconds until it is."""
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._next:
+                # The next slot counts from when this request really starts
+                self._next = now + self.delay
+                return 0.0
+            return self._next - now
+
+    def wait(self) -> None:
+        """Block the calling thread until a request may start."""
+        while True:
+            pause = self._reserve()
+            if not pause:
+                return
+            time.sleep(pause)
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A semaphore is bound to the event loop it is first used on
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        await self._semaphore.acquire()
+        try:
+            # Re-check after every sleep: timers may fire slightly early, and
+            # another request may have taken the slot meanwhile
+            while True:
+                pause = self._reserve()
+                if not pause:
+                    break
+                await asyncio.sleep(pause)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+class CachedResponse:
+    """Body and provenance of a GET served by CachedHttpClient."""
+
+    def __init__(self, url: str, status: int, body: bytes, encoding: Optional[str], source: str):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.encoding = encoding
+        self.source = source  # "cache", "revalidated", "network" or "stale"
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+
+class CachedHttpClient:
+    """Shares one pooled aiohttp session and caches 200 responses on disk.
+
+    A cached response younger than the TTL is served without touching the
+    network. Older entries are revalidated with If-None-Match and
+    If-Modified-Since, so an unchanged page costs a 304 on a pooled
+    connection rather than a full download. If the server cannot be reached
+    or fails with a 5xx, a stale copy is served. Concurrent requests for the same URL share one
+    download.
+
+    Like the docs page cache, the disk cache is bounded: responses older
+    than max_age are deleted and never served, and when the files outgrow
+    max_bytes the least recently used responses are evicted.
+
+    Callers space out their downloads with host(url), a gate shared by
+    every request to that host.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        per_host: Optional[int] = None,
+        delay: Optional[float] = None,
+    ):
+        self.cache_dir = Path(cache_dir or settings.backend_root / "cache" / "http")
+        self.ttl = ttl if ttl is not None else settings.http_cache_ttl_seconds
+        self.max_bytes = max_bytes if max_bytes is not None else settings.http_cache_max_bytes
+        self.max_age = max_age if max_age is not None else settings.http_cache_max_age_seconds
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.per_host = per_host or settings.http_requests_per_host
+        self.delay = delay if delay is not None else settings.http_host_delay_seconds
+        self._hosts: Dict[str, HostGate] = {}
+        self._lock = threading.Lock()
+        # url hash -> [bytes on disk, last access], read from the directory on first use
+        self._entries: Optional[Dict[str, List[float]]] = None
+        self.stats = {"cache": 0, "revalidated": 0, "network": 0, "stale": 0, "errors": 0, "evictions": 0, "expirations": 0}
+
+    # --- Session ---
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # A session is bound to the event loop it was created on
+            connector = aiohttp.TCPConnector(
+                limit=settings.http_max_connections,
+                limit_per_host=settings.http_connections_per_host,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.http_timeout_seconds),
+                headers={"User-Agent": USER_AGENT},
+            )
+            self._loop = loop
+            self._in_flight = {}
+        return self._session
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def host(self, url: str) -> HostGate:
+        """The gate shared by every request to the host of url."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            gate = self._hosts.get(host)
+            if gate is None:
+                gate = self._hosts[host] = HostGate(self.per_host, self.delay)
+        return gate
+
+    # --- Disk cache ---
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json", self.cache_dir / f"{digest}.body"
+
+    def _index(self) -> Dict[str, List[float]]:
+        if self._entries is None:
+            entries: Dict[str, List[float]] = {}
+            if self.cache_dir.exists():
+                for path in self.cache_dir.iterdir():
+                    if path.suffix not in (".json", ".body"):
+                        continue
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entry = entries.setdefault(path.stem, [0, 0.0])
+                    entry[0] += stat.st_size
+                    entry[1] = max(entry[1], stat.st_mtime)
+            self._entries = entries
+        return self._entries
+
+    def _remove(self, digest: str) -> None:
+        self._index().pop(digest, None)
+        for suffix in (".json", ".body"):
+            (self.cache_dir / f"{digest}{suffix}").unlink(missing_ok=True)
+
+    def _evict(self, keep: str) -> None:
+        entries = self._index()
+        total = sum(size for size, _ in entries.values())
+        for digest in sorted(entries, key=lambda d: entries[d][1]):
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            total -= entries[digest][0]
+            self._remove(digest)
+            self.stats["evictions"] += 1
+
+    def _load(self, url: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            meta["body"] = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        with self._lock:
+            if time.time() - meta["fetched_at"] >= self.max_age:
+                self._remove(meta_path.stem)
+                self.stats["expirations"] += 1
+                return None
+            entry = self._index().get(meta_path.stem)
+            if entry is not None:
+                entry[1] = time.time()
+        return meta
+
+    def _store(self, url: str, meta: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        meta_path, body_path = self._paths(url)
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if body is not None:
+                temp = body_path.with_suffix(".tmp")
+                temp.write_bytes(body)
+                os.replace(temp, body_path)
+            temp = meta_path.with_suffix(".tmp")
+            with open(temp, "w") as f:
+                json.dump({k: v for k, v in meta.items() if k != "body"}, f)
+            os.replace(temp, meta_path)
+            size = sum(path.stat().st_size for path in (meta_path, body_path) if path.exists())
+            self._index()[meta_path.stem] = [size, time.time()]
+            self._evict(keep=meta_path.stem)
+
+    def clear(self) -> None:
+        """Delete every cached response."""
+        with self._lock:
+            if self.cache_dir.exists():
+                for path in self.cache_dir.iterdir():
+                    if path.suffix in (".json", ".body", ".tmp"):
+                        path.unlink(missing_ok=True)
+            self._entries = {}
+
+    # --- Requests ---
+
+    async def get(self, url: str) -> CachedResponse:
+        """GET url, from the cache when possible.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: if the request fails and nothing is cached
+        """
+        self._get_session()  # also forgets requests in flight on a previous event loop
+        pending = self._in_flight.get(url)
+        while pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The caller that started the download was cancelled, not
+                # this one: start a download of our own
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            pending = self._in_flight.get(url)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            response = await self._get(url)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            self._in_flight.pop(url, None)
+
+    async def _get(self, url: str) -> CachedResponse:
+        entry = await asyncio.to_thread(self._load, url)
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            self.stats["cache"] += 1
+            return CachedResponse(url, 200, entry["body"], entry.get("encoding"), "cache")
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            elif not entry.get("etag"):
+                headers["If-Modified-Since"] = formatdate(entry["fetched_at"], usegmt=True)
+
+        try:
+            async with self._get_session().get(url, headers=headers) as resp:
+                if resp.status == 304 and entry is not None:
+                    entry["fetched_at"] = time.time()
+                    await asyncio.to_thread(self._store, url, entry)
+                    self.stats["revalidated"] += 1
+                    return CachedResponse(url, 200, entry["body"], entry.get("encoding"), "revalidated")
+                if resp.status >= 500 and entry is not None:
+                    self.stats["stale"] += 1
+                    return CachedResponse(url, 200, entry["body"], entry.get("encoding"), "stale")
+                body = await resp.read()
+                encoding = resp.get_encoding() if resp.status == 200 else None
+                no_store = "no-store" in resp.headers.get("Cache-Control", "")
+                if resp.status == 200 and not no_store:
+                    meta = {
+                        "url": url,
+                        "fetched_at": time.time(),
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                        "encoding": encoding,
+                    }
+                    await asyncio.to_thread(self._store, url, meta, body)
+                self.stats["network"] += 1
+                return CachedResponse(url, resp.status, body, encoding, "network")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.stats["errors"] += 1
+            if entry is None:
+                raise
+            self.stats["stale"] += 1
+            return CachedResponse(url, 200, entry["body"], entry.get("encoding"), "stale")
+
+
+# Global HTTP client for documentation lookups
+http_client: CachedHttpClient = Lazy(CachedHttpClient)
@@ -0,0 +1,248 @@
+"""Persistent job queue and bounded worker pool for orchestrator tasks."""
+import asyncio
+import itertools
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pydantic import BaseModel, Field
+from .config import settings
+from .lazy import Lazy
+from .tasks import task_registry, TaskCancelled, DeadlineExceeded
+
+
+# Statuses a job can be in; the last three are final
+JOB_STATUSES = ["queued", "running", "completed", "failed", "cancelled"]
+FINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+# A job interrupted by this many restarts is failed instead of retried again
+MAX_ATTEMPTS = 3
+
+
+class Job(BaseModel):
+    """A task submitted to the job queue."""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    task: str
+    context: Dict[str, Any] = Field(default_factory=dict)
+    priority: int = 0  # higher runs first
+    timeout: Optional[float] = None
+    status: str = "queued"  # queued, running, completed, failed, cancelled
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    submitted_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+JobRunner = Callable[[Job], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """Priority job queue served by a bounded pool of workers.
+
+    Jobs are persisted to disk on every status change, so queued jobs (and
+    jobs that were running when the process stopped) are picked up again
+    after a restart.
+    """
+
+    def __init__(self, jobs_file: Optional[Path] = None, workers: Optional[int] = None, max_queued: Optional[int] = None):
+        self.jobs_file = jobs_file or (settings.memory_dir / "jobs.json")
+        self.workers = workers or settings.max_concurrent_jobs
+        self.max_queued = max_queued or settings.max_queued_jobs
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._counter = itertools.count()
+        self._done: Dict[str, asyncio.Event] = {}
+        self._workers: List[asyncio.Task] = []
+        self._runner: Optional[JobRunner] = None
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def _load(self) -> None:
+        """Load persisted jobs, re-queueing anything that had not finished."""
+        if not self.jobs_file.exists():
+            return
+        try:
+            with open(self.jobs_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Failed to load jobs from disk: {e}")
+            return
+        for item in data:
+            job = Job.model_validate(item)
+            if job.status == "running":
+                # Interrupted by a restart
+                if job.attempts >= MAX_ATTEMPTS:
+                    job.status = "failed"
+                    job.error = f"Interrupted {job.attempts} times by server restarts"
+                    job.finished_at = datetime.now()
+                else:
+                    job.status = "queued"
+            self._jobs[job.id] = job
+
+    def _save(self) -> None:
+        """Persist jobs atomically, keeping a bounded history of finished ones."""
+        finished = sorted(
+            (j for j in self._jobs.values() if j.status in FINAL_STATUSES),
+            key=lambda j: j.finished_at or j.submitted_at,
+        )
+        for job in finished[:-settings.job_history_limit or None]:
+            del self._jobs[job.id]
+            self._done.pop(job.id, None)
+        try:
+            data = [j.model_dump(mode="json") for j in self._jobs.values()]
+            tmp_file = self.jobs_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, default=str, indent=2)
+            tmp_file.replace(self.jobs_file)
+        except Exception as e:
+            print(f"Failed to save jobs to disk: {e}")
+
+    def _enqueue(self, job: Job) -> None:
+        self._done.setdefault(job.id, asyncio.Event())
+        self._queue.put_nowait((-job.priority, next(self._counter), job.id))
+
+    async def start(self, runner: JobRunner) -> None:
+        """Load persisted jobs and start the worker pool.
+
+        Args:
+            runner: Coroutine function that executes a job and returns its result
+        """
+        if self.started:
+            return
+        self._runner = runner
+        self._queue = asyncio.PriorityQueue()
+        self._load()
+        for job in sorted(self._jobs.values(), key=lambda j: j.submitted_at):
+            if job.status == "queued":
+                self._enqueue(job)
+        self._save()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers. Running jobs stay 'running' on disk and resume after restart."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def submit(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        job_id: Optional[str] = None,
+    ) -> Job:
+        """Queue a task and return its job immediately.
+
+        Args:
+            task: Task description for the runner
+            context: Additional context passed through to the runner
+            priority: Higher priorities are served first
+            timeout: Deadline in seconds once the job starts
+            job_id: Client-chosen job id, generated if omitted
+
+        Raises:
+            QueueFull: if max_queued jobs are already waiting
+            ValueError: if job_id is already in use
+        """
+        if not self.started:
+            raise RuntimeError("Job queue is not running")
+        if job_id and job_id in self._jobs:
+            raise ValueError(f"Job {job_id} already exists")
+        queued = sum(1 for j in self._jobs.values() if j.status == "queued")
+        if queued >= self.max_queued:
+            raise QueueFull(f"Job queue is full ({queued} queued)")
+        job = Job(task=task, context=context or {}, priority=priority, timeout=timeout)
+        if job_id:
+            job.id = job_id
+        self._jobs[job.id] = job
+        self._enqueue(job)
+        self._save()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, status: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[Job]:
+        """List jobs, newest first, optionally filtered by status."""
+        jobs = [j for j in self._jobs.values() if status is None or j.status == status]
+        jobs.sort(key=lambda j: j.submitted_at, reverse=True)
+        return jobs[offset:offset + limit]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job. Returns None if it is unknown or finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINAL_STATUSES:
+            return None
+        if job.status == "queued":
+            # The worker skips it when it reaches the front of the queue
+            self._finish(job, "cancelled", error="Cancelled before it started")
+        else:
+            task_registry.cancel(job.id)
+        return job
+
+    async def wait(self, job_id: str) -> Job:
+        """Wait until a job reaches a final status."""
+        job = self._jobs[job_id]
+        if job.status not in FINAL_STATUSES:
+            await self._done.setdefault(job_id, asyncio.Event()).wait()
+        return job
+
+    def _finish(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.now()
+        event = self._done.get(job.id)
+        if event is not None:
+            event.set()
+        self._save()
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    continue
+                await self._run_job(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = datetime.now()
+        job.attempts += 1
+        self._save()
+        try:
+            result = await task_registry.run(
+                self._runner(job),
+                task_id=job.id,
+                description=job.task,
+                timeout=job.timeout or settings.task_timeout_seconds,
+            )
+        except TaskCancelled:
+            self._finish(job, "cancelled", error="Cancelled while running")
+        except DeadlineExceeded as e:
+            self._finish(job, "failed", error=f"Timed out: {e}")
+        except asyncio.CancelledError:
+            # Worker shutdown: leave the job 'running' on disk so it is resumed
+            raise
+        except Exception as e:
+            self._finish(job, "failed", error=str(e))
+        else:
+            self._finish(job, "completed", result=result)
+
+
+# Global job queue (started by the API server)
+job_queue: JobQueue = Lazy(JobQueue)
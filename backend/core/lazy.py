@@ -0,0 +1,54 @@
+"""Lazily constructed module-level singletons."""
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """Proxy that builds its target on first attribute access.
+
+    Module-level instances (settings, state manager, agents) are wrapped in
+    this proxy so that importing a module never pays for constructing them.
+    Attribute reads, writes and deletes are forwarded to the real instance,
+    which keeps ``from module import instance`` and ``mock.patch`` working.
+    """
+
+    __slots__ = ("_factory", "_instance")
+
+    def __init__(self, factory: Callable[[], T]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+
+    def _lazy_get(self) -> T:
+        """Return the underlying instance, constructing it if needed."""
+        instance: Optional[T] = object.__getattribute__(self, "_instance")
+        if instance is None:
+            instance = object.__getattribute__(self, "_factory")()
+            object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._lazy_get(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._lazy_get(), name)
+
+    def __dir__(self):
+        return dir(self._lazy_get())
+
+    def __repr__(self) -> str:
+        if is_constructed(self):
+            return repr(self._lazy_get())
+        factory = object.__getattribute__(self, "_factory")
+        return f"<Lazy {getattr(factory, '__name__', factory)} (not constructed)>"
+
+
+def is_constructed(obj: Any) -> bool:
+    """Whether a Lazy proxy has built its instance (plain objects always have)."""
+    if isinstance(obj, Lazy):
+        return object.__getattribute__(obj, "_instance") is not None
+    return True
@@ -1,10 +1,16 @@
 """LLM initialization and configuration."""
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING
 from .config import settings
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
-def get_llm(temperature: float = None) -> ChatOpenAI:
+
+def get_llm(temperature: float = None) -> "ChatOpenAI":
     """Get configured LLM instance."""
+    # Imported here: the OpenAI client stack dominates import time
+    from langchain_openai import ChatOpenAI
+
     return ChatOpenAI(
         model=settings.openai_model,
         temperature=temperature if temperature is not None else settings.openai_temperature,
@@ -0,0 +1,215 @@
+"""Per-tool call metrics labelled by the calling agent and build step."""
+import bisect
+import contextvars
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from .config import settings
+from .lazy import Lazy
+
+
+# Upper bounds of the latency histogram buckets, in milliseconds (the last bucket is unbounded)
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# Agent and build step that tool calls in the current context are attributed to
+_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("tool_agent", default=None)
+_step: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("tool_step", default=None)
+
+
+@contextmanager
+def metrics_scope(agent: str, step_id: Optional[str] = None):
+    """Attribute tool calls made by the enclosed code to agent and step_id."""
+    agent_token = _agent.set(agent)
+    step_token = _step.set(step_id)
+    try:
+        yield
+    finally:
+        _step.reset(step_token)
+        _agent.reset(agent_token)
+
+
+def current_labels() -> Tuple[str, Optional[str]]:
+    """(agent, step id) for a tool call made now; agent is "unknown" outside any scope."""
+    return _agent.get() or "unknown", _step.get()
+
+
+class ToolStats:
+    """Counters and latency histogram for one label set."""
+
+    __slots__ = ("calls", "errors", "seconds", "max_seconds", "bytes_in", "bytes_out", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, seconds: float, bytes_in: int, bytes_out: int, error: bool) -> None:
+        self.calls += 1
+        self.errors += error
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def merge(self, other: "ToolStats") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.seconds += other.seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def _percentile_ms(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of calls."""
+        if not self.calls:
+            return None
+        target = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return float(bound)
+        return round(self.max_seconds * 1000, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+            "total_seconds": round(self.seconds, 4),
+            "mean_ms": round(self.seconds * 1000 / self.calls, 2) if self.calls else None,
+            "p50_ms": self._percentile_ms(0.5),
+            "p95_ms": self._percentile_ms(0.95),
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "histogram_ms": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)},
+                "inf": self.buckets[-1],
+            },
+        }
+
+
+class ToolMetrics:
+    """Collects tool call statistics in memory.
+
+    Totals are kept per (tool, agent). Per-step statistics are kept for the
+    most recent settings.tool_metrics_step_limit build steps only, since
+    every step adds a new label.
+    """
+
+    def __init__(self, step_limit: Optional[int] = None):
+        self.step_limit = step_limit if step_limit is not None else settings.tool_metrics_step_limit
+        self._totals: Dict[Tuple[str, str], ToolStats] = {}
+        # step id -> {(tool, agent): stats}, oldest first
+        self._steps: "OrderedDict[str, Dict[Tuple[str, str], ToolStats]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+
+    def record(self, tool: str, seconds: float, bytes_in: int, bytes_out: int, error: bool) -> None:
+        """Record one tool call under the current agent and step."""
+        agent, step_id = current_labels()
+        key = (tool, agent)
+        with self._lock:
+            self._totals.setdefault(key, ToolStats()).add(seconds, bytes_in, bytes_out, error)
+            if step_id is not None:
+                step = self._steps.get(step_id)
+                if step is None:
+                    step = self._steps[step_id] = {}
+                    while len(self._steps) > self.step_limit:
+                        self._steps.popitem(last=False)
+                step.setdefault(key, ToolStats()).add(seconds, bytes_in, bytes_out, error)
+
+    def query(
+        self,
+        tool: Optional[str] = None,
+        agent: Optional[str] = None,
+        step_id: Optional[str] = None,
+        group_by: str = "tool",
+    ) -> Dict[str, Any]:
+        """Aggregate recorded calls.
+
+        Args:
+            tool: Only this tool
+            agent: Only calls made by this agent
+            step_id: Only calls made during this build step
+            group_by: "tool", "agent" or "tool_agent"
+
+        Returns:
+            Totals and per-group statistics, busiest groups first
+        """
+        if group_by not in ("tool", "agent", "tool_agent"):
+            raise ValueError("group_by must be 'tool', 'agent' or 'tool_agent'")
+        with self._lock:
+            source = self._totals if step_id is None else self._steps.get(step_id, {})
+            total = ToolStats()
+            groups: Dict[str, ToolStats] = {}
+            for (tool_name, agent_name), stats in source.items():
+                if (tool and tool_name != tool) or (agent and agent_name != agent):
+                    continue
+                label = {"tool": tool_name, "agent": agent_name}.get(group_by, f"{tool_name}@{agent_name}")
+                groups.setdefault(label, ToolStats()).merge(stats)
+                total.merge(stats)
+            ordered = sorted(groups.items(), key=lambda item: item[1].seconds, reverse=True)
+            return {
+                "since": self.started_at.isoformat(),
+                "total": total.to_dict(),
+                group_by: {label: stats.to_dict() for label, stats in ordered},
+            }
+
+    def steps(self) -> List[str]:
+        """Build steps with recorded tool calls, most recent first."""
+        with self._lock:
+            return list(reversed(self._steps))
+
+    def dump(self, path: Optional[Path] = None) -> Path:
+        """Write every recorded statistic to a JSON file for offline analysis.
+
+        Returns:
+            Path of the written file
+        """
+        path = Path(path or settings.memory_dir / "tool_metrics.json")
+        with self._lock:
+            data = {
+                "since": self.started_at.isoformat(),
+                "dumped_at": datetime.now().isoformat(),
+                "latency_buckets_ms": LATENCY_BUCKETS_MS,
+                "totals": [
+                    {"tool": tool, "agent": agent, **stats.to_dict()}
+                    for (tool, agent), stats in self._totals.items()
+                ],
+                "steps": {
+                    step_id: [
+                        {"tool": tool, "agent": agent, **stats.to_dict()}
+                        for (tool, agent), stats in step.items()
+                    ]
+                    for step_id, step in self._steps.items()
+                },
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(".tmp")
+        with open(temp, "w") as f:
+            json.dump(data, f, indent=2)
+        temp.replace(path)
+        return path
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._totals.clear()
+            self._steps.clear()
+            self.started_at = datetime.now()
+
+
+# Global tool metrics collector
+tool_metrics: ToolMetrics = Lazy(ToolMetrics)
@@ -0,0 +1,99 @@
+"""MinHash signatures and LSH banding for near-duplicate detection."""
+import re
+import zlib
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Tokens per shingle; five tokens are about one short statement
+SHINGLE_TOKENS = 5
+
+# 128 permutations in 32 bands of 4 rows make documents with an estimated
+# Jaccard similarity above about (1/32) ** (1/4) = 0.42 likely candidates
+NUM_PERM = 128
+BANDS = 32
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_COMMENT = re.compile(r"^\s*(#|//).*$", re.MULTILINE)
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_TOKENS) -> np.ndarray:
+    """32-bit hashes of the distinct token shingles of text.
+
+    Whitespace and full-line comments are ignored, so reformatting or
+    re-commenting a copy does not hide it. Texts shorter than one shingle
+    are a single shingle.
+    """
+    tokens = _TOKEN.findall(_COMMENT.sub("", text))
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    count = max(len(tokens) - size + 1, 1)
+    hashes = {zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(count)}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+class MinHashLSH:
+    """Finds candidate near-duplicate documents in near-linear time.
+
+    Each document is reduced to a MinHash signature of its shingles: for
+    each of num_perm multiply-shift hash functions, the minimum hash over
+    the shingles. The fraction of equal signature entries estimates the
+    Jaccard similarity of two documents' shingle sets. Signatures are cut
+    into bands; documents sharing a band land in the same bucket and become
+    a candidate pair, so only similar documents are ever compared.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, shingle_size: int = SHINGLE_TOKENS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd 64-bit multipliers: (a * x + b) >> 32 is a universal hash of x
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of text, None if it has no tokens."""
+        hashes = shingle_hashes(text, self.shingle_size)
+        if not hashes.size:
+            return None
+        # uint64 arithmetic wraps around, which multiply-shift hashing relies on
+        with np.errstate(over="ignore"):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    def add(self, key: str, text: str) -> bool:
+        """Index a document. Returns False if it has no tokens and was skipped."""
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        self._signatures[key] = signature
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            self._buckets.setdefault((band, chunk), []).append(key)
+        return True
+
+    def similarity(self, a: str, b: str) -> float:
+        """Estimated Jaccard similarity of two indexed documents."""
+        return float(np.mean(self._signatures[a] == self._signatures[b]))
+
+    def candidates(self) -> List[Tuple[str, str, float]]:
+        """Pairs sharing at least one band, with their estimated similarity, most similar first."""
+        pairs = set()
+        for keys in self._buckets.values():
+            if len(keys) > 1:
+                pairs.update(combinations(sorted(keys), 2))
+        scored = [(a, b, self.similarity(a, b)) for a, b in pairs]
+        return sorted(scored, key=lambda pair: (-pair[2], pair[0], pair[1]))
+
+    def matrix(self, keys: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """Estimated pairwise similarities of the given documents."""
+        keys = [key for key in dict.fromkeys(keys) if key in self._signatures]
+        return {a: {b: round(self.similarity(a, b), 3) for b in keys} for a in keys}
@@ -0,0 +1,162 @@
+"""Apply unified diffs and SEARCH/REPLACE blocks to file contents."""
+import re
+from typing import List, Optional
+
+
+# <<<<<<< SEARCH / ======= / >>>>>>> REPLACE blocks
+SEARCH_REPLACE_BLOCK = re.compile(
+    r"^<{5,9} SEARCH[ \t]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} REPLACE[ \t]*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+
+class PatchError(Exception):
+    """Raised when a patch is malformed or does not match the file."""
+
+
+class Hunk:
+    """One hunk of a unified diff."""
+
+    def __init__(self, old_start: Optional[int]):
+        self.old_start = old_start  # 1-based, None if the header had no line numbers
+        self.old_lines: List[str] = []
+        self.new_lines: List[str] = []
+
+
+def _split_lines(text: str) -> List[str]:
+    """Lines of text split on "\n" only, each keeping any "\r" it ends with."""
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def parse_unified_diff(patch: str) -> List[Hunk]:
+    """Parse the hunks of a single-file unified diff.
+
+    File headers (diff/index/---/+++) are optional. Hunk headers may omit
+    their line numbers ("@@ ... @@"), in which case the hunk is located by
+    its context alone.
+    """
+    hunks: List[Hunk] = []
+    lines = [line[:-1] if line.endswith("\r") else line for line in _split_lines(patch)]
+    for index, line in enumerate(lines):
+        next_line = lines[index + 1] if index + 1 < len(lines) else ""
+        if line.startswith("@@"):
+            match = HUNK_HEADER.match(line)
+            hunks.append(Hunk(int(match.group(1)) if match else None))
+        elif line.startswith("--- ") and next_line.startswith("+++ "):
+            if hunks:
+                raise PatchError("Patch touches more than one file; send one patch per file")
+        elif line.startswith("+++ ") and lines[index - 1].startswith("--- ") and not hunks:
+            continue
+        elif not hunks:
+            if line.startswith(("diff ", "index ", "new file mode", "old mode", "new mode")) or not line.strip():
+                continue
+            raise PatchError(f"Unexpected line before the first hunk: {line!r}")
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        elif line.startswith("-"):
+            hunks[-1].old_lines.append(line[1:])
+        elif line.startswith("+"):
+            hunks[-1].new_lines.append(line[1:])
+        else:
+            # Context line; tolerate a missing leading space on blank lines
+            text = line[1:] if line.startswith(" ") else line
+            hunks[-1].old_lines.append(text)
+            hunks[-1].new_lines.append(text)
+    if not hunks:
+        raise PatchError("No hunks found in the diff (expected '@@' lines)")
+    return hunks
+
+
+def _find_block(lines: List[str], block: List[str], start: int, expected: Optional[int]) -> int:
+    """Index where block occurs in lines at or after start, nearest to expected."""
+    stripped = [line.rstrip() for line in block]
+    matches = [
+        i for i in range(start, len(lines) - len(block) + 1)
+        if [line.rstrip() for line in lines[i:i + len(block)]] == stripped
+    ]
+    if not matches:
+        return -1
+    if expected is None:
+        if len(matches) > 1:
+            raise PatchError(
+                f"Hunk context matches {len(matches)} places; add line numbers or more context:\n"
+                + "\n".join(block[:3])
+            )
+        return matches[0]
+    return min(matches, key=lambda i: abs(i - expected))
+
+
+def apply_unified_diff(text: str, patch: str) -> str:
+    """Apply a single-file unified diff to text, verifying every context line.
+
+    Raises:
+        PatchError: if the diff is malformed or a hunk does not match
+    """
+    lines = _split_lines(text)
+    # Added lines take the file's line ending; context is matched without it
+    eol = "\r" if lines and lines[0].endswith("\r") else ""
+    offset = 0  # lines added minus lines removed by earlier hunks
+    cursor = 0
+    for number, hunk in enumerate(parse_unified_diff(patch), start=1):
+        expected = None if hunk.old_start is None else max(hunk.old_start - 1 + offset, 0)
+        if not hunk.old_lines:
+            # Pure insertion without context
+            position = len(lines) if expected is None else min(expected + (1 if hunk.old_start else 0), len(lines))
+        else:
+            position = _find_block(lines, hunk.old_lines, cursor, expected)
+            if position == -1:
+                raise PatchError(
+                    f"Hunk {number} does not match the file; expected these lines:\n"
+                    + "\n".join(hunk.old_lines[:5])
+                )
+        lines[position:position + len(hunk.old_lines)] = [line + eol for line in hunk.new_lines]
+        cursor = position + len(hunk.new_lines)
+        offset += len(hunk.new_lines) - len(hunk.old_lines)
+
+    result = "\n".join(lines)
+    if lines and (text.endswith("\n") or not text):
+        result += "\n"
+    return result
+
+
+def apply_search_replace(text: str, patch: str) -> str:
+    """Apply SEARCH/REPLACE blocks in order; each search must match exactly once.
+
+    An empty SEARCH section is only allowed for an empty (new) file.
+
+    Raises:
+        PatchError: if a block is not found or is ambiguous
+    """
+    blocks = SEARCH_REPLACE_BLOCK.findall(patch)
+    if not blocks:
+        raise PatchError("No SEARCH/REPLACE blocks found")
+    for number, (search, replace) in enumerate(blocks, start=1):
+        if not search:
+            if text:
+                raise PatchError(f"Block {number} has an empty SEARCH section but the file is not empty")
+            text = replace
+            continue
+        count = text.count(search)
+        if count == 0:
+            raise PatchError(f"Block {number} SEARCH text was not found:\n{search[:300]}")
+        if count > 1:
+            raise PatchError(f"Block {number} SEARCH text matches {count} places; include more surrounding lines")
+        text = text.replace(search, replace, 1)
+    return text
+
+
+def apply_patch_text(text: str, patch: str) -> str:
+    """Apply a unified diff or SEARCH/REPLACE blocks, detecting the format.
+
+    Either every change applies or PatchError is raised.
+    """
+    if SEARCH_REPLACE_BLOCK.search(patch):
+        return apply_search_replace(text, patch)
+    if any(line.startswith("@@") for line in patch.splitlines()):
+        return apply_unified_diff(text, patch)
+    raise PatchError("Unrecognized patch format; send a unified diff or SEARCH/REPLACE blocks")
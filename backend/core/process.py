@@ -0,0 +1,156 @@
+"""Non-blocking shell command execution with bounded output."""
+import asyncio
+import os
+import signal
+import time
+from typing import Callable, Optional, Union
+
+
+# Bytes read from the child's output pipe per iteration
+CHUNK_SIZE = 4096
+
+# Seconds between SIGTERM and SIGKILL when stopping a command
+KILL_GRACE_SECONDS = 2.0
+
+# Seconds to keep reading output after the shell exits; a background child
+# can hold the pipe open indefinitely
+DRAIN_TIMEOUT_SECONDS = 1.0
+
+
+class OutputBuffer:
+    """Keeps the first and last limit/2 bytes of a stream, dropping the middle."""
+
+    def __init__(self, limit: int):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def text(self) -> str:
+        head = self.head.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        if not self.truncated:
+            return head + tail
+        omitted = self.total - len(self.head) - len(self.tail)
+        return f"{head}\n... [{omitted} bytes of output omitted] ...\n{tail}"
+
+
+class CommandResult:
+    """Outcome of a shell command."""
+
+    def __init__(self, returncode: Optional[int], output: str, timed_out: bool, truncated: bool, duration: float):
+        self.returncode = returncode
+        self.output = output
+        self.timed_out = timed_out
+        self.truncated = truncated
+        self.duration = duration
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    """Send sig to the command's whole process group."""
+    try:
+        if hasattr(os, "killpg"):
+            # start_new_session makes the shell a group leader, so pgid == pid
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    """Stop a command and every process it started."""
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), KILL_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    # Children may outlive the shell, so the group is killed either way
+    _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+    await process.wait()
+
+
+async def run_shell(
+    command: str,
+    cwd: Optional[Union[str, os.PathLike]] = None,
+    timeout: Optional[float] = None,
+    max_output: int = 20000,
+    on_output: Optional[Callable[[str], None]] = None,
+) -> CommandResult:
+    """Run a shell command without blocking the event loop.
+
+    stdout and stderr are merged in the order they were written. Output is
+    read as it is produced; only the first and last max_output/2 bytes are
+    kept. On timeout, or if the caller is cancelled, the command's whole
+    process group is terminated.
+
+    Args:
+        command: Shell command line
+        cwd: Working directory
+        timeout: Seconds before the command is killed (None = no limit)
+        max_output: Maximum bytes of output kept in the result
+        on_output: Called with each chunk of output as it arrives
+
+    Returns:
+        CommandResult with the exit code and (possibly truncated) output
+    """
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_shell(
+        command,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        start_new_session=True,
+    )
+    output = OutputBuffer(max_output)
+
+    async def read_output():
+        while True:
+            chunk = await process.stdout.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            output.write(chunk)
+            if on_output is not None:
+                on_output(chunk.decode("utf-8", errors="replace"))
+
+    reader = asyncio.ensure_future(read_output())
+    timed_out = False
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        await _terminate(process)
+    except asyncio.CancelledError:
+        reader.cancel()
+        await _terminate(process)
+        raise
+
+    try:
+        await asyncio.wait_for(reader, DRAIN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+
+    return CommandResult(
+        returncode=process.returncode,
+        output=output.text(),
+        timed_out=timed_out,
+        truncated=output.truncated,
+        duration=time.monotonic() - started,
+    )
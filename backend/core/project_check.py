@@ -0,0 +1,258 @@
+"""Deterministic project-wide Python syntax and import checking."""
+import ast
+import asyncio
+import importlib.util
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from pydantic import BaseModel, Field
+from .file_index import FileIndex
+from .file_scan import CachedFileScanner
+from .lazy import Lazy
+
+# Exception types whose handlers make an import optional
+_IMPORT_GUARDS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+
+
+class FileCheckResult(BaseModel):
+    """Check result for one Python file."""
+    path: str
+    ok: bool
+    syntax_error: Optional[str] = None
+    import_errors: List[str] = Field(default_factory=list)
+    cached: bool = False  # analysis reused from an earlier check of identical content
+
+
+class ProjectCheckReport(BaseModel):
+    """Result of checking every Python file under a directory."""
+    directory: str
+    files: List[FileCheckResult] = Field(default_factory=list)
+    analyzed: int = 0  # files parsed in this run
+    cached: int = 0  # files whose analysis came from the content-hash cache
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(f.ok for f in self.files)
+
+    @property
+    def failures(self) -> List[FileCheckResult]:
+        return [f for f in self.files if not f.ok]
+
+
+def _guards_imports(handler: ast.ExceptHandler) -> bool:
+    if handler.type is None:
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(isinstance(t, ast.Name) and t.id in _IMPORT_GUARDS for t in types)
+
+
+class _ImportCollector(ast.NodeVisitor):
+    """Collects every import, noting those guarded by try/except ImportError."""
+
+    def __init__(self):
+        self.imports: List[Dict[str, Any]] = []
+        self._optional = 0
+
+    def visit_Try(self, node):
+        guarded = any(_guards_imports(h) for h in node.handlers)
+        self._optional += guarded
+        for stmt in node.body:
+            self.visit(stmt)
+        self._optional -= guarded
+        for part in node.handlers + node.orelse + node.finalbody:
+            self.visit(part)
+
+    visit_TryStar = visit_Try
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append({
+                "module": alias.name, "names": [], "level": 0,
+                "line": node.lineno, "optional": self._optional > 0,
+            })
+
+    def visit_ImportFrom(self, node):
+        self.imports.append({
+            "module": node.module or "",
+            "names": [a.name for a in node.names if a.name != "*"],
+            "level": node.level,
+            "line": node.lineno,
+            "optional": self._optional > 0,
+        })
+
+
+def _top_level_names(body: List[ast.stmt], names: Set[str]) -> bool:
+    """Add names bound at module level to names. Returns True if some are dynamic."""
+    dynamic = False
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            dynamic |= node.name == "__getattr__"
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                names.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    dynamic = True
+                else:
+                    names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, (ast.If, ast.Try, ast.With, ast.For, ast.While)):
+            for block in ("body", "orelse", "finalbody"):
+                dynamic |= _top_level_names(getattr(node, block, []), names)
+            for handler in getattr(node, "handlers", []):
+                dynamic |= _top_level_names(handler.body, names)
+    return dynamic
+
+
+def analyze_source(path: str, source: bytes) -> Dict[str, Any]:
+    """Compile one file and extract its imports and module-level names.
+
+    Runs in worker processes, so it only depends on the source itself.
+    """
+    try:
+        tree = ast.parse(source, filename=path)
+        # Compiling catches errors the parser accepts ('return' outside a function, ...)
+        compile(tree, path, "exec")
+    except SyntaxError as e:
+        return {"syntax_error": f"line {e.lineno}: {e.msg}", "imports": [], "exports": [], "dynamic": True}
+    except ValueError as e:  # e.g. null bytes
+        return {"syntax_error": str(e), "imports": [], "exports": [], "dynamic": True}
+    collector = _ImportCollector()
+    collector.visit(tree)
+    exports: Set[str] = set()
+    dynamic = _top_level_names(tree.body, exports)
+    return {"syntax_error": None, "imports": collector.imports, "exports": sorted(exports), "dynamic": dynamic}
+
+
+def _analyze_file(args: Tuple[str, str]) -> Dict[str, Any]:
+    path, full_path = args
+    with open(full_path, "rb") as f:
+        return analyze_source(path, f.read())
+
+
+class ProjectChecker(CachedFileScanner):
+    """Compiles Python files in parallel and checks that their imports resolve.
+
+    Parsing and compiling, the expensive part, is cached by content hash and
+    fanned out to a process pool. Import resolution is redone on every check
+    against the file index, so deleting a module flags its importers even
+    when they did not change.
+    """
+
+    def __init__(
+        self,
+        files: Optional[FileIndex] = None,
+        source_dirs: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+    ):
+        super().__init__(files, workers)
+        # Directories on sys.path when the code runs; backend/ is added by
+        # scripts started from it (see backend/main.py)
+        self.source_dirs = source_dirs if source_dirs is not None else ["", "backend"]
+        self._external: Dict[str, bool] = {}
+
+    # --- Import resolution ---
+
+    def _module_path(self, dotted: str, base: str = "") -> Optional[str]:
+        """Indexed file (or namespace package directory) for a module below base."""
+        rel = "/".join(p for p in [base] + dotted.split(".") if p)
+        if self.files.get(f"{rel}.py") is not None:
+            return f"{rel}.py"
+        if self.files.get(f"{rel}/__init__.py") is not None:
+            return f"{rel}/__init__.py"
+        if rel and self.files.is_dir(rel):
+            return rel
+        return None
+
+    def _external_available(self, top: str) -> bool:
+        if top not in self._external:
+            try:
+                self._external[top] = top in sys.stdlib_module_names or importlib.util.find_spec(top) is not None
+            except (ImportError, ValueError):
+                self._external[top] = False
+        return self._external[top]
+
+    def _check_names(self, module_path: str, module: str, names: List[str], line: int,
+                     analyses: Dict[str, Dict[str, Any]], errors: List[str]) -> None:
+        analysis = analyses.get(module_path)
+        package_dir = module_path[:-len("/__init__.py")] if module_path.endswith("__init__.py") else (
+            module_path if not module_path.endswith(".py") else None)
+        for name in names:
+            if package_dir is not None and self._module_path(name, package_dir):
+                continue  # submodule
+            if analysis is None or analysis["dynamic"] or analysis["syntax_error"]:
+                continue  # cannot tell
+            if name not in analysis["exports"]:
+                errors.append(f"line {line}: cannot import name '{name}' from '{module}'")
+
+    def _resolve(self, path: str, analysis: Dict[str, Any], analyses: Dict[str, Dict[str, Any]]) -> List[str]:
+        errors: List[str] = []
+        package = path.split("/")[:-1]
+        for imp in analysis["imports"]:
+            module, level, line = imp["module"], imp["level"], imp["line"]
+            if level:
+                if level - 1 > len(package):
+                    errors.append(f"line {line}: relative import beyond top-level package")
+                    continue
+                base = "/".join(package[:len(package) - (level - 1)])
+                label = "." * level + module
+                module_path = self._module_path(module, base) if module else (base or None)
+                if module_path is None:
+                    errors.append(f"line {line}: cannot resolve module '{label}'")
+                else:
+                    self._check_names(module_path, label, imp["names"], line, analyses, errors)
+                continue
+
+            top = module.split(".")[0]
+            for base in self.source_dirs:
+                if self._module_path(top, base) is not None:
+                    module_path = self._module_path(module, base)
+                    if module_path is None:
+                        errors.append(f"line {line}: cannot resolve module '{module}'")
+                    else:
+                        self._check_names(module_path, module, imp["names"], line, analyses, errors)
+                    break
+            else:
+                if not imp["optional"] and not self._external_available(top):
+                    errors.append(f"line {line}: no module named '{top}'")
+        return errors
+
+    # --- Checking ---
+
+    def check_sync(self, directory: str = "backend") -> ProjectCheckReport:
+        """Check every Python file under directory (blocking).
+
+        Args:
+            directory: Directory relative to the project root
+
+        Returns:
+            ProjectCheckReport with one result per file
+        """
+        started = time.perf_counter()
+        with self._lock:
+            analyses, todo = self._scan(self.files.files([".py"], under=directory), _analyze_file)
+            self._external.clear()
+            report = ProjectCheckReport(directory=directory, analyzed=len(todo), cached=len(analyses) - len(todo))
+            fresh = set(todo)
+            for path, analysis in analyses.items():
+                import_errors = [] if analysis["syntax_error"] else self._resolve(path, analysis, analyses)
+                report.files.append(FileCheckResult(
+                    path=path,
+                    ok=analysis["syntax_error"] is None and not import_errors,
+                    syntax_error=analysis["syntax_error"],
+                    import_errors=import_errors,
+                    cached=path not in fresh,
+                ))
+        report.duration = time.perf_counter() - started
+        return report
+
+    async def check(self, directory: str = "backend") -> ProjectCheckReport:
+        """Check every Python file under directory without blocking the event loop."""
+        return await asyncio.to_thread(self.check_sync, directory)
+
+
+# Global project checker instance
+project_checker: ProjectChecker = Lazy(ProjectChecker)
@@ -0,0 +1,253 @@
+"""Local vector similarity search over documentation and build results."""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import settings
+from .doc_index import SearchHit, doc_index
+from .lazy import Lazy
+from .snippets import STOPWORDS
+
+
+# Sources a document can come from
+SOURCES = ("docs", "build_steps")
+
+# Characters of each document kept for display in results
+PREVIEW_CHARS = 300
+
+# Similarities below this are hash-collision noise, not relatedness
+MIN_SCORE = 0.12
+
+# Character trigrams let "router" and "routing" share features; they count
+# for less than whole words
+TRIGRAM_WEIGHT = 0.3
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _features(text: str) -> Counter:
+    features: Counter = Counter()
+    for word in _WORD.findall(text.lower()):
+        if len(word) < 2 or word in STOPWORDS or word.isdigit():
+            continue
+        features[word] += 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            features[padded[i:i + 3]] += TRIGRAM_WEIGHT
+    return features
+
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """Unit-length hashing-vectorizer embedding of text.
+
+    Words and their character trigrams are hashed (with a hash-derived sign,
+    so collisions cancel out rather than pile up) into dim buckets, weighted
+    by sublinear term frequency. Needs no vocabulary, so documents can be
+    added one at a time.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in _features(text).items():
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        sign = 1.0 if digest >> 63 else -1.0
+        weight = 1.0 + math.log(count) if count >= 1 else count
+        vector[digest % dim] += sign * weight
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class SemanticIndex:
+    """Cosine top-k search over hashed embeddings kept in a memory-mapped file.
+
+    Documents are grouped by what they come from: a documentation page (one
+    document per indexed section) or a build step. Each group carries a
+    version (content hash); refresh() re-embeds only groups whose version
+    changed and frees the rows of groups that disappeared, so rebuilds are
+    incremental. Vectors live in a float32 file opened with np.memmap, and
+    their metadata in a JSON file next to it, so loading the index is
+    instant whatever its size.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, dim: Optional[int] = None):
+        self.directory = Path(directory or settings.backend_root / "cache" / "semantic")
+        self.dim = dim or settings.semantic_index_dim
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.directory / "vectors.f32"
+        self._meta_path = self.directory / "meta.json"
+        self._lock = threading.Lock()
+        # row -> document metadata, None for a free row
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        # "source:group" -> {"version": ..., "rows": [...]}
+        self._groups: Dict[str, Dict[str, Any]] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._load()
+
+    # --- Storage ---
+
+    def _load(self) -> None:
+        try:
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        capacity = self._vectors_path.stat().st_size // (4 * self.dim) if self._vectors_path.exists() else 0
+        if meta is None or meta.get("dim") != self.dim or len(meta["rows"]) > capacity:
+            # Missing, foreign or torn index: start over
+            self._rows, self._groups = [], {}
+            self._vectors_path.unlink(missing_ok=True)
+            self._vectors = None
+            return
+        self._rows, self._groups = meta["rows"], meta["groups"]
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)) if capacity else None
+
+    def _save(self) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+        temp = self._meta_path.with_suffix(".tmp")
+        with open(temp, "w") as f:
+            json.dump({"dim": self.dim, "rows": self._rows, "groups": self._groups}, f)
+        os.replace(temp, self._meta_path)
+
+    def _capacity(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _grow(self, rows: int) -> None:
+        capacity = self._capacity()
+        if rows <= capacity:
+            return
+        new_capacity = max(64, capacity * 2, rows)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(new_capacity, self.dim))
+
+    # --- Updates ---
+
+    def _remove_group(self, key: str) -> None:
+        for row in self._groups.pop(key)["rows"]:
+            self._rows[row] = None
+            self._vectors[row] = 0.0
+
+    def _add_group(self, key: str, version: str, docs: List[Tuple[str, str, str]]) -> None:
+        free = [row for row, doc in enumerate(self._rows) if doc is None]
+        free.reverse()  # reuse the lowest rows first
+        rows = []
+        for ref, title, text in docs:
+            if free:
+                row = free.pop()
+            else:
+                row = len(self._rows)
+                self._rows.append(None)
+                self._grow(len(self._rows))
+            self._vectors[row] = embed(f"{title}\n{text}", self.dim)
+            source = key.split(":", 1)[0]
+            self._rows[row] = {"source": source, "ref": ref, "title": title, "preview": text[:PREVIEW_CHARS]}
+            rows.append(row)
+        self._groups[key] = {"version": version, "rows": rows}
+
+    def sync(self, source: str, groups: Dict[str, Tuple[str, Any]]) -> Dict[str, int]:
+        """Make source's documents match groups, re-embedding only what changed.
+
+        Args:
+            source: One of SOURCES
+            groups: group id -> (version, loader); loader() returns the group's
+                documents as (ref, title, text) tuples and is only called
+                when the version changed
+
+        Returns:
+            Counts of added, updated, removed and unchanged groups
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        with self._lock:
+            prefix = f"{source}:"
+            for key in [k for k in self._groups if k.startswith(prefix) and k[len(prefix):] not in groups]:
+                self._remove_group(key)
+                counts["removed"] += 1
+            for group, (version, loader) in groups.items():
+                key = prefix + group
+                current = self._groups.get(key)
+                if current is not None and current["version"] == version:
+                    counts["unchanged"] += 1
+                    continue
+                if current is not None:
+                    self._remove_group(key)
+                self._add_group(key, version, loader())
+                counts["updated" if current is not None else "added"] += 1
+            if counts["added"] or counts["updated"] or counts["removed"]:
+                self._save()
+        return counts
+
+    def refresh(self, build_steps: Iterable[Any] = ()) -> Dict[str, Dict[str, int]]:
+        """Bring the index up to date with the documentation index and build_steps."""
+        pages = {
+            url: (content_hash, lambda url=url, title=title: [(url, title, body) for body in doc_index.page_sections(url)])
+            for url, (_, title, content_hash) in doc_index.pages().items()
+        }
+        steps = {}
+        for step in build_steps:
+            text = "\n".join(part for part in (step.action, step.result, step.error) if part)
+            version = hashlib.sha256(f"{step.status}\0{text}".encode("utf-8")).hexdigest()
+            title = f"{step.agent}: {step.action}"
+            steps[step.id] = (version, lambda step=step, title=title, text=text: [(step.id, title, text)])
+        return {"docs": self.sync("docs", pages), "build_steps": self.sync("build_steps", steps)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows, self._groups = [], {}
+            self._vectors = None
+            self._vectors_path.unlink(missing_ok=True)
+            self._save()
+
+    # --- Search ---
+
+    def search(self, query: str, limit: int = 5, source: Optional[str] = None) -> List[SearchHit]:
+        """Documents most similar to query, best first.
+
+        Args:
+            query: Free text; paraphrases of the wanted content match too
+            limit: Maximum number of documents
+            source: Only search this source (default: all)
+        """
+        query_vector = embed(query, self.dim)
+        with self._lock:
+            count = len(self._rows)
+            if not count or not query_vector.any():
+                return []
+            scores = np.asarray(self._vectors[:count] @ query_vector)
+            if source is not None:
+                mask = np.array([doc is not None and doc["source"] == source for doc in self._rows])
+                scores = np.where(mask, scores, -np.inf)
+            k = min(limit, count)
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            hits = []
+            for row in best:
+                doc = self._rows[row]
+                if doc is not None and scores[row] >= MIN_SCORE:
+                    hits.append(SearchHit(doc["source"], doc["ref"], doc["title"], doc["preview"], float(scores[row])))
+            return hits
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            used = [doc for doc in self._rows if doc is not None]
+            return {
+                "documents": len(used),
+                "by_source": dict(Counter(doc["source"] for doc in used)),
+                "groups": len(self._groups),
+                "free_rows": len(self._rows) - len(used),
+                "capacity": self._capacity(),
+                "dim": self.dim,
+            }
+
+
+# Global semantic index
+semantic_index: SemanticIndex = Lazy(SemanticIndex)
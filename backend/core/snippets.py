@@ -0,0 +1,142 @@
+"""Multi-term snippet retrieval: key terms of a task, found in one pass over a document."""
+import re
+from collections import Counter
+from typing import Iterable, List, Optional, Union
+
+
+# At most this many key terms are taken from a task description
+MAX_TERMS = 12
+
+# Snippets are windows of about this many characters
+SNIPPET_CHARS = 240
+
+# Words that say nothing about what documentation is relevant
+STOPWORDS = frozenset("""
+    about above add after all also and any are because been before being both build but can
+    could create does doing each for from get has have how into its just like make more most
+    need needs new not now only other our out over same should some such than that the their
+    them then there these they this those through use used using very want was were what when
+    where which while who why will with without would you your
+""".split())
+
+# Identifiers, including dotted and hyphenated names (fastapi.APIRouter, react-native)
+_WORD = re.compile(r"[A-Za-z_][\w.\-]*\w|[A-Za-z_]")
+
+Text = Union[str, bytes, memoryview]
+
+
+def extract_terms(text: str, limit: int = MAX_TERMS) -> List[str]:
+    """Lowercased key terms of text, most frequent first, then in order of appearance.
+
+    Stopwords, numbers and words shorter than three characters are dropped.
+    A dotted name also contributes its last part (apirouter for fastapi.APIRouter).
+    """
+    counts: Counter = Counter()
+    for match in _WORD.finditer(text):
+        word = match.group(0).lower()
+        for term in dict.fromkeys([word, word.rsplit(".", 1)[-1]]):
+            if len(term) >= 3 and term not in STOPWORDS:
+                counts[term] += 1
+    # Counter keeps insertion order, so ties stay in order of appearance
+    return [term for term, _ in sorted(counts.items(), key=lambda item: -item[1])][:limit]
+
+
+class TermMatcher:
+    """Finds every occurrence of any of a set of terms in one scan of a text.
+
+    The terms are compiled into a single alternation (longest first), so a
+    document is read once however many terms are searched. Works on str and
+    on UTF-8 bytes, such as memory-mapped pages.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = list(dict.fromkeys(t.lower() for t in terms if t.strip()))
+        alternation = "|".join(re.escape(t) for t in sorted(self.terms, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)") if self.terms else None
+        self._bytes_pattern: Optional[re.Pattern] = None
+
+    def finditer(self, text: Text):
+        if self._pattern is None:
+            return iter(())
+        if isinstance(text, str):
+            return self._pattern.finditer(text)
+        if self._bytes_pattern is None:
+            self._bytes_pattern = re.compile(self._pattern.pattern.encode("utf-8"))
+        return self._bytes_pattern.finditer(text)
+
+
+class Snippet:
+    """A window of a document, scored by the density of query terms in it."""
+
+    def __init__(self, library: str, text: str, score: float, terms: List[str]):
+        self.library = library
+        self.text = text
+        self.score = score  # higher is better
+        self.terms = terms  # query terms found in the window
+
+    def __repr__(self) -> str:
+        return f"Snippet({self.library!r}, {self.text!r}, score={self.score})"
+
+
+def rank_snippets(
+    text: Text,
+    matcher: TermMatcher,
+    top_k: int = 5,
+    library: str = "",
+    window: int = SNIPPET_CHARS,
+) -> List[Snippet]:
+    """Best non-overlapping windows of text for the matcher's terms, best first.
+
+    A window scores one point per distinct term it contains and a quarter
+    point for every repeated occurrence, so windows where many different
+    terms cluster rank above long runs of a single term.
+    """
+    decode = isinstance(text, str)
+    matches = []
+    for match in matcher.finditer(text):
+        term = match.group(0)
+        matches.append((match.start(), match.end(), term if decode else term.decode("utf-8")))
+    if not matches:
+        return []
+
+    # Slide a window starting at each match over the sorted match positions
+    candidates = []
+    counts: Counter = Counter()
+    j = 0
+    for i, (start, _, term) in enumerate(matches):
+        while j < len(matches) and (j == i or matches[j][1] - start <= window):
+            counts[matches[j][2]] += 1
+            j += 1
+        hits = j - i
+        score = len(counts) + 0.25 * (hits - len(counts))
+        candidates.append((score, start, matches[j - 1][1], list(counts)))
+        counts[term] -= 1
+        if not counts[term]:
+            del counts[term]
+
+    snippets: List[Snippet] = []
+    taken: List[tuple] = []
+    for score, start, end, terms in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        if any(start < t_end and end > t_start for t_start, t_end in taken):
+            continue
+        taken.append((start, end))
+        snippets.append(Snippet(library, _excerpt(text, start, end, window), score, terms))
+        if len(snippets) >= top_k:
+            break
+    return snippets
+
+
+def _excerpt(text: Text, start: int, end: int, window: int) -> str:
+    # Center the matched span in a window and cut at whitespace
+    pad = max(window - (end - start), 0) // 2
+    lo, hi = max(start - pad, 0), min(end + pad, len(text))
+    excerpt = text[lo:hi]
+    if not isinstance(excerpt, str):
+        excerpt = bytes(excerpt).decode("utf-8", errors="ignore")
+    words = excerpt.split()
+    # Drop words cut in half at either edge
+    if lo > 0 and not text[lo - 1:lo].isspace() and not excerpt[:1].isspace() and len(words) > 1:
+        words = words[1:]
+    if hi < len(text) and not text[hi:hi + 1].isspace() and not excerpt[-1:].isspace() and len(words) > 1:
+        words = words[:-1]
+    return " ".join(words)
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel, Field
 from .config import settings
+from .lazy import Lazy
 
 
 class BuildStep(BaseModel):
@@ -14,7 +15,7 @@ class BuildStep(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
     agent: str
     action: str
-    status: str  # pending, running, completed, failed
+    status: str  # pending, running, completed, failed, cancelled, timed_out, interrupted
     result: Optional[str] = None
     error: Optional[str] = None
 
@@ -27,6 +28,23 @@ class SystemCapability(BaseModel):
     file_path: Optional[str] = None
 
 
+class TaskCheckpoint(BaseModel):
+    """Progress of a decomposed task, saved after every completed phase."""
+    task_hash: str
+    task: str
+    phases: List[str]
+    results: List[Dict[str, str]] = Field(default_factory=list)  # {"phase", "output"} per finished phase
+    depth: int = 0  # decomposition depth; above 0 the task is a phase of a larger one
+    context: Dict[str, Any] = Field(default_factory=dict)  # context the task was run with
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    @property
+    def next_phase(self) -> int:
+        """Index of the first phase that has not finished."""
+        return len(self.results)
+
+
 class SystemState(BaseModel):
     """Complete system state."""
     version: str = "0.1.0"
@@ -48,6 +66,8 @@ class StateManager:
         self.PROMPT_CACHE_KEY = "recent_prompt_cache"
         # Cache expiration duration
         self.CACHE_EXPIRATION = timedelta(hours=1)
+        # Metadata key for phase checkpoints of decomposed tasks
+        self.CHECKPOINT_KEY = "task_checkpoints"
     
     async def load(self) -> SystemState:
         """Load state from disk or create new state."""
@@ -203,6 +223,26 @@ class StateManager:
         )
         await self.add_capability(capability)
     
+    async def add_generated_files(self, file_paths: List[str], description: Optional[str] = None) -> None:
+        """Track several generated files and their capabilities with a single save."""
+        state = await self.get_state()
+        capabilities = {cap.name: cap for cap in state.capabilities}
+        for file_path in file_paths:
+            if file_path not in state.generated_files:
+                state.generated_files.append(file_path)
+            name = file_path.replace('/', '_').replace('.', '_')
+            desc = description or f"Capability for {file_path}"
+            cap = capabilities.get(name)
+            if cap is None:
+                cap = SystemCapability(name=name, description=desc, implemented=True, file_path=file_path)
+                state.capabilities.append(cap)
+                capabilities[name] = cap
+            else:
+                cap.description = desc
+                cap.implemented = True
+                cap.file_path = file_path
+        await self.save()
+
     async def get_unimplemented_capabilities(self) -> List[SystemCapability]:
         """Get list of capabilities that need implementation."""
         state = await self.get_state()
@@ -236,6 +276,36 @@ class StateManager:
         state.metadata["task_cache"] = cache
         await self.save()
 
+    # Phase checkpoints
+    async def get_checkpoint(self, task_hash: str) -> Optional[TaskCheckpoint]:
+        """Return the saved checkpoint for a decomposed task, if any."""
+        state = await self.get_state()
+        data = state.metadata.get(self.CHECKPOINT_KEY, {}).get(task_hash)
+        if data is None:
+            return None
+        return TaskCheckpoint(**data)
+
+    async def list_checkpoints(self) -> List[TaskCheckpoint]:
+        """Return all unfinished task checkpoints, most recently updated first."""
+        state = await self.get_state()
+        checkpoints = [TaskCheckpoint(**data) for data in state.metadata.get(self.CHECKPOINT_KEY, {}).values()]
+        return sorted(checkpoints, key=lambda c: c.updated_at, reverse=True)
+
+    async def save_checkpoint(self, checkpoint: TaskCheckpoint) -> None:
+        """Persist a task checkpoint immediately."""
+        state = await self.get_state()
+        checkpoint.updated_at = datetime.now()
+        state.metadata.setdefault(self.CHECKPOINT_KEY, {})[checkpoint.task_hash] = checkpoint.model_dump(mode='json')
+        await self.save()
+
+    async def clear_checkpoint(self, task_hash: str) -> bool:
+        """Remove a checkpoint once its task has finished. Returns False if unknown."""
+        state = await self.get_state()
+        if state.metadata.get(self.CHECKPOINT_KEY, {}).pop(task_hash, None) is None:
+            return False
+        await self.save()
+        return True
+
 
 # Global state manager instance
-state_manager = StateManager()
+state_manager: StateManager = Lazy(StateManager)
@@ -0,0 +1,180 @@
+"""Task deadlines and cooperative cancellation for agent work."""
+import asyncio
+import contextvars
+import inspect
+import math
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+# Absolute event-loop time by which the current task must finish (None = no deadline)
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("task_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a task runs past its deadline."""
+
+
+class TaskCancelled(Exception):
+    """Raised to the caller of TaskRegistry.run when the task was cancelled."""
+
+    def __init__(self, task_id: str):
+        super().__init__(f"Task {task_id} was cancelled")
+        self.task_id = task_id
+
+
+def remaining_time() -> float:
+    """Seconds left before the current deadline (math.inf when there is none)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return math.inf
+    return deadline - asyncio.get_running_loop().time()
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the current deadline has passed."""
+    if remaining_time() <= 0:
+        raise DeadlineExceeded("Task deadline exceeded")
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]):
+    """Apply a deadline of timeout seconds from now to the enclosed code.
+
+    Scopes nest: an inner scope can shorten the deadline but never extend it.
+    """
+    if timeout is None:
+        yield
+        return
+    new_deadline = asyncio.get_running_loop().time() + timeout
+    current = _deadline.get()
+    if current is not None:
+        new_deadline = min(new_deadline, current)
+    token = _deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def with_deadline(awaitable: Awaitable[T]) -> T:
+    """Await awaitable, cancelling it if the current deadline passes first."""
+    remaining = remaining_time()
+    if remaining == math.inf:
+        return await awaitable
+    if remaining <= 0:
+        # Close the coroutine cleanly instead of leaving it never awaited
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Task deadline exceeded")
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError as e:
+        # Let unrelated timeouts raised by the awaitable itself pass through
+        if isinstance(e, DeadlineExceeded) or remaining_time() > 0:
+            raise
+        raise DeadlineExceeded(f"Task deadline exceeded after waiting {remaining:.1f}s") from e
+
+
+class RunningTask:
+    """Bookkeeping for a task registered with the TaskRegistry."""
+
+    def __init__(self, task_id: str, description: str, task: asyncio.Task, timeout: Optional[float]):
+        self.id = task_id
+        self.description = description
+        self.task = task
+        self.timeout = timeout
+        self.started_at = datetime.now()
+        self.cancel_requested = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "started_at": self.started_at.isoformat(),
+            "timeout": self.timeout,
+            "cancel_requested": self.cancel_requested,
+        }
+
+
+class TaskRegistry:
+    """Tracks running agent tasks so they can be listed and cancelled."""
+
+    def __init__(self):
+        self._tasks: Dict[str, RunningTask] = {}
+
+    async def run(
+        self,
+        coro: Awaitable[T],
+        task_id: Optional[str] = None,
+        description: str = "",
+        timeout: Optional[float] = None,
+    ) -> T:
+        """Run coro as a cancellable task and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            task_id: Identifier used to cancel the task, generated if omitted
+            description: Human-readable description for listings
+            timeout: Deadline in seconds for the whole task
+
+        Returns:
+            The coroutine's result
+
+        Raises:
+            TaskCancelled: if the task was cancelled through cancel()
+            DeadlineExceeded: if the task ran past its deadline
+        """
+        task_id = task_id or str(uuid.uuid4())
+        if task_id in self._tasks:
+            if asyncio.iscoroutine(coro):
+                coro.close()
+            raise ValueError(f"Task {task_id} is already running")
+
+        async def _run_with_deadline():
+            with deadline_scope(timeout):
+                return await coro
+
+        task = asyncio.ensure_future(_run_with_deadline())
+        entry = RunningTask(task_id, description, task, timeout)
+        self._tasks[task_id] = entry
+        try:
+            return await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if entry.cancel_requested and not (current and current.cancelling()):
+                raise TaskCancelled(task_id) from None
+            raise
+        finally:
+            self._tasks.pop(task_id, None)
+            # Cancelled before it ever ran: close it to avoid a "never awaited" warning
+            if inspect.iscoroutine(coro) and inspect.getcoroutinestate(coro) == inspect.CORO_CREATED:
+                coro.close()
+
+    def cancel(self, task_id: str) -> bool:
+        """Request cancellation of a running task. Returns False if unknown."""
+        entry = self._tasks.get(task_id)
+        if entry is None or entry.task.done():
+            return False
+        entry.cancel_requested = True
+        entry.task.cancel()
+        return True
+
+    def cancel_all(self) -> int:
+        """Cancel every running task. Returns how many were cancelled."""
+        return sum(1 for task_id in list(self._tasks) if self.cancel(task_id))
+
+    def is_running(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def list_running(self) -> List[Dict[str, Any]]:
+        """Describe all running tasks."""
+        return [entry.to_dict() for entry in self._tasks.values()]
+
+
+# Global task registry
+task_registry = TaskRegistry()
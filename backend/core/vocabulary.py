@@ -0,0 +1,259 @@
+"""Project vocabulary index used to spot genuinely unfamiliar APIs in task text."""
+import os
+import re
+import ast
+import sys
+import json
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+from .config import settings
+
+
+# Directories never scanned for vocabulary
+SKIP_DIRS = {"node_modules", ".next", ".git", "__pycache__", "cache", ".venv", "venv"}
+
+# File extensions that mark a dotted token as a file name rather than an API
+FILE_EXTENSIONS = {
+    "py", "pyc", "js", "jsx", "ts", "tsx", "json", "md", "toml", "txt",
+    "yml", "yaml", "css", "html", "lock", "env", "cfg", "ini", "sh",
+}
+
+# Technologies the system is built on or talks about routinely
+KNOWN_TECH_TERMS = {
+    "javascript", "typescript", "python", "python3", "openai", "github",
+    "next.js", "nextjs", "node.js", "nodejs", "react", "react-native",
+    "tailwind", "tailwindcss", "fly.io", "flyio", "fastapi", "langchain",
+    "pydantic", "websocket", "websockets", "docker", "sqlite", "pnpm", "npm",
+    "pip", "git",
+}
+
+# Contexts that name a package explicitly, e.g. "pip install foo" or "the foo library"
+_TRIGGER_PATTERNS = [
+    re.compile(r"`([^`\s]+)`"),
+    re.compile(r"\bfrom\s+([A-Za-z_][\w.]*)\s+import\b"),
+    re.compile(r"(?:^|\n)\s*import\s+([A-Za-z_][\w.]*)"),
+    re.compile(r"\b(?:pip install|npm install|npm i|yarn add|pnpm add|poetry add)\s+([@\w./\-]+)", re.IGNORECASE),
+    re.compile(r"\brequire\(\s*['\"]([@\w./\-]+)['\"]"),
+    re.compile(r"\b([@\w./\-]+)\s+(?:library|package|module|sdk)\b", re.IGNORECASE),
+]
+
+# ES module imports: import React, { useState } from "react"
+_JS_IMPORT_PATTERN = re.compile(r"^\s*import\s+(.+?)\s+from\s+['\"]([^'\"]+)['\"]", re.MULTILINE)
+
+# Any identifier-ish token, including dotted and scoped (@scope/pkg) names
+_TOKEN_PATTERN = re.compile(r"(?<![\w@/.\-])(@?[A-Za-z_][\w\-]*(?:[./][A-Za-z_][\w\-]*)*)(?:\(\))?")
+
+
+def normalize(name: str) -> str:
+    """Normalize a package or identifier name for comparison."""
+    return name.strip().strip("`'\"()").lower().replace("-", "_")
+
+
+class VocabularyIndex:
+    """Index of package and API names the project already knows about.
+
+    Built lazily from backend/requirements.txt, frontend/package.json, the
+    standard library module list and the imports and definitions found across
+    backend/, so only identifiers outside this vocabulary are worth researching.
+    """
+
+    def __init__(self, project_root: Optional[Path] = None):
+        self._project_root = project_root
+        self._terms: Optional[Set[str]] = None
+
+    @property
+    def project_root(self) -> Path:
+        return self._project_root or settings.project_root
+
+    @property
+    def terms(self) -> Set[str]:
+        """Normalized known names, building the index on first use."""
+        if self._terms is None:
+            self._terms = self._build()
+        return self._terms
+
+    def refresh(self) -> None:
+        """Drop the index so it is rebuilt on next use."""
+        self._terms = None
+
+    def _build(self) -> Set[str]:
+        terms: Set[str] = set()
+        terms.update(normalize(t) for t in KNOWN_TECH_TERMS)
+        terms.update(normalize(m) for m in sys.stdlib_module_names)
+        terms.update(normalize(m) for m in sys.builtin_module_names)
+        terms.update(self._requirements_terms())
+        terms.update(self._package_json_terms())
+        terms.update(self._backend_terms())
+        terms.update(self._frontend_terms())
+        return terms
+
+    def _requirements_terms(self) -> Set[str]:
+        terms = set()
+        path = self.project_root / "backend" / "requirements.txt"
+        if not path.exists():
+            return terms
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if not line or line.startswith("-"):
+                continue
+            # Strip extras and version specifiers: "uvicorn[standard]==0.34.0" -> "uvicorn"
+            name = re.split(r"[\[<>=!~;\s]", line, maxsplit=1)[0]
+            if name:
+                terms.add(normalize(name))
+        return terms
+
+    def _package_json_terms(self) -> Set[str]:
+        terms = set()
+        path = self.project_root / "frontend" / "package.json"
+        if not path.exists():
+            return terms
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return terms
+        for section in ("dependencies", "devDependencies", "peerDependencies"):
+            for name in data.get(section, {}):
+                terms.add(normalize(name))
+                # "@types/react" is also known as "react"
+                terms.add(normalize(name.rsplit("/", 1)[-1]))
+        return terms
+
+    def _walk(self, root: Path, suffixes: Iterable[str]):
+        suffixes = tuple(suffixes)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for filename in filenames:
+                if filename.endswith(suffixes):
+                    yield Path(dirpath) / filename
+
+    def _backend_terms(self) -> Set[str]:
+        """Imported modules and names plus everything defined across backend/."""
+        terms = set()
+        backend = self.project_root / "backend"
+        if not backend.exists():
+            return terms
+        for path in self._walk(backend, [".py"]):
+            terms.add(normalize(path.stem))
+            try:
+                tree = ast.parse(path.read_text(encoding="utf-8"))
+            except (OSError, SyntaxError, UnicodeDecodeError):
+                continue
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    for alias in node.names:
+                        terms.add(normalize(alias.name.split(".")[0]))
+                        terms.add(normalize(alias.name))
+                elif isinstance(node, ast.ImportFrom):
+                    if node.module:
+                        terms.add(normalize(node.module.split(".")[0]))
+                        terms.add(normalize(node.module))
+                    for alias in node.names:
+                        terms.add(normalize(alias.name))
+                elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    terms.add(normalize(node.name))
+                elif isinstance(node, ast.Assign):
+                    for target in node.targets:
+                        if isinstance(target, ast.Name):
+                            terms.add(normalize(target.id))
+        return terms
+
+    def _frontend_terms(self) -> Set[str]:
+        """Module names plus imported names and sources across frontend/."""
+        terms = set()
+        frontend = self.project_root / "frontend"
+        if not frontend.exists():
+            return terms
+        for path in self._walk(frontend, [".ts", ".tsx", ".js", ".jsx"]):
+            terms.add(normalize(path.stem))
+            try:
+                source = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            for names, module in _JS_IMPORT_PATTERN.findall(source):
+                terms.add(normalize(module))
+                for name in re.findall(r"[A-Za-z_$][\w$]*", names):
+                    if name not in ("type", "as"):
+                        terms.add(normalize(name))
+        return terms
+
+    def is_known(self, identifier: str) -> bool:
+        """Check whether an identifier (or the package it belongs to) is known."""
+        name = normalize(identifier)
+        if not name:
+            return True
+        if name in self.terms:
+            return True
+        # Scoped npm packages must be known by their full name
+        if name.startswith("@"):
+            return False
+        # "fastapi.APIRouter" is known if its package is
+        return name.split(".", 1)[0] in self.terms
+
+    @staticmethod
+    def looks_like_api(token: str) -> bool:
+        """Whether a bare token has the shape of a package or API identifier."""
+        if "/" in token:
+            # Scoped npm package, otherwise a filesystem path
+            return token.startswith("@")
+        parts = token.split(".")
+        if len(parts) > 1:
+            # Skip file names ("state.py") and abbreviations ("e.g")
+            if parts[-1].lower() in FILE_EXTENSIONS or min(len(p) for p in parts) < 2:
+                return False
+            return True
+        if "_" in token.strip("_"):
+            return True
+        # camelCase / PascalCase with an inner hump, e.g. useEffect, APIRouter
+        return bool(re.search(r"[a-z][A-Z]|[A-Z]{2}[a-z]", token))
+
+    def candidates(self, text: str) -> List[str]:
+        """Extract API-like identifiers from text, in order of appearance."""
+        found = []
+        spans = []
+        for pattern in _TRIGGER_PATTERNS:
+            for match in pattern.finditer(text):
+                found.append((match.start(1), match.group(1)))
+                spans.append(match.start(1))
+        for match in _TOKEN_PATTERN.finditer(text):
+            if match.start(1) in spans:
+                continue
+            token = match.group(1)
+            if self.looks_like_api(token):
+                found.append((match.start(1), token))
+
+        ordered = []
+        seen = set()
+        for _, token in sorted(found):
+            token = token.strip("`'\"").rstrip(".,;:")
+            if "://" in token or len(token) < 3:
+                continue
+            key = normalize(token)
+            if key not in seen:
+                seen.add(key)
+                ordered.append(token)
+        return ordered
+
+    def detect_unknown(self, text: str, extra_known: Iterable[str] = (), limit: int = 3) -> List[str]:
+        """Return up to limit identifiers from text that the project does not know.
+
+        Args:
+            text: Free-form task description
+            extra_known: Additional names to treat as known
+            limit: Maximum number of identifiers to return
+
+        Returns:
+            Unknown identifiers in order of appearance
+        """
+        extra = {normalize(name) for name in extra_known}
+        unknown = []
+        for token in self.candidates(text):
+            if normalize(token) in extra or self.is_known(token):
+                continue
+            unknown.append(token)
+            if len(unknown) >= limit:
+                break
+        return unknown
+
+
+# Global vocabulary index (built on first use)
+vocabulary_index = VocabularyIndex()
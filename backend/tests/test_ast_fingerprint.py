@@ -0,0 +1,138 @@
+import tempfile
+import unittest
+from pathlib import Path
+from backend.core.ast_fingerprint import DefinitionIndex, extract_definitions, find_duplicate_definitions
+from backend.core.file_index import FileIndex
+
+
+CACHE_HELPERS = '''
+class StateManager:
+    async def get_cached_result(self, prompt_hash):
+        """Return cached result if prompt_hash is recent, else None."""
+        state = await self.get_state()
+        entry = state.metadata.get("prompt_cache", {}).get(prompt_hash)
+        if entry and entry.get("timestamp"):
+            if now() - parse(entry["timestamp"]) < self.CACHE_EXPIRATION:
+                return entry.get("result")
+        return None
+
+    async def get_cached_result(self, task_hash):
+        state = await self.get_state()
+        return state.metadata.get("task_cache", {}).get(task_hash)
+'''
+
+HELPER = '''
+def chunked(items, size=100):
+    """Split items into lists of at most size."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+'''
+
+# The same helper, renamed throughout, with other literals and no docstring
+RENAMED = '''
+def batches(values, limit=25):
+    current = []
+    for value in values:
+        current.append(value)
+        if len(current) >= limit:
+            yield current
+            current = []
+    if current:
+        yield current
+'''
+
+# Same shape of names, different structure
+DIFFERENT = HELPER.replace("if len(batch) >= size:", "if len(batch) > size:")
+
+
+class TestFingerprints(unittest.TestCase):
+    def test_canonicalizes_identifiers_and_literals(self):
+        [a], [b], [c] = (extract_definitions(src) for src in (HELPER, RENAMED, DIFFERENT))
+        self.assertEqual(a.fingerprint, b.fingerprint)
+        self.assertNotEqual(a.fingerprint, c.fingerprint)
+        self.assertEqual((a.qualname, a.kind, a.lineno, a.end_lineno), ("chunked", "function", 2, 11))
+
+    def test_name_pattern_matters(self):
+        [a] = extract_definitions("def f(x, y):\n    return x + y\n")
+        [b] = extract_definitions("def f(x, y):\n    return x + x\n")
+        self.assertNotEqual(a.fingerprint, b.fingerprint)
+
+    def test_nested_definitions(self):
+        definitions = extract_definitions("class A:\n    def m(self):\n        def inner():\n            pass\n")
+        self.assertEqual([(d.qualname, d.kind) for d in definitions], [("A", "class"), ("A.m", "function"), ("A.m.inner", "function")])
+
+
+class TestFindDuplicates(unittest.TestCase):
+    def test_within_and_across_files(self):
+        report = find_duplicate_definitions([
+            ("utils.py", HELPER + RENAMED.replace("batches", "batches2")),
+            ("jobs/queue.py", "import os\n" + RENAMED),
+            ("other.py", DIFFERENT),
+            ("broken.py", "def broken(:\n"),
+        ])
+        self.assertEqual((report.files, report.errors), (3, ["broken.py"]))
+        [group] = report.duplicates
+        self.assertTrue(group.cross_file)
+        self.assertEqual(sorted((d.path, d.qualname) for d in group.definitions),
+                         [("jobs/queue.py", "batches"), ("utils.py", "batches2"), ("utils.py", "chunked")])
+
+    def test_redefinitions(self):
+        report = find_duplicate_definitions([("state.py", CACHE_HELPERS)])
+        [redefined] = report.redefinitions
+        self.assertEqual([(d.qualname, d.lineno) for d in redefined],
+                         [("StateManager.get_cached_result", 3), ("StateManager.get_cached_result", 12)])
+
+    def test_conditional_definitions_are_not_redefinitions(self):
+        source = "try:\n    import ujson\n    def load(s):\n        return ujson.loads(s)\nexcept ImportError:\n    def load(s):\n        return None\n"
+        self.assertEqual(find_duplicate_definitions([("compat.py", source)]).redefinitions, [])
+
+    def test_methods_of_duplicated_classes_are_reported_once(self):
+        cls = "class Cache{0}:\n" + "".join("    " + line + "\n" for line in HELPER.strip().splitlines())
+        report = find_duplicate_definitions([("a.py", cls.format(1)), ("b.py", cls.format(2))])
+        self.assertEqual([[d.qualname for d in g.definitions] for g in report.duplicates], [["Cache1", "Cache2"]])
+
+    def test_small_definitions_ignored(self):
+        source = "def a(self):\n    return self.x\n\ndef b(self):\n    return self.y\n"
+        self.assertEqual(find_duplicate_definitions([("m.py", source)]).duplicates, [])
+
+
+class TestDefinitionIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        for i in range(40):
+            (self.root / f"pkg{i % 4}").mkdir(exist_ok=True)
+            body = RENAMED.replace("batches", f"batches{i}") if i % 10 == 0 else f"def f{i}():\n    return {i}\n"
+            (self.root / f"pkg{i % 4}" / f"m{i}.py").write_text(body)
+        (self.root / "state.py").write_text(CACHE_HELPERS)
+        self.index = DefinitionIndex(files=FileIndex(root=self.root, poll_interval=0), workers=2)
+
+    def tearDown(self):
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def test_scan_uses_pool_and_cache(self):
+        report = self.index.scan_sync()
+        self.assertEqual((report.files, report.parsed), (41, 41))
+        [group] = report.duplicates
+        self.assertEqual(len(group.definitions), 4)
+        self.assertEqual(len(report.redefinitions), 1)
+
+        (self.root / "pkg0" / "m0.py").write_text("x = 1\n")
+        self.index.files.refresh()
+        report = self.index.scan_sync()
+        self.assertEqual(report.parsed, 1)
+        self.assertEqual(len(report.duplicates[0].definitions), 3)
+
+        report = self.index.scan_sync("pkg1")
+        self.assertEqual((report.files, report.duplicates), (10, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -59,5 +59,133 @@ class TestBaseTools(unittest.IsolatedAsyncioTestCase):
         not_exists = await base_tools.check_file_exists("nonexistent.file")
         self.assertEqual(not_exists, "not found")
 
+class TemporaryProjectTestCase(unittest.IsolatedAsyncioTestCase):
+    """Points the tools at an empty temporary project root and state file."""
+
+    async def asyncSetUp(self):
+        import tempfile
+        from pathlib import Path
+        from backend.core.state import StateManager
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.state = StateManager(state_file=self.root / "state.json")
+        self.patches = [
+            patch.object(settings, "project_root", self.root),
+            patch.object(base_tools, "state_manager", self.state),
+        ]
+        for p in self.patches:
+            p.start()
+
+    async def asyncTearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.temp_dir.cleanup()
+
+
+class TestBatchFileTools(TemporaryProjectTestCase):
+    async def test_write_files_then_read_files(self):
+        result = await base_tools.write_files.ainvoke({"changes": [
+            {"file_path": "backend/tools/new_tool.py", "content": "VALUE = 1\n"},
+            {"file_path": "backend/tests/test_new_tool.py", "content": "import unittest\n"},
+        ]})
+        self.assertIn("Successfully wrote backend/tools/new_tool.py", result)
+        state = await self.state.get_state()
+        self.assertIn("backend/tests/test_new_tool.py", state.generated_files)
+
+        read = await base_tools.read_files.ainvoke({"file_paths": [
+            "backend/tools/new_tool.py", "backend/tests/test_new_tool.py",
+        ]})
+        self.assertIn("=== backend/tools/new_tool.py ===\nVALUE = 1", read)
+        self.assertIn("=== backend/tests/test_new_tool.py ===\nimport unittest", read)
+
+    async def test_write_files_rejects_whole_batch(self):
+        result = await base_tools.write_files.ainvoke({"changes": [
+            {"file_path": "backend/ok.py", "content": "x = 1\n"},
+            {"file_path": "frontend/wrong.py", "content": "x = 2\n"},
+        ]})
+        self.assertIn("Nothing was written", result)
+        self.assertFalse((self.root / "backend/ok.py").exists())
+
+    async def test_reads_see_writes_through_the_shared_cache(self):
+        from backend.core.content_cache import ContentCache
+        cache = ContentCache()
+        with patch("backend.core.fileio.content_cache", cache), patch.object(base_tools, "content_cache", cache):
+            await base_tools.write_file.ainvoke({"file_path": "backend/mod.py", "content": "A = 1\n"})
+            self.assertEqual(await base_tools.read_file.ainvoke({"file_path": "backend/mod.py"}), "A = 1\n")
+            await base_tools.read_file.ainvoke({"file_path": "backend/mod.py"})
+            self.assertEqual(cache.hits, 1)
+            await base_tools.write_file.ainvoke({"file_path": "backend/mod.py", "content": "A = 2\n"})
+            self.assertEqual(await base_tools.read_file.ainvoke({"file_path": "backend/mod.py"}), "A = 2\n")
+            await base_tools.apply_patch.ainvoke({
+                "file_path": "backend/mod.py",
+                "patch": "<<<<<<< SEARCH\nA = 2\n=======\nA = 3\n>>>>>>> REPLACE\n",
+            })
+            self.assertEqual(await base_tools.read_file.ainvoke({"file_path": "backend/mod.py"}), "A = 3\n")
+        self.assertEqual(cache.stats()["invalidations"], 2)
+
+
+class TestApplyPatchTool(TemporaryProjectTestCase):
+    async def test_patches_file(self):
+        (self.root / "backend").mkdir()
+        (self.root / "backend/calc.py").write_text("def add(a, b):\n    return a + b\n")
+        result = await base_tools.apply_patch.ainvoke({
+            "file_path": "backend/calc.py",
+            "patch": "@@ -1,2 +1,2 @@\n def add(a, b):\n-    return a + b\n+    return b + a\n",
+        })
+        self.assertIn("Successfully patched", result)
+        self.assertEqual((self.root / "backend/calc.py").read_text(), "def add(a, b):\n    return b + a\n")
+
+    async def test_protected_file_queues_patch(self):
+        (self.root / "backend").mkdir()
+        (self.root / "backend/api.py").write_text("app = None\n")
+        patch_text = "<<<<<<< SEARCH\napp = None\n=======\napp = 1\n>>>>>>> REPLACE\n"
+        with patch.object(base_tools.file_guardian, "request_approval") as request_approval:
+            request_approval.return_value.id = "abc123"
+            result = await base_tools.apply_patch.ainvoke({"file_path": "backend/api.py", "patch": patch_text})
+        self.assertIn("QUEUED FOR APPROVAL", result)
+        self.assertEqual(request_approval.call_args.kwargs["patch"], patch_text)
+        self.assertNotIn("content", request_approval.call_args.kwargs)
+        self.assertEqual((self.root / "backend/api.py").read_text(), "app = None\n")
+
+
+class TestQueryStateTool(TemporaryProjectTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        from backend.core.state import BuildStep, SystemCapability
+        for i in range(5):
+            await self.state.add_build_step(BuildStep(
+                id=f"step-{i}", agent="builder" if i % 2 else "planner", action=f"Task {i} " + "x" * 500,
+                status="failed" if i == 3 else "completed", error="boom" if i == 3 else None,
+            ))
+        await self.state.add_capability(SystemCapability(name="api", description="REST API", implemented=True))
+        await self.state.add_capability(SystemCapability(name="ui", description="Dashboard"))
+        await self.state.add_generated_files(["backend/api.py", "frontend/app.tsx"])
+
+    async def test_summary(self):
+        result = await base_tools.query_state.ainvoke({})
+        self.assertIn("Build steps: 5 (completed 4, failed 1)", result)
+        self.assertIn("Capabilities: 3/4 implemented", result)  # generated files register capabilities too
+
+    async def test_steps_are_filtered_and_paged(self):
+        result = await base_tools.query_state.ainvoke({"section": "steps", "agent": "planner", "limit": 2})
+        lines = result.splitlines()
+        # Newest first, long actions clipped
+        self.assertIn("[step-4] Task 4", lines[0])
+        self.assertIn("[step-2] Task 2", lines[1])
+        self.assertLess(len(lines[0]), 250)
+        self.assertEqual(lines[-1], "[steps 1-2 of 3; next page: offset=2]")
+
+        failed = await base_tools.query_state.ainvoke({"section": "steps", "status": "failed"})
+        self.assertIn("| error: boom", failed)
+        self.assertTrue(failed.endswith("[steps 1-1 of 1]"))
+
+    async def test_capabilities_and_files(self):
+        missing = await base_tools.query_state.ainvoke({"section": "capabilities", "status": "missing"})
+        self.assertTrue(missing.startswith("[ ] ui: Dashboard"))
+        files = await base_tools.query_state.ainvoke({"section": "files", "contains": "FRONTEND"})
+        self.assertEqual(files, "frontend/app.tsx\n[files 1-1 of 1]")
+        self.assertIn("Unknown section", await base_tools.query_state.ainvoke({"section": "all"}))
+
+
 if __name__ == '__main__':
     unittest.main()
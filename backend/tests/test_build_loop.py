@@ -19,7 +19,7 @@ class TestBuildLoopAgent(unittest.IsolatedAsyncioTestCase):
 
         # Mock research results
         research_results = {'insights': 'some research data'}
-        mock_researcher.research_before_build.return_value = research_results
+        mock_researcher.research_before_build = AsyncMock(return_value=research_results)
 
         # Mock orchestrator.run to simulate build and test steps
         mock_orchestrator_run.return_value = {'output': 'code output'}
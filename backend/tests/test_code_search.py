@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from pathlib import Path
+from backend.core.file_index import FileIndex
+from backend.core.code_search import CodeSearchIndex, required_literals
+
+
+class TestRequiredLiterals(unittest.TestCase):
+    def test_extracts_top_level_literals(self):
+        self.assertEqual(required_literals(r"def\s+run_job\("), ["def", "run_job("])
+        self.assertEqual(required_literals(r"colou?r"), ["colo", "r"])
+        self.assertEqual(required_literals(r"file_index\.start"), ["file_index.start"])
+        self.assertEqual(required_literals(r"(get|add)_cached"), ["_cached"])
+        self.assertEqual(required_literals(r"foo|bar"), [])
+        self.assertEqual(required_literals(r"[abc]+xyz"), ["xyz"])
+
+    def test_quantifier_bounds_are_not_literals(self):
+        self.assertEqual(required_literals(r"port = \d{4,5}"), ["port = "])
+        self.assertEqual(required_literals(r"\d{3}-\d{4}"), ["-"])
+        self.assertEqual(required_literals(r"x{10,200}"), [])
+        self.assertEqual(required_literals(r"[a-z]{100}"), [])
+        self.assertEqual(required_literals(r"ab{,3}cd"), ["a", "cd"])
+        # A brace that is not a quantifier only ends the run
+        self.assertEqual(required_literals(r"f{x}y"), ["f", "x", "y"])
+
+
+class TestCodeSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.write("backend/jobs.py", "import asyncio\n\n\nclass JobQueue:\n    def submit(self):\n        pass\n")
+        self.write("backend/api.py", "from jobs import JobQueue\n\nqueue = JobQueue()\n")
+        self.write("frontend/app.tsx", "export const jobQueue = 1;\n")
+        self.files = FileIndex(root=self.root, poll_interval=0)
+        self.index = CodeSearchIndex(files=self.files)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, rel, content):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    def test_literal_search(self):
+        hits = self.index.search("JobQueue", case_sensitive=True)
+        self.assertEqual(hits, [("backend/api.py", 1), ("backend/api.py", 3), ("backend/jobs.py", 4)])
+        # Case-insensitive by default
+        self.assertIn(("frontend/app.tsx", 1), self.index.search("jobqueue"))
+
+    def test_regex_glob_and_limit(self):
+        hits = self.index.search(r"class\s+\w+Queue", regex=True)
+        self.assertEqual(hits, [("backend/jobs.py", 4)])
+        self.assertEqual(self.index.search("JobQueue", path_glob="frontend/*"), [("frontend/app.tsx", 1)])
+        self.assertEqual(len(self.index.search("JobQueue", max_results=2)), 2)
+
+    def test_regex_quantifiers(self):
+        self.write("backend/config.py", f"port = 8000\nphone = 555-0199\nword = {'a' * 120}\n")
+        self.files.refresh()
+        self.assertEqual(self.index.search(r"port = \d{4,5}", regex=True), [("backend/config.py", 1)])
+        self.assertEqual(self.index.search(r"\d{3}-\d{4}", regex=True), [("backend/config.py", 2)])
+        self.assertEqual(self.index.search(r"[a-z]{100}", regex=True), [("backend/config.py", 3)])
+
+    def test_context_formatting(self):
+        hits = self.index.search("def submit")
+        self.assertEqual(
+            self.index.format_hits(hits, context_lines=1),
+            "backend/jobs.py-4-class JobQueue:\n"
+            "backend/jobs.py:5:    def submit(self):\n"
+            "backend/jobs.py-6-        pass",
+        )
+
+    def test_follows_file_changes(self):
+        self.assertEqual(self.index.search("def cancel"), [])
+        self.write("backend/jobs.py", "class JobQueue:\n    def cancel(self):\n        pass\n")
+        self.files.refresh()
+        self.assertEqual(self.index.search("def cancel"), [("backend/jobs.py", 2)])
+        self.assertEqual(self.index.search("def submit"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from backend.core.content_cache import ContentCache
+
+
+class TestContentCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.cache = ContentCache(max_bytes=100)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        path = self.root / name
+        path.write_bytes(content)
+        return path
+
+    async def test_hits_until_the_file_changes(self):
+        path = self.write("a.py", b"one")
+        self.assertEqual(await self.cache.read(path), b"one")
+        self.assertEqual(await self.cache.read(str(path)), b"one")
+        self.assertEqual((self.cache.hits, self.cache.misses, self.cache.bytes_saved), (1, 1, 3))
+
+        # External edit: a different size or mtime is a miss
+        self.write("a.py", b"three")
+        self.assertEqual(await self.cache.read(path), b"three")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        await self.cache.read(path)
+        self.assertEqual(self.cache.misses, 3)
+
+    async def test_invalidate(self):
+        path = self.write("a.py", b"old")
+        await self.cache.read(path)
+        stat = path.stat()
+        # Same size and mtime: only an explicit invalidation reveals the change
+        self.write("a.py", b"new")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(await self.cache.read(path), b"old")
+        self.cache.invalidate(path)
+        self.assertEqual(await self.cache.read(path), b"new")
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    async def test_lru_is_bounded_by_bytes(self):
+        paths = [self.write(f"{i}.py", bytes([65 + i]) * 40) for i in range(3)]
+        await self.cache.read(paths[0])
+        await self.cache.read(paths[1])
+        await self.cache.read(paths[0])  # paths[1] is now least recently used
+        await self.cache.read(paths[2])
+        stats = self.cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["evictions"]), (2, 80, 1))
+        await self.cache.read(paths[0])
+        self.assertEqual(self.cache.hits, 2)
+        # Files larger than the whole cache are read but not kept
+        big = self.write("big.py", b"x" * 200)
+        self.assertEqual(len(await self.cache.read(big)), 200)
+        self.assertEqual(self.cache.stats()["bytes"], 80)
+
+    async def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            await self.cache.read(self.root / "missing.py")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from aiohttp import web
+from backend.core.doc_crawler import DocCrawler, canonical_url, in_scope
+from backend.core.doc_index import DocIndex
+from backend.core.http_cache import CachedHttpClient
+
+
+PAGES = {
+    "/docs/": """<html><title>Home</title><body>Welcome to the widget docs.
+        <a href="/docs/a">A</a> <a href="b#install">B</a> <a href="/docs/index.html?utm_source=nav">Home</a>
+        <a href="/blog">Blog</a> <a href="/docs-old/">Old</a> <a href="/docs/private">Private</a>
+        <a href="/docs/logo.png">Logo</a> <a href="mailto:team@example.com">Mail</a></body></html>""",
+    "/docs/a": """<html><title>Configuration</title><body>Widgets read a WidgetConfig.
+        <a href="/docs/c">C</a></body></html>""",
+    "/docs/b": """<html><head><link rel="canonical" href="/docs/a"></head>
+        <body>Widgets read a WidgetConfig.</body></html>""",
+    "/docs/c": "<html><title>Deploy</title><body>Deploying widgets to production.</body></html>",
+    "/docs/private": "<html><body>Internal</body></html>",
+    "/blog": "<html><body>Blog</body></html>",
+}
+
+
+class TestCanonicalUrl(unittest.TestCase):
+    def test_normalizes(self):
+        self.assertEqual(canonical_url("HTTPS://Docs.Example.com:443/a//b/index.html?b=2&a=1&utm_medium=x#top"),
+                         "https://docs.example.com/a/b/?a=1&b=2")
+        self.assertEqual(canonical_url("../guide", "https://example.com/docs/api/"), "https://example.com/docs/guide")
+        self.assertIsNone(canonical_url("mailto:team@example.com"))
+        self.assertIsNone(canonical_url("javascript:void(0)"))
+
+    def test_scope(self):
+        self.assertTrue(in_scope("https://x.dev/docs/a", "https://x.dev/docs"))
+        self.assertTrue(in_scope("https://x.dev/docs", "https://x.dev/docs"))
+        self.assertFalse(in_scope("https://x.dev/docs-old", "https://x.dev/docs"))
+        self.assertTrue(in_scope("https://x.dev/docs/a", "https://x.dev/"))
+
+
+class TestDocCrawler(unittest.IsolatedAsyncioTestCase):
+    """Crawls a local stand-in for a documentation site."""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.sent = []
+        self.release_c = asyncio.Event()
+        self.release_c.set()
+
+        async def handler(request):
+            self.requests.append((request.path, time.monotonic()))
+            if request.path == "/robots.txt":
+                return web.Response(text="User-agent: *\nDisallow: /docs/private\n")
+            if request.path == "/docs/c":
+                await self.release_c.wait()
+            if request.path not in PAGES:
+                return web.Response(status=404)
+            return web.Response(text=PAGES[request.path], content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = DocIndex(path=f"{self.temp_dir.name}/docs.sqlite3")
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+        await self.runner.cleanup()
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def make_crawler(self, **kwargs):
+        # A fresh HTTP cache per crawler, so every fetch reaches the server
+        client = CachedHttpClient(cache_dir=f"{self.temp_dir.name}/http{len(self.clients)}", ttl=60, delay=0.02)
+        self.clients.append(client)
+        get = client.get
+
+        async def timed_get(url, *args, **kwargs):
+            # When the crawler sends each request, on the loop's clock
+            self.sent.append(asyncio.get_running_loop().time())
+            return await get(url, *args, **kwargs)
+
+        client.get = timed_get
+        options = dict(state_dir=f"{self.temp_dir.name}/crawl", per_host=2, delay=0.02, client=client, index=self.index)
+        options.update(kwargs)
+        return DocCrawler(**options)
+
+    def page_requests(self, path=None):
+        return [at for p, at in self.requests if p != "/robots.txt" and (path is None or p == path)]
+
+    async def test_crawls_within_prefix(self):
+        crawler = self.make_crawler()
+        progress = await crawler.crawl("widgets", f"{self.base}/docs/")
+
+        self.assertEqual(progress.status, "completed")
+        self.assertEqual(sorted(p for p, _ in self.requests if p != "/robots.txt"), ["/docs/", "/docs/a", "/docs/b", "/docs/c"])
+        self.assertEqual((progress.fetched, progress.indexed, progress.duplicates, progress.blocked), (4, 3, 1, 1))
+        self.assertEqual(self.index.libraries(), {"widgets": 3})
+        hits = self.index.search("WidgetConfig", ["widgets"])
+        self.assertEqual([hit.ref for hit in hits], [f"{self.base}/docs/a"])
+
+        # Every request to the host, robots.txt included, started at least
+        # delay after the previous one (with a little scheduling tolerance)
+        gaps = [b - a for a, b in zip(self.sent, self.sent[1:])]
+        self.assertEqual(len(gaps), 4)
+        self.assertGreaterEqual(min(gaps), 0.02 * 0.8)
+
+        status = crawler.status("widgets")["widgets"]
+        self.assertEqual((status["status"], status["queued"]), ("completed", 0))
+
+    async def test_page_budget(self):
+        progress = await self.make_crawler(max_pages=2).crawl("widgets", f"{self.base}/docs/")
+        self.assertEqual((progress.status, progress.fetched), ("completed", 2))
+        self.assertEqual(len(self.page_requests()), 2)
+
+    async def test_stopped_crawl_resumes(self):
+        self.release_c.clear()
+        crawler = self.make_crawler()
+        crawler.start({"widgets": f"{self.base}/docs/"})
+        for _ in range(200):
+            # Stop while /docs/c is in flight and /docs/b (a duplicate of /docs/a) is done
+            if self.page_requests("/docs/c") and crawler.status("widgets")["widgets"]["duplicates"] == 1:
+                break
+            await asyncio.sleep(0.01)
+        await crawler.stop()
+        saved = crawler.status("widgets")["widgets"]
+        self.assertEqual((saved["status"], saved["queued"]), ("cancelled", 1))
+
+        self.release_c.set()
+        progress = await self.make_crawler().crawl("widgets", f"{self.base}/docs/")
+        self.assertEqual(progress.status, "completed")
+        # Only the unfinished page was fetched again
+        self.assertEqual(len(self.page_requests("/docs/")), 1)
+        self.assertEqual(len(self.page_requests("/docs/c")), 2)
+        self.assertEqual(self.index.libraries(), {"widgets": 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
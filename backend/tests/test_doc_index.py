@@ -0,0 +1,73 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from backend.core.doc_index import DocIndex, fts_query, html_to_text, split_sections
+
+
+PAGE = """<html><head><title>FastAPI Routing</title><script>var x = "APIRouter";</script></head>
+<body><h1>Bigger applications</h1><p>Use an APIRouter to split routes across modules.</p>
+<p>Dependencies can be declared per router.</p></body></html>"""
+
+
+class TestHelpers(unittest.TestCase):
+    def test_html_to_text(self):
+        title, text = html_to_text(PAGE)
+        self.assertEqual(title, "FastAPI Routing")
+        self.assertIn("Use an APIRouter to split routes across modules.", text)
+        self.assertNotIn("var x", text)
+
+    def test_split_sections(self):
+        text = " ".join(f"Sentence number {i}." for i in range(200))
+        sections = split_sections(text, size=300)
+        self.assertTrue(all(len(s) <= 300 for s in sections))
+        self.assertTrue(all(s.endswith(".") for s in sections[:-1]))
+        self.assertEqual(" ".join(sections), text)
+
+    def test_fts_query(self):
+        self.assertEqual(fts_query('How do I use "APIRouter" in next.js?'),
+                         '"how" OR "do" OR "i" OR "use" OR "apirouter" OR "in" OR "next" OR "js"')
+        self.assertIsNone(fts_query("?!"))
+
+
+class TestDocIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = DocIndex(path=Path(self.temp_dir.name) / "docs.sqlite3")
+        self.index.add_html("FastAPI", "https://fastapi.example/routing", PAGE)
+        self.index.add_page("python", "https://python.example/asyncio", "asyncio runs coroutines. Use asyncio.gather to run them concurrently.", "asyncio")
+
+    def tearDown(self):
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def test_search_ranks_and_filters(self):
+        hits = self.index.search("split routes with an APIRouter")
+        self.assertEqual(hits[0].ref, "https://fastapi.example/routing")
+        self.assertEqual((hits[0].source, hits[0].title), ("fastapi", "FastAPI Routing"))
+        self.assertIn("APIRouter", hits[0].text)
+        # Stemming: "coroutine" matches "coroutines"
+        self.assertEqual(self.index.search("coroutine")[0].source, "python")
+        self.assertEqual(self.index.search("coroutine", libraries=["fastapi"]), [])
+        self.assertEqual(self.index.search("???"), [])
+
+    def test_readding_pages(self):
+        self.assertFalse(self.index.add_html("fastapi", "https://fastapi.example/routing", PAGE))
+        self.assertTrue(self.index.add_page("fastapi", "https://fastapi.example/routing", "Now about middleware."))
+        self.assertEqual(self.index.search("APIRouter"), [])
+        self.assertEqual(self.index.libraries(), {"fastapi": 1, "python": 1})
+        self.assertEqual(self.index.remove_library("fastapi"), 1)
+        self.assertFalse(self.index.has_library("fastapi"))
+        self.assertEqual(self.index.search("middleware"), [])
+
+    def test_search_is_fast(self):
+        for i in range(300):
+            self.index.add_page("bulk", f"https://bulk.example/{i}", f"Page {i} about topic{i % 17} and routing. " * 40)
+        started = time.perf_counter()
+        hits = self.index.search("routing topic3 APIRouter", limit=5)
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertEqual(len(hits), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from backend.core.docs_cache import DocsCache
+
+
+URL = "https://docs.example.com/guide"
+
+
+class TestDocsCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_cache(self, **kwargs):
+        options = dict(cache_dir=self.temp_dir.name, max_bytes=1000, ttl=60, max_age=3600)
+        options.update(kwargs)
+        return DocsCache(**options)
+
+    def later(self, seconds):
+        real_time = time.time
+        return patch("backend.core.docs_cache.time.time", lambda: real_time() + seconds)
+
+    def test_hits_and_misses(self):
+        self.assertIsNone(self.cache.lookup(URL))
+        self.cache.write(URL, ".html", "<html>guide</html>")
+        self.assertEqual(self.cache.lookup(URL).read_text(), "<html>guide</html>")
+        self.assertIsNone(self.cache.lookup(URL, ".txt"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 2, 1))
+        self.assertEqual(stats["bytes"], len("<html>guide</html>"))
+
+    def test_index_survives_restart(self):
+        self.cache.write(URL, ".html", "<html>guide</html>")
+        self.cache.lookup(URL)
+        self.cache.flush()
+        reopened = self.make_cache()
+        self.assertIsNotNone(reopened.lookup(URL))
+        self.assertEqual(reopened.stats()["entries"], 1)
+
+    def test_evicts_least_recently_used(self):
+        for i in range(3):
+            self.cache.write(f"{URL}/{i}", ".html", "x" * 400)
+            time.sleep(0.01)
+        # Only two pages fit; page 0 was used least recently
+        self.assertIsNone(self.cache.lookup(f"{URL}/0"))
+        self.cache.lookup(f"{URL}/1")
+        self.cache.write(f"{URL}/3", ".html", "x" * 400)
+        self.assertIsNotNone(self.cache.lookup(f"{URL}/1"))
+        self.assertIsNone(self.cache.lookup(f"{URL}/2"))
+        self.assertEqual(self.cache.stats()["evictions"], 2)
+
+    def test_expired_pages_are_not_served(self):
+        self.cache.write(URL, ".html", "<html>old</html>")
+        with self.later(7200):
+            self.assertIsNone(self.cache.lookup(URL))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+        self.assertEqual(list(self.cache.cache_dir.glob("*.html")), [])
+
+    def test_stale_pages_are_refreshed_in_the_background(self):
+        self.cache.write(URL, ".html", "<html>old</html>")
+        self.cache.write(URL, ".txt", "old")
+        fetched = threading.Event()
+
+        def fetch(url):
+            fetched.wait(5)
+            return "<html>new</html>"
+
+        with self.later(120):
+            # The stale copy is served at once, and only one refresh starts
+            self.assertEqual(self.cache.lookup(URL, refresh=fetch).read_text(), "<html>old</html>")
+            self.assertIsNotNone(self.cache.lookup(URL, ".txt", refresh=fetch))
+            self.assertEqual(self.cache.stats()["refreshing"], 1)
+            fetched.set()
+            for _ in range(100):
+                if not self.cache.stats()["refreshing"]:
+                    break
+                time.sleep(0.01)
+            stats = self.cache.stats()
+        self.assertEqual((stats["stale_hits"], stats["refreshes"]), (2, 1))
+        self.assertEqual(self.cache.lookup(URL).read_text(), "<html>new</html>")
+        # Text extracted from the old HTML is gone
+        self.assertIsNone(self.cache.lookup(URL, ".txt"))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_per_entry_ttl(self):
+        self.cache.write(URL, ".html", "<html>news</html>", ttl=1)
+        with self.later(10):
+            self.cache.lookup(URL)
+        self.assertEqual(self.cache.stats()["stale_hits"], 1)
+
+    def test_adopts_files_without_index(self):
+        self.cache.write(URL, ".html", "<html>guide</html>")
+        (self.cache.cache_dir / "index.json").unlink()
+        reopened = self.make_cache()
+        self.assertIsNotNone(reopened.lookup(URL))
+        reopened.clear()
+        self.assertEqual(list(reopened.cache_dir.glob("*.html")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
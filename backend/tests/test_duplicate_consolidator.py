@@ -1,23 +1,36 @@
-import asyncio
-import os
 import pytest
 from backend.agents.duplicate_consolidator import DuplicateConsolidatorAgent
 
-@pytest.mark.asyncio
-async def test_list_similar_files(tmp_path):
-    # Create files with similar base names
-    f1 = tmp_path / "module1.py"
-    f2 = tmp_path / "module1_v2.py"
-    f3 = tmp_path / "module2.py"
-    f1.write_text("def foo(): pass")
-    f2.write_text("def foo(): pass")
-    f3.write_text("def bar(): pass")
 
+def module_source(name, functions=20):
+    return "".join(
+        f"def {name}_{i}(value, limit={i}):\n    if value > limit:\n        return value - {i}\n    return limit * {i + 1}\n\n"
+        for i in range(functions)
+    )
+
+
+@pytest.fixture
+def files(tmp_path):
+    original = module_source("parse")
+    paths = {
+        "module1.py": original,
+        # A newer version with one extra function: more complete
+        "module1_v2.py": original + "def extra(value):\n    return value\n",
+        "module2.py": "".join(f"class Widget{i}:\n    items = [{i}, {i * 2}]\n\n    def render(self):\n        return '<w{i}>' + str(self.items)\n\n" for i in range(20)),
+    }
+    for name, content in paths.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(content)
+    return [str(tmp_path / name) for name in paths]
+
+
+@pytest.mark.asyncio
+async def test_list_similar_files(files):
     agent = DuplicateConsolidatorAgent()
-    files = [str(f1), str(f2), str(f3)]
     similar = await agent._list_similar_files(files)
-    assert (str(f1), str(f2)) in similar or (str(f2), str(f1)) in similar
-    assert all(isinstance(pair, tuple) and len(pair) == 2 for pair in similar)
+    # Found by content, not by name
+    assert similar[0] in ((files[0], files[1]), (files[1], files[0]))
+    assert all(files[2] not in pair for pair in similar)
 
 @pytest.mark.asyncio
 async def test_compare_files(tmp_path):
@@ -30,51 +43,95 @@ async def test_compare_files(tmp_path):
 
     agent = DuplicateConsolidatorAgent()
     result = await agent._compare_files(str(f1), str(f2))
-    assert 'similarity' in result
+    assert result['similarity'] == 0.5
     assert result['more_complete'] in (str(f1), str(f2))
 
-@pytest.mark.asyncio
-async def test_detect_and_consolidate(monkeypatch):
-    # Setup dummy state with two similar files
-    files = ["backend/agents/dummy1.py", "backend/agents/dummy1_v2.py"]
-
-    # Patch state_manager.get_state to return dummy generated_files
+async def consolidate(monkeypatch, generated_files):
+    """Run detect_and_consolidate over generated_files, recording removals instead of emptying files."""
     class DummyState:
-        def __init__(self):
-            self.generated_files = files.copy()
-        async def save_state(self, state):
-            pass
+        pass
 
-    dummy_state = DummyState()
+    state = DummyState()
+    state.generated_files = generated_files
 
     async def dummy_get_state():
-        return dummy_state
+        return state
+
+    removed = []
 
-    async def dummy_save_state(state):
-        dummy_state.generated_files = state.generated_files
+    async def dummy_consolidate(keep_file, remove_file):
+        removed.append(remove_file)
+        return f"Removed duplicate file {remove_file}, kept {keep_file}"
 
     monkeypatch.setattr("backend.core.state.state_manager.get_state", dummy_get_state)
-    monkeypatch.setattr("backend.core.state.state_manager.save_state", dummy_save_state)
+    agent = DuplicateConsolidatorAgent()
+    monkeypatch.setattr(agent, "_consolidate_files", dummy_consolidate)
+    return await agent.detect_and_consolidate(), removed
 
-    # Patch read_file tool to return content
-    async def dummy_arun(file_path):
-        if file_path == files[0]:
-            return "def foo():\n    pass\n"
-        else:
-            return "def foo():\n    print('hello')\n"
 
-    agent = DuplicateConsolidatorAgent()
-    for tool in agent.tools:
-        if tool.name == "read_file":
-            tool.arun = dummy_arun
-        if tool.name == "write_file":
-            async def dummy_write(file_path, content):
-                # Simulate file removal by removing from dummy_state
-                if file_path in dummy_state.generated_files:
-                    dummy_state.generated_files.remove(file_path)
-                return "Success"
-            tool.arun = dummy_write
-
-    result = await agent.detect_and_consolidate()
+@pytest.mark.asyncio
+async def test_detect_and_consolidate(monkeypatch, files):
+    result, removed = await consolidate(monkeypatch, files + ["missing.py"])
+    assert result['files_scanned'] == 3
     assert result['duplicates_found'] == 1
+    assert removed == [files[0]]
     assert any("Removed duplicate file" in r for r in result['consolidation_results'])
+
+    top = result['top_pairs'][0]
+    assert {top['file1'], top['file2']} == {files[0], files[1]}
+    assert top['similarity'] > 0.9 and top['estimated_similarity'] > 0.8 and top['consolidated']
+    assert result['similarity_matrix'][files[0]][files[1]] == top['estimated_similarity']
+
+    # The parse_* functions of the kept copy differ only in names and literals
+    definitions = result['duplicate_definitions']
+    assert definitions['files'] == 2
+    [group] = definitions['duplicates']
+    assert group['kind'] == 'function' and not group['cross_file']
+    assert {d['path'] for d in group['definitions']} == {files[1]}
+    assert len(group['definitions']) == 20
+
+
+@pytest.mark.asyncio
+async def test_similar_modules_are_kept(monkeypatch, tmp_path):
+    # Two agents generated from one template: mostly shared lines, different behavior
+    template = module_source("shared", 12)
+    planner = tmp_path / "planner.py"
+    validator = tmp_path / "validator.py"
+    planner.write_text(template + "def plan(task):\n    return [step for step in task.split(';') if step]\n")
+    validator.write_text(template + "def validate(code):\n    compile(code, '<generated>', 'exec')\n    return True\n")
+
+    result, removed = await consolidate(monkeypatch, [str(planner), str(validator)])
+    assert removed == [] and result['duplicates_found'] == 0
+    [pair] = result['top_pairs']
+    assert pair['similarity'] > 0.9 and not pair['consolidated']
+
+
+@pytest.mark.asyncio
+async def test_renamed_copy_is_only_reported(monkeypatch, tmp_path):
+    source = module_source("parse")
+    original = tmp_path / "parser.py"
+    copy = tmp_path / "helpers" / "parsing.py"
+    copy.parent.mkdir()
+    original.write_text(source)
+    # Same definitions, only comments added
+    copy.write_text("# Parsing helpers\n" + source.replace("    return limit", "    # Fall back to the limit\n    return limit", 1))
+
+    # Emptying either file would break "from helpers.parsing import ..."
+    result, removed = await consolidate(monkeypatch, [str(original), str(copy)])
+    assert removed == [] and result['duplicates_found'] == 0
+    [pair] = result['top_pairs']
+    assert pair['renamed_copy'] and not pair['consolidated']
+
+
+@pytest.mark.asyncio
+async def test_same_name_in_other_directory_is_kept(monkeypatch, tmp_path):
+    source = module_source("parse")
+    paths = [tmp_path / "pkg_a" / "__init__.py", tmp_path / "pkg_b" / "__init__.py"]
+    for path in paths:
+        path.parent.mkdir()
+        path.write_text(source)
+
+    result, removed = await consolidate(monkeypatch, [str(path) for path in paths])
+    assert removed == [] and result['duplicates_found'] == 0
+    [pair] = result['top_pairs']
+    assert pair['similarity'] == 1.0 and not pair['consolidated']
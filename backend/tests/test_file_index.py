@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from backend.core.file_index import FileIndex
+
+
+def write(root, rel, content="x"):
+    path = Path(root) / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+class TestFileIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        write(self.root, ".gitignore", "/secret.txt\nbuild/\n")
+        write(self.root, "backend/api.py")
+        write(self.root, "backend/core/state.py")
+        write(self.root, "frontend/app/page.tsx")
+        write(self.root, "frontend/lib/api.ts")
+        write(self.root, "frontend/node_modules/react/index.tsx")
+        write(self.root, "frontend/build/out.ts")
+        write(self.root, "secret.txt")
+        self.index = FileIndex(root=Path(self.root), poll_interval=0)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ignores_node_modules_and_gitignore(self):
+        self.assertEqual(
+            self.index.files([".tsx", ".ts"], under="frontend"),
+            ["frontend/app/page.tsx", "frontend/lib/api.ts"],
+        )
+        self.assertFalse(self.index.exists("secret.txt"))
+        self.assertTrue(self.index.is_ignored("frontend/node_modules/react/index.tsx"))
+        self.assertFalse(self.index.is_ignored("frontend/app/page.tsx"))
+
+    def test_listing_and_existence(self):
+        self.assertEqual(self.index.list_dir("backend"), [("api.py", False), ("core", True)])
+        self.assertTrue(self.index.exists("backend/core"))
+        self.assertTrue(self.index.exists("./backend/api.py"))
+        self.assertFalse(self.index.exists("backend/missing.py"))
+        self.assertIsNone(self.index.list_dir("missing"))
+
+    def test_refresh_sees_changes(self):
+        hash_before = self.index.content_hash("backend/api.py")
+        write(self.root, "backend/new.py")
+        os.remove(Path(self.root) / "backend/core/state.py")
+        write(self.root, "backend/api.py", "changed content")
+        # Make the mtime change visible on coarse-grained filesystems
+        stamp = time.time() + 5
+        os.utime(Path(self.root) / "backend/api.py", (stamp, stamp))
+
+        self.assertEqual(self.index.files([".py"]), ["backend/api.py", "backend/new.py"])
+        self.assertNotEqual(self.index.content_hash("backend/api.py"), hash_before)
+        self.assertEqual(self.index.get("backend/api.py").size, len("changed content"))
+
+    async def test_update_path_without_waiting_for_poll(self):
+        index = FileIndex(root=Path(self.root), poll_interval=3600)
+        await index.start()
+        try:
+            write(self.root, "backend/tools/generated.py")
+            index.update_path("backend/tools/generated.py")
+            self.assertTrue(index.exists("backend/tools/generated.py"))
+            self.assertIn(("tools", True), index.list_dir("backend"))
+        finally:
+            await index.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from backend.core import fileio
+from backend.core.fileio import read_text_range, write_files_atomically
+
+
+class TestReadTextRange(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "lines.txt")
+        with open(self.path, "w") as f:
+            f.writelines(f"line {i}\n" for i in range(1, 1001))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def check_ranges(self):
+        whole = await read_text_range(self.path)
+        self.assertEqual(whole.text.count("\n"), 1000)
+        self.assertFalse(whole.truncated)
+
+        part = await read_text_range(self.path, start_line=10, end_line=12)
+        self.assertEqual(part.text, "line 10\nline 11\nline 12\n")
+
+        tail = await read_text_range(self.path, start_line=999)
+        self.assertEqual(tail.text, "line 999\nline 1000\n")
+
+        beyond = await read_text_range(self.path, start_line=2000)
+        self.assertEqual(beyond.text, "")
+
+        capped = await read_text_range(self.path, max_bytes=20)
+        self.assertTrue(capped.truncated)
+        # Cut at the last complete line that fits
+        self.assertEqual(capped.text, "line 1\nline 2\n")
+        self.assertEqual(capped.size, os.path.getsize(self.path))
+
+    async def test_small_file(self):
+        await self.check_ranges()
+
+    async def test_memory_mapped_file(self):
+        with patch.object(fileio, "MMAP_THRESHOLD", 1), \
+                patch.object(fileio, "_read_mapped", wraps=fileio._read_mapped) as mapped:
+            await self.check_ranges()
+        self.assertTrue(mapped.called)
+
+    async def test_empty_file(self):
+        empty = os.path.join(self.temp_dir.name, "empty.txt")
+        open(empty, "w").close()
+        self.assertEqual((await read_text_range(empty, start_line=3, end_line=5)).text, "")
+
+
+class TestWriteFilesAtomically(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        (self.root / "existing.py").write_text("old")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_writes_all_files(self):
+        write_files_atomically(self.root, {"existing.py": "new", "pkg/sub/mod.py": "code"})
+        self.assertEqual((self.root / "existing.py").read_text(), "new")
+        self.assertEqual((self.root / "pkg/sub/mod.py").read_text(), "code")
+
+    def test_rolls_back_on_failure(self):
+        real_replace = os.replace
+        calls = []
+
+        def failing_replace(src, dst):
+            calls.append(dst)
+            if len(calls) == 3:
+                raise OSError("disk full")
+            real_replace(src, dst)
+
+        changes = {"existing.py": "new", "pkg/mod.py": "code", "third.py": "boom"}
+        with patch("backend.core.fileio.os.replace", failing_replace):
+            with self.assertRaises(OSError):
+                write_files_atomically(self.root, changes)
+        self.assertEqual((self.root / "existing.py").read_text(), "old")
+        self.assertFalse((self.root / "pkg").exists())
+        # No temporary files left behind
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()), ["existing.py"])
+
+
+if __name__ == '__main__':
+    unittest.main()
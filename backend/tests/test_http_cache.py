@@ -0,0 +1,172 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from aiohttp import web
+from backend.core.doc_index import DocIndex
+from backend.core.http_cache import CachedHttpClient
+from backend.tools import doc_search_tools
+
+
+class TestCachedHttpClient(unittest.IsolatedAsyncioTestCase):
+    """Runs the client against a local stand-in for a documentation site."""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.body = "<html>FastAPI dependency injection guide</html>"
+        self.etag = '"v1"'
+        self.server_down = False
+
+        async def page(request):
+            self.requests.append(dict(request.headers))
+            await asyncio.sleep(0.01)
+            if self.server_down:
+                return web.Response(status=503)
+            if request.headers.get("If-None-Match") == self.etag:
+                return web.Response(status=304)
+            return web.Response(text=self.body, content_type="text/html", headers={"ETag": self.etag})
+
+        async def private(request):
+            self.requests.append(dict(request.headers))
+            return web.Response(text="secret", headers={"Cache-Control": "no-store"})
+
+        async def numbered(request):
+            return web.Response(text=f"page {request.match_info['name']}")
+
+        app = web.Application()
+        app.router.add_get("/docs", page)
+        app.router.add_get("/private", private)
+        app.router.add_get("/pages/{name}", numbered)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/docs"
+        self.base = f"http://127.0.0.1:{port}"
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.client = CachedHttpClient(cache_dir=self.temp_dir.name, ttl=60)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+        self.temp_dir.cleanup()
+
+    def expire(self, seconds=120):
+        # Age every cached entry past the TTL
+        real_time = time.time
+        return patch("backend.core.http_cache.time.time", lambda: real_time() + seconds)
+
+    async def test_fresh_entries_skip_the_network(self):
+        first = await self.client.get(self.url)
+        second = await self.client.get(self.url)
+        self.assertEqual((first.source, second.source), ("network", "cache"))
+        self.assertEqual(second.text, self.body)
+        self.assertEqual(len(self.requests), 1)
+
+        # The disk cache outlives the client
+        other = CachedHttpClient(cache_dir=self.temp_dir.name, ttl=60)
+        self.assertEqual((await other.get(self.url)).source, "cache")
+        await other.close()
+
+    async def test_expired_entries_are_revalidated(self):
+        await self.client.get(self.url)
+        with self.expire():
+            response = await self.client.get(self.url)
+        self.assertEqual(response.source, "revalidated")
+        self.assertEqual(response.text, self.body)
+        self.assertEqual(self.requests[-1]["If-None-Match"], '"v1"')
+        # Revalidation refreshed the entry
+        with self.expire():
+            self.assertEqual((await self.client.get(self.url)).source, "cache")
+
+        self.etag, self.body = '"v2"', "<html>changed</html>"
+        with self.expire(300):
+            changed = await self.client.get(self.url)
+        self.assertEqual((changed.source, changed.text), ("network", "<html>changed</html>"))
+
+    async def test_serves_stale_copy_when_the_server_fails(self):
+        await self.client.get(self.url)
+        self.server_down = True
+        with self.expire():
+            response = await self.client.get(self.url)
+        self.assertEqual((response.source, response.status), ("stale", 200))
+        await self.runner.cleanup()
+        with self.expire():
+            self.assertEqual((await self.client.get(self.url)).source, "stale")
+
+    async def test_concurrent_requests_share_one_download(self):
+        responses = await asyncio.gather(*(self.client.get(self.url) for _ in range(5)))
+        self.assertEqual(len(self.requests), 1)
+        self.assertTrue(all(r.text == self.body for r in responses))
+
+    async def test_cancelling_the_first_caller_spares_the_others(self):
+        first = asyncio.create_task(self.client.get(self.url))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(self.client.get(self.url))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        response = await second
+        self.assertTrue(first.cancelled())
+        self.assertEqual(response.text, self.body)
+
+    async def test_no_store_and_errors_are_not_cached(self):
+        await self.client.get(f"{self.base}/private")
+        self.assertEqual((await self.client.get(f"{self.base}/private")).source, "network")
+        missing = await self.client.get(f"{self.base}/missing")
+        self.assertEqual((missing.status, missing.ok), (404, False))
+        self.assertEqual((await self.client.get(f"{self.base}/missing")).source, "network")
+
+    async def test_disk_cache_is_bounded(self):
+        def cached():
+            return sorted(path.suffix for path in Path(self.temp_dir.name).iterdir())
+
+        await self.client.get(f"{self.base}/pages/a")
+        self.client.max_bytes = sum(path.stat().st_size for path in Path(self.temp_dir.name).iterdir())  # room for one response
+        await self.client.get(f"{self.base}/pages/b")
+        self.assertEqual(cached(), [".body", ".json"])
+        self.assertEqual(self.client.stats["evictions"], 1)
+        self.assertEqual((await self.client.get(f"{self.base}/pages/b")).source, "cache")
+        self.assertEqual((await self.client.get(f"{self.base}/pages/a")).source, "network")
+
+        # Responses past max_age are deleted rather than revalidated or served stale
+        self.client.max_age = 100
+        self.server_down = True
+        with self.expire():
+            self.assertEqual((await self.client.get(f"{self.base}/pages/a")).source, "network")
+        self.assertEqual(self.client.stats["expirations"], 1)
+
+    async def test_host_gate_is_shared(self):
+        self.client.delay = 0.05
+        gate = self.client.host(self.url)
+        self.assertIs(self.client.host(f"{self.base}/other"), gate)
+        async with gate:
+            pass
+        # A blocking caller waits for the same slot as the coroutines
+        started = time.monotonic()
+        await asyncio.to_thread(gate.wait)
+        async with gate:
+            pass
+        self.assertGreaterEqual(time.monotonic() - started, 2 * 0.05 * 0.8)
+
+    async def test_doc_search_tool(self):
+        index = DocIndex(path=f"{self.temp_dir.name}/docs.sqlite3")
+        with patch.object(doc_search_tools, "http_client", self.client), \
+                patch.object(doc_search_tools, "doc_index", index), \
+                patch.dict(doc_search_tools.DOC_SITES, {"fastapi": self.url}):
+            found = await doc_search_tools.search_fastapi_docs.ainvoke({"query": "dependency"})
+            missing = await doc_search_tools.search_fastapi_docs.ainvoke({"query": "websockets"})
+        self.assertIn("dependency injection", found)
+        self.assertEqual(index.libraries(), {"fastapi": 1})
+        self.assertEqual([hit.ref for hit in index.search("dependency", ["fastapi"])], [self.url])
+        self.assertEqual(missing, "No relevant FastAPI documentation found for query.")
+        # The page was indexed on the first search; the second one stayed offline
+        self.assertEqual(len(self.requests), 1)
+        index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
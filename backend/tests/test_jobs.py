@@ -0,0 +1,89 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from backend.core.jobs import JobQueue, QueueFull
+
+
+class TestJobQueue(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.jobs_file = Path(self.tmp.name) / "jobs.json"
+        self.order = []
+        self.release = asyncio.Event()
+
+        async def runner(job):
+            self.order.append(job.task)
+            if job.task == "block":
+                await self.release.wait()
+            if job.task == "boom":
+                raise RuntimeError("exploded")
+            return {"output": job.task.upper()}
+
+        self.runner = runner
+        self.queue = JobQueue(jobs_file=self.jobs_file, workers=1, max_queued=3)
+        await self.queue.start(runner)
+
+    async def asyncTearDown(self):
+        await self.queue.stop()
+        self.tmp.cleanup()
+
+    async def test_submit_returns_immediately_and_completes(self):
+        job = self.queue.submit("hello")
+        self.assertEqual(job.status, "queued")
+        job = await asyncio.wait_for(self.queue.wait(job.id), timeout=2)
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.result, {"output": "HELLO"})
+
+    async def test_priority_order_and_failure(self):
+        blocker = self.queue.submit("block")
+        await asyncio.sleep(0.05)
+        low = self.queue.submit("low", priority=0)
+        high = self.queue.submit("boom", priority=5)
+        self.release.set()
+        await asyncio.wait_for(self.queue.wait(low.id), timeout=2)
+        self.assertEqual(self.order, ["block", "boom", "low"])
+        self.assertEqual(self.queue.get(high.id).status, "failed")
+        self.assertEqual(self.queue.get(high.id).error, "exploded")
+        self.assertEqual(self.queue.get(blocker.id).status, "completed")
+
+    async def test_cancel_queued_and_running(self):
+        running = self.queue.submit("block")
+        await asyncio.sleep(0.05)
+        queued = self.queue.submit("never")
+        self.queue.cancel(queued.id)
+        self.queue.cancel(running.id)
+        running = await asyncio.wait_for(self.queue.wait(running.id), timeout=2)
+        self.assertEqual(running.status, "cancelled")
+        self.assertEqual(self.queue.get(queued.id).status, "cancelled")
+        self.assertNotIn("never", self.order)
+
+    async def test_queue_full(self):
+        self.queue.submit("block")
+        await asyncio.sleep(0.05)
+        for i in range(3):
+            self.queue.submit(f"job{i}")
+        with self.assertRaises(QueueFull):
+            self.queue.submit("overflow")
+        self.release.set()
+
+    async def test_queued_jobs_survive_restart(self):
+        self.queue.submit("block")
+        await asyncio.sleep(0.05)
+        pending = self.queue.submit("after-restart")
+        await self.queue.stop()
+
+        restarted = JobQueue(jobs_file=self.jobs_file, workers=1)
+        self.release.set()
+        await restarted.start(self.runner)
+        try:
+            job = await asyncio.wait_for(restarted.wait(pending.id), timeout=2)
+            self.assertEqual(job.status, "completed")
+            # The interrupted running job is retried as well
+            self.assertEqual(self.order.count("block"), 2)
+        finally:
+            await restarted.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
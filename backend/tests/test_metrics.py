@@ -0,0 +1,147 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from langchain_core.tools import tool
+from backend.core.metrics import ToolMetrics, metrics_scope, current_labels
+from backend.tools import BASE_TOOLS, instrumentation, register_tool
+from backend.tools.instrumentation import instrument_tool
+
+
+class TestToolMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = ToolMetrics(step_limit=2)
+
+    def test_labels_follow_scope(self):
+        self.assertEqual(current_labels(), ("unknown", None))
+        with metrics_scope("builder", "step-1"):
+            self.assertEqual(current_labels(), ("builder", "step-1"))
+            with metrics_scope("validator"):
+                self.assertEqual(current_labels(), ("validator", None))
+            self.assertEqual(current_labels(), ("builder", "step-1"))
+
+    def test_query_groups_and_filters(self):
+        with metrics_scope("builder", "step-1"):
+            self.metrics.record("read_file", 0.002, 10, 100, error=False)
+            self.metrics.record("read_file", 0.200, 10, 300, error=True)
+        with metrics_scope("validator", "step-2"):
+            self.metrics.record("run_command", 3.0, 20, 50, error=False)
+
+        by_tool = self.metrics.query()
+        self.assertEqual(list(by_tool["tool"]), ["run_command", "read_file"])  # most time first
+        read_file = by_tool["tool"]["read_file"]
+        self.assertEqual((read_file["calls"], read_file["errors"], read_file["error_rate"]), (2, 1, 0.5))
+        self.assertEqual((read_file["bytes_in"], read_file["bytes_out"]), (20, 400))
+        self.assertEqual((read_file["histogram_ms"]["le_5"], read_file["histogram_ms"]["le_250"]), (1, 1))
+        self.assertEqual((read_file["p50_ms"], read_file["p95_ms"]), (5.0, 250.0))
+        self.assertEqual(by_tool["total"]["calls"], 3)
+
+        by_agent = self.metrics.query(group_by="agent")
+        self.assertEqual(by_agent["agent"]["validator"]["calls"], 1)
+        self.assertEqual(list(self.metrics.query(agent="builder", group_by="tool_agent")["tool_agent"]), ["read_file@builder"])
+        self.assertEqual(self.metrics.query(step_id="step-2")["total"]["calls"], 1)
+        with self.assertRaises(ValueError):
+            self.metrics.query(group_by="step")
+
+    def test_keeps_recent_steps_only(self):
+        for step in ("a", "b", "c"):
+            with metrics_scope("builder", step):
+                self.metrics.record("read_file", 0.001, 1, 1, error=False)
+        self.assertEqual(self.metrics.steps(), ["c", "b"])
+        # Totals still cover every call
+        self.assertEqual(self.metrics.query()["total"]["calls"], 3)
+
+    def test_dump(self):
+        with metrics_scope("builder", "step-1"):
+            self.metrics.record("write_file", 0.01, 5, 5, error=False)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = self.metrics.dump(Path(temp_dir) / "metrics.json")
+            data = json.loads(path.read_text())
+        self.assertEqual(data["totals"][0]["tool"], "write_file")
+        self.assertEqual(data["steps"]["step-1"][0]["agent"], "builder")
+
+
+class TestInstrumentTool(unittest.IsolatedAsyncioTestCase):
+    async def test_records_calls(self):
+        @tool
+        async def echo(text: str) -> str:
+            """Echo text back."""
+            if text == "raise":
+                raise RuntimeError("boom")
+            return text
+
+        metrics = ToolMetrics()
+        instrument_tool(echo)
+        instrument_tool(echo)  # instrumenting twice records each call once
+        with patch.object(instrumentation, "tool_metrics", metrics), metrics_scope("planner", "step-9"):
+            await echo.ainvoke({"text": "hello"})
+            await echo.ainvoke({"text": "Error: nope"})
+            with self.assertRaises(RuntimeError):
+                await echo.ainvoke({"text": "raise"})
+        stats = metrics.query(step_id="step-9", group_by="tool_agent")["tool_agent"]["echo@planner"]
+        self.assertEqual((stats["calls"], stats["errors"]), (3, 2))
+        self.assertEqual(stats["bytes_out"], len("hello") + len("Error: nope"))
+
+    async def test_failure_messages_count_as_errors(self):
+        failures = [
+            "Error reading file: [Errno 2] No such file or directory",
+            "BLOCKED: 'backend/core/config.py' is a forbidden path and cannot be written to.",
+            "Patch not applied, a.py is unchanged: Hunk 1 does not match the file",
+            "Nothing was written:\nBLOCKED: 'con.py' is a Windows reserved filename and cannot be used.",
+            "Command timed out after 5 seconds\n",
+            "Invalid regex: unterminated character set at position 0",
+            "Syntax error: invalid syntax (<unknown>, line 1)",
+            "Unknown section 'jobs'; use one of: steps, capabilities",
+            "Unknown source 'wiki'; use one of: docs, steps",
+            "Capability status must be 'implemented' or 'missing'",
+        ]
+        successes = ["Successfully wrote 3 bytes to a.py", "No matches found", "Exit code: 1\nFAILED", "Python syntax is valid"]
+
+        @tool
+        async def reply(text: str) -> str:
+            """Return text."""
+            return text
+
+        instrument_tool(reply)
+        for text in failures + successes:
+            with self.subTest(text=text):
+                metrics = ToolMetrics()
+                with patch.object(instrumentation, "tool_metrics", metrics):
+                    await reply.ainvoke({"text": text})
+                stats = metrics.query(group_by="tool")["tool"]["reply"]
+                self.assertEqual(stats["errors"], int(text in failures))
+
+    def test_base_tools_are_instrumented(self):
+        for base_tool in BASE_TOOLS:
+            self.assertTrue(getattr(base_tool.coroutine, "_instrumented", False), base_tool.name)
+
+    def test_tools_added_after_import_are_instrumented(self):
+        from backend.agents.planner import PlannerAgent
+
+        @tool
+        async def late(text: str) -> str:
+            """Added to the agent tool list after import."""
+            return text
+
+        @tool
+        async def registered(text: str) -> str:
+            """Registered after import."""
+            return text
+
+        BASE_TOOLS.append(late)
+        try:
+            self.assertIs(register_tool(registered), registered)
+            register_tool(registered)
+            self.assertEqual(sum(t is registered for t in BASE_TOOLS), 1)
+            agent = PlannerAgent()
+            for added in (late, registered):
+                self.assertIn(added, agent.tools)
+                self.assertTrue(getattr(added.coroutine, "_instrumented", False), added.name)
+                self.assertTrue(getattr(added.coroutine, "_output_budget", False), added.name)
+        finally:
+            BASE_TOOLS[:] = [t for t in BASE_TOOLS if t is not late and t is not registered]
+
+
+if __name__ == '__main__':
+    unittest.main()
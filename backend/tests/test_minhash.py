@@ -0,0 +1,68 @@
+import random
+import unittest
+from backend.core.minhash import MinHashLSH, shingle_hashes
+
+
+def make_source(seed, functions=30):
+    rng = random.Random(seed)
+    words = ["user", "order", "item", "total", "price", "cart", "session", "token", "config", "cache"]
+    lines = []
+    for i in range(functions):
+        a, b = rng.sample(words, 2)
+        lines.append(f"def {a}_{b}_{i}({a}, {b}):")
+        lines.append(f"    return {a}.{b} * {rng.randint(1, 99)} + {b}.{a}")
+    return "\n".join(lines) + "\n"
+
+
+class TestShingles(unittest.TestCase):
+    def test_ignores_whitespace_and_comments(self):
+        code = "def f(x):\n    return x + 1\n"
+        noisy = "# helper\ndef f( x ):\n\n        return x+1   \n"
+        self.assertEqual(set(shingle_hashes(code)), set(shingle_hashes(noisy)))
+
+    def test_short_and_empty(self):
+        self.assertEqual(len(shingle_hashes("x = 1")), 1)
+        self.assertEqual(len(shingle_hashes("   \n# only a comment\n")), 0)
+
+
+class TestMinHashLSH(unittest.TestCase):
+    def test_finds_near_duplicates_only(self):
+        lsh = MinHashLSH()
+        original = make_source(1)
+        lsh.add("a.py", original)
+        lsh.add("a_copy.py", original.replace("def user_", "def customer_", 1) + "\n# tweaked\n")
+        for seed in range(2, 40):
+            lsh.add(f"other{seed}.py", make_source(seed))
+
+        candidates = lsh.candidates()
+        self.assertEqual(candidates[0][:2], ("a.py", "a_copy.py"))
+        self.assertGreater(candidates[0][2], 0.85)
+        # Unrelated files rarely share a band, and score low when they do
+        self.assertTrue(all(score < 0.5 for _, _, score in candidates[1:]))
+
+    def test_estimate_tracks_jaccard(self):
+        lsh = MinHashLSH(num_perm=256, bands=64)
+        a, b = make_source(1, 40), make_source(1, 40).split("\n")
+        b = "\n".join(b[:40] + [line.replace("return", "yield") for line in b[40:]])
+        lsh.add("a", a)
+        lsh.add("b", b)
+        sa, sb = set(shingle_hashes(a)), set(shingle_hashes(b))
+        self.assertAlmostEqual(lsh.similarity("a", "b"), len(sa & sb) / len(sa | sb), delta=0.1)
+
+    def test_matrix_and_empty_documents(self):
+        lsh = MinHashLSH()
+        self.assertTrue(lsh.add("a", make_source(1)))
+        self.assertTrue(lsh.add("b", make_source(2)))
+        self.assertFalse(lsh.add("empty", "# nothing here\n"))
+        matrix = lsh.matrix(["a", "b", "empty", "a"])
+        self.assertEqual(list(matrix), ["a", "b"])
+        self.assertEqual(matrix["a"]["a"], 1.0)
+        self.assertEqual(matrix["a"]["b"], matrix["b"]["a"])
+
+    def test_bands_must_divide_permutations(self):
+        with self.assertRaises(ValueError):
+            MinHashLSH(num_perm=100, bands=32)
+
+
+if __name__ == '__main__':
+    unittest.main()
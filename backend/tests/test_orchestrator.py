@@ -1,6 +1,11 @@
 import unittest
 import asyncio
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 from backend.agents.orchestrator import OrchestratorAgent
+from backend.core.state import StateManager
 
 class TestOrchestratorAgent(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
@@ -21,5 +26,85 @@ class TestOrchestratorAgent(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(TypeError):
             await self.orchestrator.run(goal)
 
+class FakeExecutor:
+    """Records phase inputs and fails once on a chosen phase."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.inputs = []
+        self.fail_on = fail_on
+
+    async def ainvoke(self, inputs):
+        self.calls.append(inputs["input"])
+        self.inputs.append(inputs)
+        if inputs["input"] == self.fail_on:
+            self.fail_on = None
+            raise RuntimeError("server restarted")
+        return {"output": f"did {inputs['input']}"}
+
+
+class TestOrchestratorCheckpoints(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state = StateManager(state_file=Path(self.temp_dir.name) / "state.json")
+        self.orchestrator = OrchestratorAgent()
+        self.executor = FakeExecutor(fail_on="write the api routes")
+        self.orchestrator.agent_executor = self.executor
+        self.plans = 0
+
+        async def plan(task):
+            self.plans += 1
+            return {"output": "Description: create the agents package\n"
+                              "Description: write the api routes\n"
+                              "Description: add tests"}
+
+        self.patches = [
+            patch("backend.agents.orchestrator.state_manager", self.state),
+            patch.object(self.orchestrator.planner_agent, "plan", plan),
+            patch.object(self.orchestrator, "_detect_unfamiliar_apis", lambda text: []),
+        ]
+        for p in self.patches:
+            p.start()
+
+    async def asyncTearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.temp_dir.cleanup()
+
+    async def test_resume_continues_from_unfinished_phase(self):
+        task = "Build the agents and tools for the backend api"
+        with self.assertRaises(RuntimeError):
+            await self.orchestrator.run(task)
+
+        checkpoints = await self.state.list_checkpoints()
+        self.assertEqual(len(checkpoints), 1)
+        self.assertEqual(checkpoints[0].next_phase, 1)
+
+        result = await self.orchestrator.resume(checkpoints[0].task_hash)
+        self.assertEqual(result["phases_executed"], 3)
+        self.assertIn("did create the agents package", result["output"])
+        # The first phase ran once and the plan was not recomputed
+        self.assertEqual(self.executor.calls.count("create the agents package"), 1)
+        self.assertEqual(self.plans, 1)
+        self.assertEqual(await self.state.list_checkpoints(), [])
+
+    async def test_resume_keeps_depth_and_context_of_a_phase(self):
+        task = "Build the agents and tools for the backend api"
+        context = {"research_results": {"fastapi": ["Use APIRouter"]}}
+        with self.assertRaises(RuntimeError):
+            await self.orchestrator.run(task, context=context, depth=1)
+        [checkpoint] = await self.state.list_checkpoints()
+        self.assertEqual((checkpoint.depth, checkpoint.context), (1, context))
+
+        self.executor.inputs.clear()
+        with patch.object(self.orchestrator, "run", wraps=self.orchestrator.run) as run:
+            result = await self.orchestrator.resume(checkpoint.task_hash)
+        self.assertEqual(result["phases_executed"], 3)
+        self.assertEqual(run.call_args_list[0].kwargs, {"context": context, "depth": 1})
+        # The remaining phases ran one level deeper, with the parent's context
+        self.assertTrue(all(call.kwargs["depth"] == 2 for call in run.call_args_list[1:]))
+        self.assertEqual([inputs["research_results"] for inputs in self.executor.inputs], [context["research_results"]] * 2)
+
+
 if __name__ == '__main__':
     unittest.main()
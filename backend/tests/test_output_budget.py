@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+from langchain_core.tools import tool
+from backend.core import settings
+from backend.tools import BASE_TOOLS
+from backend.tools.output_budget import truncate_output, with_output_budget
+
+
+class TestOutputBudget(unittest.IsolatedAsyncioTestCase):
+    def test_truncate_output(self):
+        self.assertEqual(truncate_output("short", limit=10), "short")
+        text = "\n".join(f"line {i}" for i in range(100))
+        result = truncate_output(text, limit=50)
+        # Cut at a line boundary, with a note saying how much was dropped
+        self.assertTrue(result.startswith("line 0\nline 1\n"))
+        self.assertIn("characters; narrow the request", result)
+        self.assertIn(f"of {len(text)} characters", result)
+        self.assertLess(len(result.split("\n[output truncated")[0]), 50)
+
+    async def test_wraps_tools(self):
+        @tool
+        async def noisy(size: int) -> str:
+            """Return size characters."""
+            return "x" * size
+
+        self.assertIs(with_output_budget(noisy), noisy)
+        with_output_budget(noisy)  # wrapping twice is harmless
+        with patch.object(settings, "tool_output_max_chars", 100):
+            self.assertEqual(await noisy.ainvoke({"size": 100}), "x" * 100)
+            result = await noisy.ainvoke({"size": 1000})
+        self.assertTrue(result.startswith("x" * 100 + "\n[output truncated to 100 of 1000"))
+        self.assertEqual(result.count("[output truncated"), 1)
+        self.assertEqual(noisy.name, "noisy")
+        self.assertIn("size", noisy.args)
+
+    def test_base_tools_are_budgeted(self):
+        for base_tool in BASE_TOOLS:
+            self.assertTrue(getattr(base_tool.coroutine, "_output_budget", False), base_tool.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
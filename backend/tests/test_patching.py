@@ -0,0 +1,90 @@
+import unittest
+from backend.core.patching import apply_patch_text, PatchError
+
+ORIGINAL = """def add(a, b):
+    return a + b
+
+
+def sub(a, b):
+    return a - b
+
+
+def mul(a, b):
+    return a * b
+"""
+
+
+class TestUnifiedDiff(unittest.TestCase):
+    def test_applies_hunks_with_line_numbers(self):
+        patch = """--- a/calc.py
++++ b/calc.py
+@@ -1,2 +1,3 @@
+ def add(a, b):
++    # Addition
+     return a + b
+@@ -9,2 +10,2 @@
+ def mul(a, b):
+-    return a * b
++    return b * a
+"""
+        result = apply_patch_text(ORIGINAL, patch)
+        self.assertIn("    # Addition\n    return a + b", result)
+        self.assertIn("return b * a\n", result)
+        self.assertTrue(result.endswith("\n"))
+
+    def test_locates_hunk_without_line_numbers(self):
+        patch = "@@ ... @@\n def sub(a, b):\n-    return a - b\n+    return a - b  # noqa\n"
+        result = apply_patch_text(ORIGINAL, patch)
+        self.assertIn("return a - b  # noqa", result)
+
+    def test_mismatched_context_is_rejected(self):
+        patch = "@@ -5,2 +5,2 @@\n def sub(x, y):\n-    return x - y\n+    return y - x\n"
+        with self.assertRaises(PatchError):
+            apply_patch_text(ORIGINAL, patch)
+
+    def test_new_file(self):
+        patch = "--- /dev/null\n+++ b/new.py\n@@ -0,0 +1,2 @@\n+a = 1\n+b = 2\n"
+        self.assertEqual(apply_patch_text("", patch), "a = 1\nb = 2\n")
+
+    def test_keeps_crlf_line_endings(self):
+        patch = "@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+        self.assertEqual(apply_patch_text("a\r\nb\r\nc\r\n", patch), "a\r\nB\r\nc\r\n")
+        # A diff taken against the CRLF file applies the same way
+        self.assertEqual(apply_patch_text("a\r\nb\r\nc\r\n", patch.replace("\n", "\r\n")), "a\r\nB\r\nc\r\n")
+
+    def test_other_line_separators_are_not_line_breaks(self):
+        text = "x = 1\n# page\fbreak\ny = 2\n"
+        patch = "@@ -2,2 +2,2 @@\n # page\fbreak\n-y = 2\n+y = 3\n"
+        self.assertEqual(apply_patch_text(text, patch), "x = 1\n# page\fbreak\ny = 3\n")
+
+
+class TestSearchReplace(unittest.TestCase):
+    def test_applies_blocks_in_order(self):
+        patch = (
+            "<<<<<<< SEARCH\n    return a + b\n=======\n    return sum((a, b))\n>>>>>>> REPLACE\n"
+            "<<<<<<< SEARCH\ndef mul(a, b):\n=======\ndef multiply(a, b):\n>>>>>>> REPLACE\n"
+        )
+        result = apply_patch_text(ORIGINAL, patch)
+        self.assertIn("return sum((a, b))", result)
+        self.assertIn("def multiply(a, b):", result)
+
+    def test_ambiguous_search_is_rejected(self):
+        patch = "<<<<<<< SEARCH\n(a, b):\n=======\n(x, y):\n>>>>>>> REPLACE\n"
+        with self.assertRaisesRegex(PatchError, "matches 3 places"):
+            apply_patch_text(ORIGINAL, patch)
+
+    def test_all_or_nothing(self):
+        patch = (
+            "<<<<<<< SEARCH\ndef add(a, b):\n=======\ndef plus(a, b):\n>>>>>>> REPLACE\n"
+            "<<<<<<< SEARCH\ndef div(a, b):\n=======\ndef divide(a, b):\n>>>>>>> REPLACE\n"
+        )
+        with self.assertRaises(PatchError):
+            apply_patch_text(ORIGINAL, patch)
+
+    def test_unrecognized_format(self):
+        with self.assertRaises(PatchError):
+            apply_patch_text(ORIGINAL, "please rename add to plus")
+
+
+if __name__ == '__main__':
+    unittest.main()
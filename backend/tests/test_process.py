@@ -0,0 +1,75 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from backend.core.process import run_shell, OutputBuffer
+
+
+def is_alive(pid):
+    """Whether pid is a running (not zombie) process."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+class TestOutputBuffer(unittest.TestCase):
+    def test_keeps_head_and_tail(self):
+        buffer = OutputBuffer(10)
+        for i in range(10):
+            buffer.write(f"{i}{i}{i}".encode())
+        text = buffer.text()
+        self.assertTrue(buffer.truncated)
+        self.assertTrue(text.startswith("00011"))
+        self.assertTrue(text.endswith("88999"))
+        self.assertIn("[20 bytes of output omitted]", text)
+
+    def test_short_output_untouched(self):
+        buffer = OutputBuffer(100)
+        buffer.write(b"hello\n")
+        self.assertFalse(buffer.truncated)
+        self.assertEqual(buffer.text(), "hello\n")
+
+
+class TestRunShell(unittest.IsolatedAsyncioTestCase):
+    async def test_merges_stdout_and_stderr(self):
+        result = await run_shell("echo out; echo err >&2; exit 3", timeout=10)
+        self.assertEqual(result.returncode, 3)
+        self.assertIn("out", result.output)
+        self.assertIn("err", result.output)
+        self.assertFalse(result.timed_out)
+
+    async def test_streams_chunks(self):
+        chunks = []
+        await run_shell("echo one; sleep 0.1; echo two", timeout=10, on_output=chunks.append)
+        self.assertEqual("".join(chunks), "one\ntwo\n")
+
+    async def test_timeout_kills_process_group(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pid_file = os.path.join(tmp, "child.pid")
+            start = time.monotonic()
+            result = await run_shell(f"sleep 30 & echo $! > {pid_file}; wait", timeout=0.5)
+            self.assertTrue(result.timed_out)
+            self.assertLess(time.monotonic() - start, 5)
+            with open(pid_file) as f:
+                child_pid = int(f.read())
+        self.assertFalse(is_alive(child_pid))
+
+    async def test_commands_run_concurrently(self):
+        start = time.monotonic()
+        results = await asyncio.gather(*(run_shell("sleep 0.5", timeout=10) for _ in range(4)))
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual([r.returncode for r in results], [0, 0, 0, 0])
+
+    async def test_large_output_is_truncated(self):
+        result = await run_shell("seq 1 100000", timeout=10, max_output=1000)
+        self.assertTrue(result.truncated)
+        self.assertTrue(result.output.startswith("1\n2\n"))
+        self.assertTrue(result.output.endswith("99999\n100000\n"))
+        self.assertLess(len(result.output), 1100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from backend.core import file_scan, project_check
+from backend.core.file_index import FileIndex
+from backend.core.project_check import ProjectChecker, analyze_source
+
+
+class TestAnalyzeSource(unittest.TestCase):
+    def test_collects_imports_and_exports(self):
+        source = (
+            b"import os\n"
+            b"from .state import state_manager as sm\n"
+            b"try:\n"
+            b"    import numpy\n"
+            b"except ImportError:\n"
+            b"    numpy = None\n"
+            b"class Agent:\n"
+            b"    pass\n"
+            b"LIMIT: int = 3\n"
+        )
+        analysis = analyze_source("pkg/mod.py", source)
+        self.assertIsNone(analysis["syntax_error"])
+        imports = {(i["module"], i["level"], i["optional"]) for i in analysis["imports"]}
+        self.assertEqual(imports, {("os", 0, False), ("state", 1, False), ("numpy", 0, True)})
+        self.assertTrue({"os", "sm", "numpy", "Agent", "LIMIT"} <= set(analysis["exports"]))
+        self.assertFalse(analysis["dynamic"])
+
+    def test_reports_compile_errors(self):
+        # Parses fine but does not compile
+        analysis = analyze_source("bad.py", b"x = 1\nreturn x\n")
+        self.assertIn("line 2", analysis["syntax_error"])
+
+
+class TestProjectChecker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.write("backend/__init__.py", "")
+        self.write("backend/core/__init__.py", "from .state import state_manager\n")
+        self.write("backend/core/state.py", "import json\n\nstate_manager = object()\n")
+        self.write("backend/main.py", "from core import state_manager\nimport core.state\n")
+        self.write("backend/agents/base.py", "from ..core import state_manager, state\n")
+        self.files = FileIndex(root=self.root, poll_interval=0)
+        self.checker = ProjectChecker(files=self.files)
+
+    def tearDown(self):
+        self.checker.close()
+        self.temp_dir.cleanup()
+
+    def write(self, rel, content):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        if hasattr(self, "files"):
+            self.files.update_path(rel)
+
+    def problems(self, report):
+        return {f.path: (f.syntax_error, f.import_errors) for f in report.failures}
+
+    def test_clean_tree(self):
+        report = self.checker.check_sync("backend")
+        self.assertTrue(report.ok, self.problems(report))
+        self.assertEqual(len(report.files), 5)
+        self.assertEqual((report.analyzed, report.cached), (5, 0))
+
+    def test_reports_syntax_and_import_errors(self):
+        self.write("backend/broken.py", "def f(:\n")
+        self.write("backend/agents/bad.py", (
+            "from ..core import missing_name\n"
+            "from ..nowhere import x\n"
+            "import surely_not_installed_pkg\n"
+            "try:\n"
+            "    import another_missing_pkg\n"
+            "except ImportError:\n"
+            "    pass\n"
+        ))
+        problems = self.problems(self.checker.check_sync("backend"))
+        self.assertEqual(set(problems), {"backend/broken.py", "backend/agents/bad.py"})
+        self.assertIn("line 1", problems["backend/broken.py"][0])
+        self.assertEqual(problems["backend/agents/bad.py"][1], [
+            "line 1: cannot import name 'missing_name' from '..core'",
+            "line 2: cannot resolve module '..nowhere'",
+            "line 3: no module named 'surely_not_installed_pkg'",
+        ])
+
+    def test_unchanged_files_are_not_reparsed(self):
+        self.checker.check_sync("backend")
+        self.write("backend/core/state.py", "import json\n")
+        with patch.object(project_check, "_analyze_file", wraps=project_check._analyze_file) as analyze:
+            report = self.checker.check_sync("backend")
+        self.assertEqual([call.args[0][0] for call in analyze.call_args_list], ["backend/core/state.py"])
+        self.assertEqual((report.analyzed, report.cached), (1, 4))
+        # Importers are re-resolved against the changed module
+        self.assertEqual(set(self.problems(report)), {"backend/core/__init__.py"})
+
+    def test_process_pool(self):
+        for i in range(file_scan.INLINE_THRESHOLD + 2):
+            self.write(f"backend/gen/mod{i}.py", f"from core.state import state_manager\nVALUE = {i}\n")
+        report = self.checker.check_sync("backend")
+        self.assertIsNotNone(self.checker._pool)
+        self.assertTrue(report.ok, self.problems(report))
+        self.assertEqual(report.analyzed, len(report.files))
+
+
+class TestCheckProjectTool(unittest.IsolatedAsyncioTestCase):
+    async def test_reports_problems(self):
+        from backend.tools import base_tools
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "backend").mkdir()
+            (root / "backend/ok.py").write_text("import os\n")
+            (root / "backend/bad.py").write_text("from ok import missing\n")
+            checker = ProjectChecker(files=FileIndex(root=root, poll_interval=0))
+            with patch.object(base_tools, "project_checker", checker):
+                output = await base_tools.check_project.ainvoke({"directory": "backend"})
+                empty = await base_tools.check_project.ainvoke({"directory": "frontend"})
+        self.assertTrue(output.startswith("Checked 2 Python files"), output)
+        self.assertIn("backend/bad.py: line 1: cannot import name 'missing' from 'ok'", output)
+        self.assertEqual(empty, "No Python files found in frontend")
+
+
+if __name__ == '__main__':
+    unittest.main()
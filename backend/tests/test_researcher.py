@@ -0,0 +1,302 @@
+import asyncio
+import mmap
+import pytest
+from backend.agents import researcher
+from backend.core.doc_index import DocIndex
+from backend.core.http_cache import CachedResponse
+from backend.core.docs_cache import DocsCache
+from backend.core.snippets import TermMatcher, rank_snippets
+from backend.agents.researcher import ResearchAgent
+
+
+PAGES = {
+    'https://fastapi.tiangolo.com/en/latest/': "<html><body>FastAPI uses APIRouter for routing</body></html>",
+    'https://docs.python.org/3/': "<html><body>asyncio runs the APIRouter of nothing</body></html>",
+}
+
+
+@pytest.fixture(autouse=True)
+def docs_cache(tmp_path, monkeypatch):
+    # Keep downloaded pages and extracted text out of the real cache
+    cache = DocsCache(cache_dir=tmp_path / "docs")
+    monkeypatch.setattr(researcher, "docs_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def doc_index(tmp_path, monkeypatch):
+    index = DocIndex(path=tmp_path / "docs.sqlite3")
+    monkeypatch.setattr(researcher, "doc_index", index)
+    yield index
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_search_many_fetches_each_site_once():
+    agent = ResearchAgent()
+    session = agent.new_session(timeout=5)
+    calls = []
+
+    async def fake_fetch(url):
+        calls.append(url)
+        return PAGES.get(url)
+
+    session._fetch_url = fake_fetch
+    try:
+        first = await session.search_many(["apirouter"], libraries=["fastapi", "python"], max_results=2)
+        second = await session.search_many(["asyncio"], libraries=["fastapi", "python"], max_results=2)
+    finally:
+        await session.aclose()
+
+    assert set(first["apirouter"]) == {"fastapi", "python"}
+    assert "python" in second["asyncio"]
+    assert sorted(calls) == sorted(PAGES)
+
+
+@pytest.mark.asyncio
+async def test_search_many_respects_deadline():
+    agent = ResearchAgent()
+    session = agent.new_session(timeout=0.2)
+
+    async def fake_fetch(url):
+        if 'python' in url:
+            await asyncio.sleep(5)
+        return PAGES.get(url)
+
+    session._fetch_url = fake_fetch
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        results = await session.search_many(["apirouter"], libraries=["fastapi", "python"])
+    finally:
+        await session.aclose()
+
+    assert loop.time() - start < 2
+    assert list(results["apirouter"]) == ["fastapi"]
+
+
+@pytest.mark.asyncio
+async def test_search_many_rejects_unknown_library():
+    session = ResearchAgent().new_session()
+    with pytest.raises(ValueError):
+        await session.search_many(["x"], libraries=["cobol"])
+    await session.aclose()
+
+
+@pytest.mark.asyncio
+async def test_session_downloads_through_the_shared_client(monkeypatch):
+    events = []
+
+    class Gate:
+        async def __aenter__(self):
+            events.append("enter")
+
+        async def __aexit__(self, *exc):
+            events.append("exit")
+
+    class Client:
+        def host(self, url):
+            return Gate()
+
+        async def get(self, url):
+            events.append(url)
+            return CachedResponse(url, 200, PAGES[url].encode(), "utf-8", "network")
+
+    monkeypatch.setattr(researcher, "http_client", Client())
+    session = ResearchAgent().new_session(timeout=5)
+    url = 'https://fastapi.tiangolo.com/en/latest/'
+    try:
+        assert await session._fetch_url(url) == PAGES[url]
+        # Cached on disk: the second fetch stays offline
+        assert await session._fetch_url(url) == PAGES[url]
+    finally:
+        await session.aclose()
+    assert events == ["enter", url, "exit"]
+
+
+def test_search_uses_the_local_index(tmp_path):
+    agent = ResearchAgent()
+    fetched = []
+
+    def fake_fetch(url):
+        fetched.append(url)
+        return PAGES.get(url)
+
+    agent._fetch_url = fake_fetch
+    assert agent.search("fastapi", "routing with APIRouter") == ["FastAPI uses APIRouter for routing"]
+    # The page was indexed by the first search
+    assert agent.search("fastapi", "APIRouter")
+    assert fetched == ['https://fastapi.tiangolo.com/en/latest/']
+
+    dump = tmp_path / "dump"
+    (dump / "guide").mkdir(parents=True)
+    (dump / "guide" / "intro.md").write_text("# Intro\nWidgets are configured with a WidgetConfig.")
+    (dump / "index.html").write_text("<html><title>Home</title><body>Welcome to widgets</body></html>")
+    assert agent.ingest_directory("widgets", str(dump)) == 2
+    assert agent.search("widgets", "WidgetConfig") == ["# Intro\nWidgets are configured with a WidgetConfig."]
+    with pytest.raises(ValueError):
+        agent.search("cobol", "x")
+
+
+@pytest.mark.asyncio
+async def test_extracted_text_is_cached_across_sessions(monkeypatch):
+    agent = ResearchAgent()
+    extracted = []
+    extract = agent._extract_text
+    monkeypatch.setattr(agent, "_extract_text", lambda html: extracted.append(html) or extract(html))
+
+    async def fake_fetch(url):
+        return PAGES.get(url)
+
+    for _ in range(2):
+        session = agent.new_session(timeout=5)
+        session._fetch_url = fake_fetch
+        try:
+            results = await session.search_many(["apirouter"], libraries=["fastapi"])
+        finally:
+            await session.aclose()
+        assert results["apirouter"]["fastapi"] == ["fastapi uses apirouter for routing"]
+    # Only the first session parsed the page
+    assert len(extracted) == 1
+
+    url = 'https://fastapi.tiangolo.com/en/latest/'
+    assert agent.cached_text(url) == "FastAPI uses APIRouter for routing"
+    assert agent.cached_text(url, lower=True) == "fastapi uses apirouter for routing"
+    assert agent.cached_text('https://docs.python.org/3/') is None
+
+
+def test_large_pages_are_memory_mapped(monkeypatch):
+    monkeypatch.setattr(researcher, "MMAP_THRESHOLD", 16)
+    agent = ResearchAgent()
+    url = 'https://docs.python.org/3/'
+    text = agent.store_text(url, "<html><body>" + "filler " * 20 + "Asyncio Event Loop</body></html>", lower=True)
+    try:
+        assert isinstance(text, mmap.mmap)
+        [snippet] = rank_snippets(text, TermMatcher(["event", "loop"]), 1)
+        assert snippet.text.endswith("filler filler asyncio event loop")
+    finally:
+        text.close()
+
+
+def test_new_html_invalidates_cached_text(docs_cache):
+    agent = ResearchAgent()
+    url = 'https://fastapi.tiangolo.com/en/latest/'
+    docs_cache.write(url, '.html', PAGES[url])
+    assert agent.page_text(url) == "FastAPI uses APIRouter for routing"
+    docs_cache.write(url, '.html', "<html>new</html>")
+    assert agent.cached_text(url) is None
+    assert agent.page_text(url) == "new"
+    agent.clear_cache()
+    assert docs_cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retrieve_ranks_across_libraries():
+    session = ResearchAgent().new_session(timeout=5)
+
+    async def fake_fetch(url):
+        return PAGES.get(url)
+
+    session._fetch_url = fake_fetch
+    try:
+        snippets = await session.retrieve("Route requests with an APIRouter in FastAPI", ["fastapi", "python"], top_k=2)
+    finally:
+        await session.aclose()
+    # The FastAPI page mentions every key term, the Python page only one
+    assert [s.library for s in snippets] == ["fastapi", "python"]
+    assert snippets[0].text == "fastapi uses apirouter for routing"
+    assert set(snippets[0].terms) == {"fastapi", "apirouter"}
+
+
+@pytest.mark.asyncio
+async def test_research_before_build_uses_key_terms(docs_cache):
+    url = 'https://fastapi.tiangolo.com/en/latest/'
+    docs_cache.write(url, '.html', PAGES[url])
+    results = await ResearchAgent().research_before_build("Add an APIRouter for the FastAPI backend")
+    assert results == {"fastapi": ["fastapi uses apirouter for routing"]}
+
+
+DOCS = (
+    "Bigger applications are split with APIRouter: include_router mounts each router on the FastAPI app. "
+    + "Unrelated text about deployment settings and environment variables. " * 30
+    + "Dependencies declared on an APIRouter apply to every FastAPI path operation of that router."
+)
+
+
+@pytest.mark.asyncio
+async def test_research_before_build_prefers_the_index(doc_index):
+    doc_index.add_page("fastapi", "https://fastapi.tiangolo.com/tutorial/bigger-applications/", DOCS, title="Bigger Applications")
+    agent = ResearchAgent()
+    session = agent.new_session(timeout=5)
+    fetched = []
+
+    async def fake_fetch(url):
+        fetched.append(url)
+        return PAGES.get(url)
+
+    session._fetch_url = fake_fetch
+    try:
+        results = await agent.research_before_build("Add an APIRouter to the FastAPI backend in Python", session)
+    finally:
+        await session.aclose()
+    # fastapi is indexed: ranked excerpts of its sections, no download
+    assert any("split with apirouter: include_router mounts" in snippet for snippet in results["fastapi"])
+    assert all(len(snippet) < 300 for snippet in results["fastapi"])
+    # python has no indexed pages: its page is scanned instead
+    assert results["python"] == ["asyncio runs the apirouter of nothing"]
+    assert fetched == ['https://docs.python.org/3/']
+
+
+@pytest.mark.asyncio
+async def test_research_before_build_does_not_block_the_loop():
+    agent = ResearchAgent()
+    session = agent.new_session(timeout=0.2)
+
+    async def slow_fetch(url):
+        await asyncio.sleep(5)
+
+    session._fetch_url = slow_fetch
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        results = await agent.research_before_build("A Python service", session)
+    finally:
+        ticker.cancel()
+        await session.aclose()
+    # The download missed the deadline; the loop kept running meanwhile
+    assert results == {"python": []}
+    assert ticks >= 5
+
+
+def test_index_snippets_falls_back_to_stemmed_hits(doc_index):
+    doc_index.add_page("fastapi", "https://fastapi.tiangolo.com/routing/", "Routers group routes.", title="Routing")
+    [snippet] = ResearchAgent().index_snippets(["router"], ["fastapi"])
+    assert (snippet.library, snippet.text, snippet.score) == ("fastapi", "Routers group routes.", 0.0)
+
+
+@pytest.mark.asyncio
+async def test_search_many_ranks_indexed_libraries(doc_index):
+    doc_index.add_page("fastapi", "https://fastapi.tiangolo.com/tutorial/bigger-applications/", DOCS, title="Bigger Applications")
+    session = ResearchAgent().new_session(timeout=5)
+    calls = []
+
+    async def fake_fetch(url):
+        calls.append(url)
+        return PAGES.get(url)
+
+    session._fetch_url = fake_fetch
+    try:
+        results = await session.search_many(["APIRouter dependencies"], libraries=["fastapi", "python"], max_results=1)
+    finally:
+        await session.aclose()
+    [snippet] = results["APIRouter dependencies"]["fastapi"]
+    assert "dependencies declared on an apirouter" in snippet and "split with" not in snippet
+    assert results["APIRouter dependencies"]["python"] == ["asyncio runs the apirouter of nothing"]
+    assert calls == ['https://docs.python.org/3/']
@@ -0,0 +1,93 @@
+import importlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from backend.core.doc_index import DocIndex
+from backend.core.semantic_index import SemanticIndex, embed
+from backend.core.state import BuildStep
+
+# backend.core re-exports the global index under the module's name
+semantic_module = importlib.import_module("backend.core.semantic_index")
+
+
+class TestSemanticIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.docs = DocIndex(path=Path(self.temp_dir.name) / "docs.sqlite3")
+        self.docs.add_page("fastapi", "https://fastapi/routing", "Split an application into routers with APIRouter and include_router.", "Routing")
+        self.docs.add_page("fastapi", "https://fastapi/deps", "Declare dependencies with Depends to share database sessions.", "Dependencies")
+        self.docs.add_page("python", "https://python/asyncio", "The event loop runs coroutines and schedules callbacks.", "asyncio")
+        patcher = patch.object(semantic_module, "doc_index", self.docs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.steps = [
+            BuildStep(id="s1", agent="builder", action="Add websocket notifications", status="completed",
+                      result="Created backend/api/notify.py broadcasting build events over websockets"),
+        ]
+
+    def tearDown(self):
+        self.docs.close()
+        self.temp_dir.cleanup()
+
+    def make_index(self):
+        return SemanticIndex(directory=Path(self.temp_dir.name) / "semantic", dim=1024)
+
+    def test_embedding_is_normalized(self):
+        vector = embed("routers and routing", 1024)
+        self.assertAlmostEqual(float((vector ** 2).sum()), 1.0, places=5)
+        self.assertFalse(embed("the and with", 1024).any())
+
+    def test_finds_paraphrases(self):
+        index = self.make_index()
+        index.refresh(self.steps)
+        hits = index.search("how do I route requests with routers")
+        self.assertEqual(hits[0].ref, "https://fastapi/routing")
+        self.assertEqual(hits[0].title, "Routing")
+        step_hits = index.search("push build events to clients over a websocket", source="build_steps")
+        self.assertEqual([hit.ref for hit in step_hits], ["s1"])
+        self.assertEqual(index.search("zzz qqq"), [])
+
+    def test_refresh_is_incremental_and_persistent(self):
+        index = self.make_index()
+        first = index.refresh(self.steps)
+        self.assertEqual((first["docs"]["added"], first["build_steps"]["added"]), (3, 1))
+        again = index.refresh(self.steps)
+        self.assertEqual((again["docs"]["unchanged"], again["build_steps"]["unchanged"]), (3, 1))
+
+        self.docs.add_page("fastapi", "https://fastapi/deps", "Background tasks run after the response is sent.", "Background")
+        self.docs.remove_library("python")
+        changed = index.refresh([])
+        self.assertEqual(changed["docs"], {"added": 0, "updated": 1, "removed": 1, "unchanged": 1})
+        self.assertEqual(changed["build_steps"]["removed"], 1)
+        # Freed rows are reused
+        self.assertEqual(index.stats()["documents"], 2)
+
+        reopened = self.make_index()
+        self.assertEqual(reopened.stats()["documents"], 2)
+        self.assertEqual(reopened.search("send work after the response")[0].ref, "https://fastapi/deps")
+        self.assertEqual(reopened.refresh([])["docs"]["unchanged"], 2)
+
+    def test_dimension_change_rebuilds(self):
+        self.make_index().refresh(self.steps)
+        other = SemanticIndex(directory=Path(self.temp_dir.name) / "semantic", dim=512)
+        self.assertEqual(other.stats()["documents"], 0)
+
+
+class TestSemanticSearchTool(unittest.IsolatedAsyncioTestCase):
+    async def test_tool(self):
+        from backend.tools import base_tools
+        with tempfile.TemporaryDirectory() as temp_dir:
+            docs = DocIndex(path=Path(temp_dir) / "docs.sqlite3")
+            docs.add_page("fastapi", "https://fastapi/routing", "Split an application into routers with APIRouter.", "Routing")
+            index = SemanticIndex(directory=Path(temp_dir) / "semantic", dim=1024)
+            with patch.object(semantic_module, "doc_index", docs), patch.object(base_tools, "semantic_index", index):
+                found = await base_tools.semantic_search.ainvoke({"query": "routing with routers", "source": "docs"})
+                bad = await base_tools.semantic_search.ainvoke({"query": "x", "source": "web"})
+            docs.close()
+        self.assertIn("docs https://fastapi/routing - Routing", found)
+        self.assertTrue(bad.startswith("Unknown source"))
+
+
+if __name__ == '__main__':
+    unittest.main()
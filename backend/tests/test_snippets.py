@@ -0,0 +1,46 @@
+import unittest
+from backend.core.snippets import TermMatcher, extract_terms, rank_snippets
+
+
+DOC = (
+    "fastapi lets you split an application with apirouter. " * 3
+    + "unrelated filler text about nothing in particular. " * 20
+    + "dependency injection works with apirouter: declare depends() in fastapi path operations. "
+    + "more filler text at the very end of the page. " * 10
+)
+
+
+class TestExtractTerms(unittest.TestCase):
+    def test_key_terms(self):
+        terms = extract_terms("Build a FastAPI APIRouter with dependency injection using fastapi.Depends in 2 apps")
+        self.assertEqual(terms[:2], ["fastapi", "apirouter"])  # fastapi appears twice
+        self.assertIn("fastapi.depends", terms)
+        self.assertIn("depends", terms)
+        for dropped in ("build", "with", "using", "in", "2"):
+            self.assertNotIn(dropped, terms)
+        self.assertEqual(len(extract_terms("alpha beta gamma delta", limit=2)), 2)
+
+
+class TestRankSnippets(unittest.TestCase):
+    def test_dense_windows_rank_first(self):
+        matcher = TermMatcher(["fastapi", "apirouter", "dependency", "depends"])
+        snippets = rank_snippets(DOC, matcher, top_k=3)
+        self.assertIn("dependency injection", snippets[0].text)
+        self.assertEqual(set(snippets[0].terms), {"fastapi", "apirouter", "dependency", "depends"})
+        self.assertEqual(len(snippets), 2)  # the two clusters; windows never overlap
+        self.assertGreater(snippets[0].score, snippets[1].score)
+
+    def test_whole_words_only(self):
+        matcher = TermMatcher(["api"])
+        self.assertEqual(rank_snippets("fastapi apirouter", matcher), [])
+        self.assertEqual(len(rank_snippets("the api. an api", matcher, window=5)), 2)
+
+    def test_bytes_and_empty_terms(self):
+        matcher = TermMatcher(["apirouter", "dependency"])
+        as_bytes = rank_snippets(DOC.encode("utf-8"), matcher, top_k=1)
+        self.assertEqual(as_bytes[0].text, rank_snippets(DOC, matcher, top_k=1)[0].text)
+        self.assertEqual(rank_snippets(DOC, TermMatcher([])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import json
+import unittest
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Import-time budget for backend.api, overridable on slow CI machines
+IMPORT_BUDGET_SECONDS = float(os.environ.get("AUTO_IMPORT_BUDGET_SECONDS", "3.0"))
+
+IMPORT_SCRIPT = """
+import json
+import time
+start = time.perf_counter()
+import backend.api
+elapsed = time.perf_counter() - start
+
+from backend.core.lazy import is_constructed
+from backend.core import settings, state_manager, file_guardian
+from backend.agents import orchestrator, planner, builder, validator, toolsmith
+singletons = {
+    "settings": settings,
+    "state_manager": state_manager,
+    "file_guardian": file_guardian,
+    "orchestrator": orchestrator,
+    "planner": planner,
+    "builder": builder,
+    "validator": validator,
+    "toolsmith": toolsmith,
+}
+print(json.dumps({
+    "elapsed": elapsed,
+    "constructed": [name for name, obj in singletons.items() if is_constructed(obj)],
+}))
+"""
+
+
+def run_import():
+    # No API key: importing must not need one
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"Importing backend.api failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_constructs_nothing(self):
+        report = run_import()
+        self.assertEqual(report["constructed"], [])
+
+    def test_import_time_budget(self):
+        # Best of three runs to smooth out scheduler noise
+        elapsed = min(run_import()["elapsed"] for _ in range(3))
+        self.assertLess(
+            elapsed,
+            IMPORT_BUDGET_SECONDS,
+            f"import backend.api took {elapsed:.2f}s (budget {IMPORT_BUDGET_SECONDS:.2f}s)",
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
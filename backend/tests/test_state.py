@@ -1,7 +1,7 @@
 import unittest
 import asyncio
 from datetime import datetime, timedelta
-from backend.core.state import StateManager, BuildStep, SystemCapability
+from backend.core.state import StateManager, BuildStep, SystemCapability, TaskCheckpoint
 import os
 import tempfile
 from unittest.mock import patch
@@ -62,6 +62,18 @@ class TestStateManager(unittest.IsolatedAsyncioTestCase):
         self.assertIsNotNone(cap)
         self.assertTrue(cap.implemented)
 
+    async def test_add_generated_files_saves_once(self):
+        await self.state_manager.load()
+        paths = ["backend/tools/a.py", "backend/tools/__init__.py", "backend/tests/test_a.py"]
+        with patch.object(self.state_manager, "save", wraps=self.state_manager.save) as save:
+            await self.state_manager.add_generated_files(paths)
+        self.assertEqual(save.call_count, 1)
+        state = await self.state_manager.get_state()
+        for path in paths:
+            self.assertIn(path, state.generated_files)
+        cap_names = {c.name for c in state.capabilities}
+        self.assertIn("backend_tools_a_py", cap_names)
+
     async def test_cache_results(self):
         task_hash = "hash123"
         result = "result_data"
@@ -79,5 +91,20 @@ class TestStateManager(unittest.IsolatedAsyncioTestCase):
         expired = await self.state_manager.get_cached_result(task_hash)
         self.assertIsNone(expired)
 
+    async def test_checkpoints_survive_reload(self):
+        checkpoint = TaskCheckpoint(task_hash="hash456", task="big task", phases=["one", "two"])
+        checkpoint.results.append({"phase": "one", "output": "done"})
+        await self.state_manager.save_checkpoint(checkpoint)
+
+        reloaded = StateManager(state_file=self.state_manager.state_file)
+        restored = await reloaded.get_checkpoint("hash456")
+        self.assertEqual(restored.phases, ["one", "two"])
+        self.assertEqual(restored.next_phase, 1)
+        self.assertEqual([c.task_hash for c in await reloaded.list_checkpoints()], ["hash456"])
+
+        self.assertTrue(await reloaded.clear_checkpoint("hash456"))
+        self.assertIsNone(await reloaded.get_checkpoint("hash456"))
+        self.assertFalse(await reloaded.clear_checkpoint("hash456"))
+
 if __name__ == '__main__':
     unittest.main()
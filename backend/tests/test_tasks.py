@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from backend.core.tasks import (
+    TaskRegistry,
+    TaskCancelled,
+    DeadlineExceeded,
+    deadline_scope,
+    with_deadline,
+    remaining_time,
+)
+from backend.core.build_loop import BuildLoop
+
+
+class TestTaskRegistry(unittest.IsolatedAsyncioTestCase):
+    async def test_run_returns_result(self):
+        registry = TaskRegistry()
+
+        async def work():
+            return 42
+
+        self.assertEqual(await registry.run(work(), task_id="t1"), 42)
+        self.assertFalse(registry.is_running("t1"))
+
+    async def test_cancel_reaches_inflight_work(self):
+        registry = TaskRegistry()
+        cleaned_up = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(30)
+            finally:
+                cleaned_up.set()
+
+        runner = asyncio.ensure_future(registry.run(work(), task_id="t2"))
+        await asyncio.sleep(0.05)
+        self.assertEqual([t["id"] for t in registry.list_running()], ["t2"])
+        self.assertTrue(registry.cancel("t2"))
+        with self.assertRaises(TaskCancelled):
+            await asyncio.wait_for(runner, timeout=2)
+        self.assertTrue(cleaned_up.is_set())
+        self.assertFalse(registry.cancel("t2"))
+
+    async def test_deadline_cancels_slow_call(self):
+        registry = TaskRegistry()
+
+        async def work():
+            return await with_deadline(asyncio.sleep(30))
+
+        with self.assertRaises(DeadlineExceeded):
+            await asyncio.wait_for(registry.run(work(), timeout=0.1), timeout=2)
+
+    async def test_deadline_scopes_only_shorten(self):
+        self.assertEqual(remaining_time(), float("inf"))
+        with deadline_scope(1):
+            with deadline_scope(60):
+                self.assertLessEqual(remaining_time(), 1)
+        self.assertEqual(remaining_time(), float("inf"))
+
+
+class TestBuildLoopStop(unittest.IsolatedAsyncioTestCase):
+    async def test_stop_cancels_running_cycle(self):
+        loop = BuildLoop()
+
+        async def slow_cycle():
+            await asyncio.sleep(30)
+            return True
+
+        async def no_capabilities():
+            return None
+
+        with patch.object(loop, "run_cycle", slow_cycle), \
+                patch.object(loop, "initialize_capabilities", no_capabilities):
+            runner = asyncio.ensure_future(loop.run())
+            await asyncio.sleep(0.05)
+            self.assertTrue(loop.running)
+            loop.stop()
+            await asyncio.wait_for(runner, timeout=2)
+        self.assertFalse(loop.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from backend.core.vocabulary import VocabularyIndex
+
+
+class TestVocabularyIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        (root / "backend" / "agents").mkdir(parents=True)
+        (root / "frontend" / "components").mkdir(parents=True)
+        (root / "backend" / "requirements.txt").write_text("fastapi==0.115.6\nuvicorn[standard]==0.34.0\nlangchain-openai>=0.2.0\n")
+        (root / "backend" / "agents" / "worker.py").write_text(
+            "import httpx\nfrom bs4 import BeautifulSoup\n\nclass TaskRunner:\n    def run_task(self):\n        pass\n"
+        )
+        (root / "frontend" / "package.json").write_text(json.dumps({
+            "dependencies": {"react": "19.0.0", "@tanstack/react-query": "5.0.0"},
+        }))
+        (root / "frontend" / "components" / "Panel.tsx").write_text('import { useState } from "react";\n')
+        self.index = VocabularyIndex(project_root=root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_known_sources(self):
+        for name in ["fastapi", "uvicorn", "langchain_openai", "langchain-openai", "httpx",
+                     "BeautifulSoup", "TaskRunner", "run_task", "useState", "@tanstack/react-query",
+                     "asyncio", "json"]:
+            self.assertTrue(self.index.is_known(name), name)
+        self.assertTrue(self.index.is_known("fastapi.APIRouter"))
+        self.assertFalse(self.index.is_known("polars"))
+
+    def test_plain_prose_is_not_flagged(self):
+        text = "Build a complete system with agents, tools and the main entry point in backend/agents"
+        self.assertEqual(self.index.detect_unknown(text), [])
+
+    def test_unknown_identifiers_are_flagged(self):
+        text = "Load data with pandas.read_csv, then pip install polars and call TaskRunner.run_task"
+        self.assertEqual(self.index.detect_unknown(text), ["pandas.read_csv", "polars"])
+
+    def test_extra_known_and_limit(self):
+        text = "Use `redis` with sklearn.cluster and qdrant_client and pymongo.MongoClient"
+        self.assertEqual(self.index.detect_unknown(text, extra_known=["redis"], limit=2),
+                         ["sklearn.cluster", "qdrant_client"])
+
+
+if __name__ == '__main__':
+    unittest.main()
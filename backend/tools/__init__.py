@@ -1,5 +1,38 @@
 """Tools for the self-building system."""
+from typing import List
+from langchain_core.tools import BaseTool
 from .base_tools import BASE_TOOLS
 from .doc_search_tools import search_langchain_docs, search_fastapi_docs, search_nextjs_docs
+from .instrumentation import instrument_tool
+from .output_budget import with_output_budget
 
-__all__ = ["BASE_TOOLS", "search_langchain_docs", "search_fastapi_docs", "search_nextjs_docs"]
+
+def prepare_tools(tools: List[BaseTool]) -> List[BaseTool]:
+    """Apply the output budget and metrics to every tool in tools, in place.
+
+    Agents call this on their tool list when they are built, so tools added
+    to BASE_TOOLS after import are wrapped like the rest. Returns tools.
+    """
+    for tool in tools:
+        instrument_tool(with_output_budget(tool))
+    return tools
+
+
+def register_tool(tool: BaseTool) -> BaseTool:
+    """Add tool to BASE_TOOLS with the output budget and metrics applied."""
+    prepare_tools([tool])
+    if not any(t is tool for t in BASE_TOOLS):
+        BASE_TOOLS.append(tool)
+    return tool
+
+
+prepare_tools([*BASE_TOOLS, search_langchain_docs, search_fastapi_docs, search_nextjs_docs])
+
+__all__ = [
+    "BASE_TOOLS",
+    "prepare_tools",
+    "register_tool",
+    "search_langchain_docs",
+    "search_fastapi_docs",
+    "search_nextjs_docs",
+]
@@ -2,12 +2,24 @@
 import os
 import re
 import ast
-import subprocess
+import asyncio
 from pathlib import Path
 from typing import Optional, List
+import aiofiles
+import aiofiles.os
 from langchain_core.tools import tool
+from pydantic import BaseModel, Field
 from ..core import settings, state_manager
 from ..core.file_guardian import file_guardian
+from ..core.code_search import code_search_index
+from ..core.content_cache import content_cache
+from ..core.file_index import file_index
+from ..core.fileio import read_text_range, write_files_atomically
+from ..core.patching import apply_patch_text, PatchError
+from ..core.project_check import project_checker
+from ..core.semantic_index import semantic_index, SOURCES as SEMANTIC_SOURCES
+from ..core.process import run_shell
+from ..core.tasks import remaining_time
 
 
 # File type routing: extension → allowed directories
@@ -75,21 +87,39 @@ def _validate_file_path(file_path: str) -> Optional[str]:
 
 
 @tool
-async def read_file(file_path: str) -> str:
-    """Read the contents of a file.
+async def read_file(
+    file_path: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> str:
+    """Read the contents of a file, or a range of its lines.
+
+    Large files are cut off after max_bytes; read the rest with
+    start_line/end_line.
     
     Args:
         file_path: Path to the file to read (relative to project root)
+        start_line: First line to read, 1-based (default: start of file)
+        end_line: Last line to read, inclusive (default: end of file)
+        max_bytes: Maximum bytes to return (default and cap 32000)
     
     Returns:
         File contents as string
     """
     full_path = settings.project_root / file_path
+    limit = min(max_bytes or settings.read_file_max_bytes, settings.read_file_max_bytes)
     try:
-        with open(full_path, 'r') as f:
-            return f.read()
+        part = await read_text_range(full_path, start_line, end_line, limit)
     except Exception as e:
         return f"Error reading file: {str(e)}"
+    if part.truncated:
+        next_line = (start_line or 1) + part.text.count("\n")
+        return (
+            f"{part.text}\n... [truncated after {limit} bytes; {file_path} is {part.size} bytes. "
+            f"Continue with start_line={next_line}.]"
+        )
+    return part.text
 
 
 @tool
@@ -132,9 +162,11 @@ async def write_file(file_path: str, content: str) -> str:
     # Non-protected file: write normally
     full_path = settings.project_root / file_path
     try:
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(full_path, 'w') as f:
-            f.write(content)
+        await aiofiles.os.makedirs(full_path.parent, exist_ok=True)
+        async with aiofiles.open(full_path, 'w') as f:
+            await f.write(content)
+        content_cache.invalidate(full_path)
+        file_index.update_path(file_path)
 
         # Track generated file
         await state_manager.add_generated_file(file_path)
@@ -144,6 +176,179 @@ async def write_file(file_path: str, content: str) -> str:
         return f"Error writing file: {str(e)}"
 
 
+class FileChange(BaseModel):
+    """One file to write in a write_files batch."""
+    file_path: str = Field(description="Path to the file (relative to project root)")
+    content: str = Field(description="Complete new content of the file")
+
+
+@tool
+async def read_files(file_paths: List[str]) -> str:
+    """Read several files in one call.
+
+    The read_file size limit is shared between the files; use read_file with
+    start_line/end_line to read more of a truncated file.
+
+    Args:
+        file_paths: Paths to read (relative to project root)
+
+    Returns:
+        Each file's contents under a "=== path ===" header
+    """
+    if not file_paths:
+        return "No files requested"
+    limit = max(settings.read_file_max_bytes // len(file_paths), 1)
+
+    async def read_one(file_path: str) -> str:
+        try:
+            part = await read_text_range(settings.project_root / file_path, max_bytes=limit)
+        except Exception as e:
+            return f"=== {file_path} ===\nError reading file: {str(e)}"
+        text = part.text
+        if part.truncated:
+            next_line = 1 + text.count("\n")
+            text += f"\n... [truncated after {limit} bytes of {part.size}; continue with read_file start_line={next_line}]"
+        return f"=== {file_path} ===\n{text}"
+
+    return "\n\n".join(await asyncio.gather(*(read_one(p) for p in file_paths)))
+
+
+@tool
+async def write_files(changes: List[FileChange]) -> str:
+    """Write several related files (e.g. a module, its export and its test) at once.
+
+    All paths are validated before anything is written. Unprotected files are
+    written as one transaction: if any write fails, none of them take effect.
+    Protected core files in the batch are queued for human approval, as with
+    write_file. Forbidden files make the whole batch fail.
+
+    Args:
+        changes: Files to write, each with file_path and complete content
+
+    Returns:
+        Summary of written and queued files, or the validation errors
+    """
+    changes = [FileChange.model_validate(c) for c in changes]
+    if not changes:
+        return "No files to write"
+
+    # VALIDATION: check every path before touching the disk
+    errors = []
+    seen = set()
+    for change in changes:
+        normalized = change.file_path.replace("\\", "/").lstrip("/")
+        if normalized in seen:
+            errors.append(f"DUPLICATE: '{change.file_path}' appears more than once in the batch.")
+        seen.add(normalized)
+        path_error = _validate_file_path(change.file_path)
+        if path_error:
+            errors.append(path_error)
+        elif file_guardian.is_forbidden(change.file_path):
+            errors.append(f"BLOCKED: '{change.file_path}' is a forbidden path and cannot be written to.")
+    if errors:
+        return "Nothing was written:\n" + "\n".join(errors)
+
+    protected = [c for c in changes if file_guardian.is_protected(c.file_path)]
+    writable = [c for c in changes if not file_guardian.is_protected(c.file_path)]
+
+    if writable:
+        try:
+            await asyncio.to_thread(
+                write_files_atomically,
+                settings.project_root,
+                {c.file_path: c.content for c in writable},
+            )
+        except Exception as e:
+            return f"Error writing files, no changes were applied: {str(e)}"
+        for change in writable:
+            content_cache.invalidate(settings.project_root / change.file_path)
+            file_index.update_path(change.file_path)
+        # One state save for the whole batch
+        await state_manager.add_generated_files([c.file_path for c in writable])
+
+    lines = [f"Successfully wrote {c.file_path}" for c in writable]
+    for change in protected:
+        approval = await file_guardian.request_approval(
+            file_path=change.file_path,
+            content=change.content,
+            reason=f"Auto attempted to modify protected core file: {change.file_path}",
+        )
+        lines.append(
+            f"QUEUED FOR APPROVAL: '{change.file_path}' is a protected core file "
+            f"(approval id: {approval.id}). Do NOT attempt to bypass this protection."
+        )
+    return "\n".join(lines)
+
+
+@tool
+async def apply_patch(file_path: str, patch: str) -> str:
+    """Edit a file by sending only the change, not the whole file.
+
+    Prefer this over write_file for edits to existing files. Accepts either
+    a unified diff (with "@@" hunks and context lines) or one or more
+    SEARCH/REPLACE blocks:
+
+        <<<<<<< SEARCH
+        exact existing lines
+        =======
+        replacement lines
+        >>>>>>> REPLACE
+
+    Every hunk's context (or SEARCH text) must match the current file; if any
+    part does not apply, the file is left unchanged. Protected core files are
+    queued for human approval with the patch.
+
+    Args:
+        file_path: Path to the file to edit (relative to project root)
+        patch: Unified diff or SEARCH/REPLACE blocks for this file
+
+    Returns:
+        Success, approval or error message
+    """
+    path_error = _validate_file_path(file_path)
+    if path_error:
+        return path_error
+    if file_guardian.is_forbidden(file_path):
+        return f"BLOCKED: '{file_path}' is a forbidden path and cannot be written to."
+
+    full_path = settings.project_root / file_path
+    try:
+        if await aiofiles.os.path.exists(full_path):
+            original = (await content_cache.read(full_path)).decode("utf-8")
+        else:
+            original = ""
+        updated = apply_patch_text(original, patch)
+    except PatchError as e:
+        return f"Patch not applied, {file_path} is unchanged: {str(e)}"
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
+    if updated == original:
+        return f"Patch made no changes to {file_path}"
+
+    # Protected files: store the (verified) patch for review instead of the full file
+    if file_guardian.is_protected(file_path):
+        approval = await file_guardian.request_approval(
+            file_path=file_path,
+            patch=patch,
+            reason=f"Auto attempted to patch protected core file: {file_path}",
+        )
+        return (
+            f"QUEUED FOR APPROVAL: '{file_path}' is a protected core file. "
+            f"The patch has been queued for human review (approval id: {approval.id}). "
+            f"A human must approve this change at /api/approvals/{approval.id}/approve before it takes effect. "
+            f"Do NOT attempt to bypass this protection."
+        )
+
+    try:
+        await asyncio.to_thread(write_files_atomically, settings.project_root, {file_path: updated})
+    except Exception as e:
+        return f"Error writing file: {str(e)}"
+    content_cache.invalidate(full_path)
+    file_index.update_path(file_path)
+    await state_manager.add_generated_file(file_path)
+    return f"Successfully patched {file_path}"
+
+
 @tool
 async def list_directory(directory_path: str = ".") -> str:
     """List contents of a directory.
@@ -154,13 +359,23 @@ async def list_directory(directory_path: str = ".") -> str:
     Returns:
         List of files and directories
     """
+    # Indexed directories are listed from memory (ignored entries are left out)
+    if not file_index.is_ignored(directory_path):
+        listing = file_index.list_dir(directory_path)
+        if listing is not None:
+            return "\n".join(f"{'DIR' if is_dir else 'FILE'}: {name}" for name, is_dir in listing)
+
     full_path = settings.project_root / directory_path
-    try:
+
+    def list_items() -> List[str]:
         items = []
         for item in sorted(full_path.iterdir()):
             item_type = "DIR" if item.is_dir() else "FILE"
             items.append(f"{item_type}: {item.name}")
-        return "\n".join(items)
+        return items
+
+    try:
+        return "\n".join(await asyncio.to_thread(list_items))
     except Exception as e:
         return f"Error listing directory: {str(e)}"
 
@@ -183,12 +398,47 @@ async def validate_python_syntax(code: str) -> str:
 
 
 @tool
-async def run_command(command: str, cwd: Optional[str] = None) -> str:
-    """Run a shell command and return output.
+async def check_project(directory: str = "backend") -> str:
+    """Compile every Python file in a directory and check that its imports resolve.
+
+    Unchanged files are not re-parsed, so this is cheap to run after every
+    edit.
+
+    Args:
+        directory: Directory to check (relative to project root)
+
+    Returns:
+        Summary line followed by one line per problem
+    """
+    report = await project_checker.check(directory.strip("/") or ".")
+    summary = (
+        f"Checked {len(report.files)} Python files in {report.duration:.2f}s "
+        f"({report.analyzed} parsed, {report.cached} unchanged)"
+    )
+    if not report.files:
+        return f"No Python files found in {directory}"
+    if report.ok:
+        return f"{summary}: no problems found"
+    lines = [f"{summary}: {len(report.failures)} files with problems"]
+    for result in report.failures:
+        if result.syntax_error:
+            lines.append(f"{result.path}: syntax error at {result.syntax_error}")
+        for error in result.import_errors:
+            lines.append(f"{result.path}: {error}")
+    return "\n".join(lines)
+
+
+@tool
+async def run_command(command: str, cwd: Optional[str] = None, timeout: Optional[float] = None) -> str:
+    """Run a shell command and return its exit code and output.
+
+    stdout and stderr are returned together. Long output is truncated in the
+    middle, keeping its beginning and end.
     
     Args:
         command: Command to run
         cwd: Working directory (relative to project root)
+        timeout: Seconds before the command is killed (default 30)
     
     Returns:
         Command output or error
@@ -203,32 +453,133 @@ async def run_command(command: str, cwd: Optional[str] = None) -> str:
     )
 
     work_dir = settings.project_root / cwd if cwd else settings.project_root
+    timeout = min(timeout or settings.command_timeout_seconds, settings.command_max_timeout_seconds)
+    # Never outlive the deadline of the task that runs the command
+    timeout = max(min(timeout, remaining_time()), 0)
     try:
-        result = subprocess.run(
+        result = await run_shell(
             sanitized,
-            shell=True,
             cwd=work_dir,
-            capture_output=True,
-            text=True,
-            timeout=30
+            timeout=timeout,
+            max_output=settings.command_output_limit,
         )
-        output = result.stdout if result.returncode == 0 else result.stderr
-        return f"Exit code: {result.returncode}\n{output}"
-    except subprocess.TimeoutExpired:
-        return "Command timed out after 30 seconds"
     except Exception as e:
         return f"Error running command: {str(e)}"
 
+    if result.timed_out:
+        return f"Command timed out after {timeout:g} seconds\n{result.output}"
+    return f"Exit code: {result.returncode}\n{result.output}"
+
+
+# Sections accepted by query_state
+STATE_SECTIONS = ("summary", "steps", "capabilities", "files")
+
+# Step actions, results and errors are cut to this many characters in query_state
+STATE_TEXT_CHARS = 160
+
+
+def _clip(text: Optional[str], limit: int = STATE_TEXT_CHARS) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _state_summary(state) -> str:
+    counts = {}
+    for step in state.build_steps:
+        counts[step.status] = counts.get(step.status, 0) + 1
+    implemented = sum(1 for c in state.capabilities if c.implemented)
+    metadata = ", ".join(
+        f"{key} ({len(value)} entries)" if isinstance(value, (dict, list)) else key
+        for key, value in state.metadata.items()
+    )
+    return "\n".join([
+        f"System state v{state.version}, updated {state.last_updated:%Y-%m-%d %H:%M}",
+        f"Build steps: {len(state.build_steps)} ("
+        + ", ".join(f"{status} {n}" for status, n in sorted(counts.items())) + ")",
+        f"Capabilities: {implemented}/{len(state.capabilities)} implemented",
+        f"Generated files: {len(state.generated_files)}",
+        f"Metadata: {metadata or 'none'}",
+        'Query section="steps", "capabilities" or "files" for details.',
+    ])
+
+
+def _render_step(step) -> str:
+    line = f"{step.timestamp:%Y-%m-%d %H:%M} {step.agent} {step.status} [{step.id[:8]}] {_clip(step.action)}"
+    if step.error:
+        return f"{line} | error: {_clip(step.error)}"
+    if step.result:
+        return f"{line} | result: {_clip(step.result)}"
+    return line
+
+
+def _render_capability(capability) -> str:
+    line = f"{'[x]' if capability.implemented else '[ ]'} {capability.name}: {_clip(capability.description)}"
+    return f"{line} ({capability.file_path})" if capability.file_path else line
+
 
 @tool
-async def get_system_state() -> str:
-    """Get current system state including capabilities and build history.
-    
+async def query_state(
+    section: str = "summary",
+    status: Optional[str] = None,
+    agent: Optional[str] = None,
+    contains: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> str:
+    """Query the system state: build history, capabilities and generated files.
+
+    Start with the summary, then page through one section with filters.
+
+    Args:
+        section: "summary", "steps" (newest first), "capabilities" or "files"
+        status: Steps: completed, failed, running, ...; capabilities: implemented or missing
+        agent: Only steps recorded by this agent (steps only)
+        contains: Case-insensitive text the step action, capability or file path must contain
+        limit: Maximum entries to return (at most 100)
+        offset: Entries to skip, for paging
+
     Returns:
-        JSON representation of system state
+        One compact line per entry, followed by a paging note
     """
+    if section not in STATE_SECTIONS:
+        return f"Unknown section '{section}'; use one of: {', '.join(STATE_SECTIONS)}"
     state = await state_manager.get_state()
-    return state.model_dump_json(indent=2)
+    if section == "summary":
+        return _state_summary(state)
+
+    needle = (contains or "").lower()
+    wanted = (status or "").lower()
+    if section == "steps":
+        entries = [
+            step for step in reversed(state.build_steps)
+            if (not wanted or step.status == wanted)
+            and (not agent or step.agent.lower() == agent.lower())
+            and needle in step.action.lower()
+        ]
+        render = _render_step
+    elif section == "capabilities":
+        if wanted not in ("", "implemented", "missing"):
+            return "Capability status must be 'implemented' or 'missing'"
+        entries = [
+            capability for capability in state.capabilities
+            if (not wanted or capability.implemented == (wanted == "implemented"))
+            and (needle in capability.name.lower() or needle in capability.description.lower())
+        ]
+        render = _render_capability
+    else:
+        entries = [path for path in state.generated_files if needle in path.lower()]
+        render = str
+
+    limit = min(max(limit, 1), 100)
+    offset = max(offset, 0)
+    page = entries[offset:offset + limit]
+    if not page:
+        return f"No {section} match" + (f" (offset {offset} is past the {len(entries)} matches)" if entries else "")
+    lines = [render(entry) for entry in page]
+    end = offset + len(page)
+    note = f"[{section} {offset + 1}-{end} of {len(entries)}"
+    lines.append(note + (f"; next page: offset={end}]" if end < len(entries) else "]"))
+    return "\n".join(lines)
 
 
 @tool
@@ -241,17 +592,99 @@ async def check_file_exists(file_path: str) -> str:
     Returns:
         "exists" or "not found"
     """
+    if not file_index.is_ignored(file_path):
+        return "exists" if file_index.exists(file_path) else "not found"
     full_path = settings.project_root / file_path
     return "exists" if full_path.exists() else "not found"
 
 
+@tool
+async def search_code(
+    query: str,
+    regex: bool = False,
+    path_glob: Optional[str] = None,
+    case_sensitive: bool = False,
+    context_lines: int = 1,
+    max_results: int = 20,
+) -> str:
+    """Search the repository's source files for a string or regex.
+
+    Use this to locate definitions and usages instead of listing directories
+    and reading whole files.
+
+    Args:
+        query: Text to find, or a Python regular expression if regex is true
+        regex: Treat query as a regular expression
+        path_glob: Only search matching paths, e.g. "backend/*.py" ("*" also matches "/")
+        case_sensitive: Match case exactly
+        context_lines: Lines of context to show around each match
+        max_results: Maximum number of matching lines to return
+
+    Returns:
+        Matches as "path:line:text", context lines as "path-line-text"
+    """
+    try:
+        hits = await asyncio.to_thread(
+            code_search_index.search,
+            query,
+            regex=regex,
+            path_glob=path_glob,
+            case_sensitive=case_sensitive,
+            max_results=max_results,
+        )
+    except re.error as e:
+        return f"Invalid regex: {str(e)}"
+    if not hits:
+        return "No matches found"
+    output = code_search_index.format_hits(hits, context_lines=max(context_lines, 0))
+    if len(hits) >= max_results:
+        output += f"\n[stopped after {max_results} matches; narrow the query or path_glob to see more]"
+    return output
+
+
+@tool
+async def semantic_search(query: str, source: Optional[str] = None, limit: int = 5) -> str:
+    """Find documentation and past build results similar in meaning to query.
+
+    Unlike search_code, this also matches paraphrases: describe what you need
+    in your own words. Check here before researching or re-deriving something
+    the system may already know.
+
+    Args:
+        query: What you are looking for, in plain words
+        source: "docs" (indexed documentation) or "build_steps" (past build results); default both
+        limit: Maximum number of results (at most 20)
+
+    Returns:
+        One entry per result: similarity, source, reference, title and a preview
+    """
+    if source is not None and source not in SEMANTIC_SOURCES:
+        return f"Unknown source '{source}'; use one of: {', '.join(SEMANTIC_SOURCES)}"
+    state = await state_manager.get_state()
+    # Incremental: only pages and steps that changed since the last call are embedded
+    await asyncio.to_thread(semantic_index.refresh, state.build_steps)
+    hits = await asyncio.to_thread(semantic_index.search, query, min(max(limit, 1), 20), source)
+    if not hits:
+        return "No similar documents found"
+    return "\n".join(
+        f"[{hit.score:.2f}] {hit.source} {hit.ref} - {_clip(hit.title)}\n    {_clip(hit.text, 300)}"
+        for hit in hits
+    )
+
+
 # Export all tools as a list
 BASE_TOOLS = [
     read_file,
+    read_files,
     write_file,
+    write_files,
+    apply_patch,
     list_directory,
     validate_python_syntax,
+    check_project,
     run_command,
-    get_system_state,
+    query_state,
     check_file_exists,
+    search_code,
+    semantic_search,
 ]
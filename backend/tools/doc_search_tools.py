@@ -1,6 +1,36 @@
 """Documentation search tools for detected technologies."""
-import aiohttp
+import asyncio
 from langchain_core.tools import tool
+from ..core.doc_index import DOC_SITES, doc_index
+from ..core.http_cache import http_client
+
+
+# Library each documentation set is indexed under; its landing page is
+# DOC_SITES[library], the URL the research agent indexes it under too
+DOC_LIBRARIES = {"LangChain": "langchain", "FastAPI": "fastapi", "Next.js": "nextjs"}
+
+# Sections returned per search
+MAX_HITS = 3
+
+
+async def _search_docs(name: str, query: str) -> str:
+    """Return the best-matching sections of a documentation set from the local index."""
+    library = DOC_LIBRARIES[name]
+    url = DOC_SITES[library]
+    try:
+        if not await asyncio.to_thread(doc_index.has_library, library):
+            # First search: index the landing page, later searches stay offline
+            async with http_client.host(url):
+                response = await http_client.get(url)
+            if not response.ok:
+                return f"Error fetching {name} docs: HTTP {response.status}"
+            await asyncio.to_thread(doc_index.add_html, library, url, response.text)
+        hits = await asyncio.to_thread(doc_index.search, query, [library], MAX_HITS)
+        if not hits:
+            return f"No relevant {name} documentation found for query."
+        return "\n\n".join(f"[{hit.title or name}] {hit.ref}\n{hit.text}" for hit in hits)
+    except Exception as e:
+        return f"Error searching {name} docs: {str(e)}"
 
 
 @tool
@@ -13,24 +43,7 @@ async def search_langchain_docs(query: str) -> str:
     Returns:
         Relevant documentation snippets as a string
     """
-    # For demonstration, fetch LangChain docs homepage and search for query
-    url = "https://python.langchain.com/en/latest/index.html"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return f"Error fetching LangChain docs: HTTP {resp.status}"
-                text = await resp.text()
-        # Simple snippet extraction: find first occurrence of query and surrounding text
-        idx = text.lower().find(query.lower())
-        if idx == -1:
-            return "No relevant LangChain documentation found for query."
-        start = max(0, idx - 200)
-        end = min(len(text), idx + 200)
-        snippet = text[start:end]
-        return snippet
-    except Exception as e:
-        return f"Error searching LangChain docs: {str(e)}"
+    return await _search_docs("LangChain", query)
 
 
 @tool
@@ -43,22 +56,7 @@ async def search_fastapi_docs(query: str) -> str:
     Returns:
         Relevant documentation snippets as a string
     """
-    url = "https://fastapi.tiangolo.com/en/latest/"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return f"Error fetching FastAPI docs: HTTP {resp.status}"
-                text = await resp.text()
-        idx = text.lower().find(query.lower())
-        if idx == -1:
-            return "No relevant FastAPI documentation found for query."
-        start = max(0, idx - 200)
-        end = min(len(text), idx + 200)
-        snippet = text[start:end]
-        return snippet
-    except Exception as e:
-        return f"Error searching FastAPI docs: {str(e)}"
+    return await _search_docs("FastAPI", query)
 
 
 @tool
@@ -71,19 +69,4 @@ async def search_nextjs_docs(query: str) -> str:
     Returns:
         Relevant documentation snippets as a string
     """
-    url = "https://nextjs.org/docs"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return f"Error fetching Next.js docs: HTTP {resp.status}"
-                text = await resp.text()
-        idx = text.lower().find(query.lower())
-        if idx == -1:
-            return "No relevant Next.js documentation found for query."
-        start = max(0, idx - 200)
-        end = min(len(text), idx + 200)
-        snippet = text[start:end]
-        return snippet
-    except Exception as e:
-        return f"Error searching Next.js docs: {str(e)}"
+    return await _search_docs("Next.js", query)
@@ -0,0 +1,85 @@
+"""Record latency, payload size and errors of every tool call."""
+import json
+import time
+from functools import wraps
+from typing import Any, Dict
+from langchain_core.tools import BaseTool
+from ..core.metrics import tool_metrics
+
+
+def _payload_bytes(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="replace"))
+    try:
+        return len(json.dumps(value, default=str).encode("utf-8", errors="replace"))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+# Tools report failures as messages rather than raising; a result starting
+# with one of these counts as a failed call
+ERROR_PREFIXES = (
+    "Error",  # "Error reading file: ...", "Error searching FastAPI docs: ..."
+    "BLOCKED:",  # forbidden path, reserved name or wrong directory
+    "Patch not applied",
+    "Nothing was written:",
+    "Command timed out",
+    "Invalid regex:",
+    "Syntax error:",
+    "Unknown section",
+    "Unknown source",
+    "Capability status must be",
+)
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, str) and result.startswith(ERROR_PREFIXES)
+
+
+def _record(name: str, started: float, kwargs: Dict[str, Any], result: Any, error: bool) -> None:
+    tool_metrics.record(
+        name,
+        seconds=time.perf_counter() - started,
+        bytes_in=_payload_bytes(kwargs),
+        bytes_out=0 if result is None else _payload_bytes(result),
+        error=error,
+    )
+
+
+def instrument_tool(tool: BaseTool) -> BaseTool:
+    """Record every call of tool in tool_metrics.
+
+    Calls are attributed to the agent and build step of the enclosing
+    metrics_scope. The tool's function and coroutine are wrapped in place;
+    instrumenting twice is a no-op.
+    """
+    name = tool.name
+    for attr in ("func", "coroutine"):
+        function = getattr(tool, attr, None)
+        if function is None or getattr(function, "_instrumented", False):
+            continue
+        if attr == "coroutine":
+            @wraps(function)
+            async def instrumented(*args: Any, _function=function, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    result = await _function(*args, **kwargs)
+                except BaseException:
+                    _record(name, started, kwargs, None, error=True)
+                    raise
+                _record(name, started, kwargs, result, error=_is_error(result))
+                return result
+        else:
+            @wraps(function)
+            def instrumented(*args: Any, _function=function, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    result = _function(*args, **kwargs)
+                except BaseException:
+                    _record(name, started, kwargs, None, error=True)
+                    raise
+                _record(name, started, kwargs, result, error=_is_error(result))
+                return result
+        instrumented._instrumented = True
+        setattr(tool, attr, instrumented)
+    return tool
@@ -0,0 +1,45 @@
+"""Hard cap on the size of tool output handed back to agents."""
+from functools import wraps
+from typing import Any, Optional
+from langchain_core.tools import BaseTool
+from ..core import settings
+
+
+def truncate_output(output: str, limit: Optional[int] = None) -> str:
+    """Cut output to limit characters (default: settings.tool_output_max_chars), saying so."""
+    limit = limit or settings.tool_output_max_chars
+    if len(output) <= limit:
+        return output
+    # Prefer to stop at a line boundary
+    cut = output.rfind("\n", 0, limit)
+    if cut < limit // 2:
+        cut = limit
+    return (
+        f"{output[:cut]}\n[output truncated to {cut} of {len(output)} characters; "
+        "narrow the request (filters, limit/offset, line ranges) to see the rest]"
+    )
+
+
+def with_output_budget(tool: BaseTool) -> BaseTool:
+    """Apply truncate_output to everything tool returns.
+
+    The tool's function and coroutine are wrapped in place, so the tool keeps
+    its name, description and argument schema. Wrapping twice is a no-op.
+    """
+    for attr in ("func", "coroutine"):
+        function = getattr(tool, attr, None)
+        if function is None or getattr(function, "_output_budget", False):
+            continue
+        if attr == "coroutine":
+            @wraps(function)
+            async def budgeted(*args: Any, _function=function, **kwargs: Any) -> Any:
+                result = await _function(*args, **kwargs)
+                return truncate_output(result) if isinstance(result, str) else result
+        else:
+            @wraps(function)
+            def budgeted(*args: Any, _function=function, **kwargs: Any) -> Any:
+                result = _function(*args, **kwargs)
+                return truncate_output(result) if isinstance(result, str) else result
+        budgeted._output_budget = True
+        setattr(tool, attr, budgeted)
+    return tool
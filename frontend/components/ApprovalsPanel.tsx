@@ -9,6 +9,7 @@ interface Approval {
   requested_at: string;
   status: string;
   content: string;
+  patch?: string | null;
 }
 
 const API_BASE = "http://localhost:8000";
@@ -150,7 +151,7 @@ export function ApprovalsPanel() {
 
           {expanded === a.id && (
             <pre className="text-xs bg-gray-950 text-gray-300 p-3 rounded mb-3 max-h-64 overflow-auto whitespace-pre-wrap">
-              {a.content}
+              {a.patch ?? a.content}
             </pre>
           )}
 
@@ -8,6 +8,31 @@ interface Message {
   text: string;
 }
 
+interface Job {
+  id: string;
+  status: "queued" | "running" | "completed" | "failed" | "cancelled";
+  result?: any;
+  error?: string | null;
+}
+
+const API_URL = "http://localhost:8000";
+const POLL_INTERVAL_MS = 1500;
+
+// Poll the job queue until the task has finished
+async function waitForJob(jobId: string): Promise<Job> {
+  for (;;) {
+    const response = await fetch(`${API_URL}/api/jobs/${jobId}`, { mode: "cors" });
+    if (!response.ok) {
+      throw new Error(`Server error: ${response.statusText}`);
+    }
+    const job: Job = await response.json();
+    if (job.status !== "queued" && job.status !== "running") {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+}
+
 export function ChatInterface() {
   const [input, setInput] = useState("");
   const [messages, setMessages] = useState<Message[]>([]);
@@ -36,8 +61,8 @@ export function ChatInterface() {
     setInput("");
 
     try {
-      // Send POST request with JSON body {task: message, context: {}}
-      const response = await fetch("http://localhost:8000/api/task", {
+      // Queue the task; the response carries the job id to poll
+      const response = await fetch(`${API_URL}/api/task`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -50,10 +75,14 @@ export function ChatInterface() {
         throw new Error(`Server error: ${response.statusText}`);
       }
 
-      const data = await response.json();
+      const { task_id } = await response.json();
+      const job = await waitForJob(task_id);
+      if (job.status !== "completed") {
+        throw new Error(job.error || `Task ${job.status}`);
+      }
 
       // Add system message with the output from the orchestrator
-      const output = data?.result?.output || data?.result || JSON.stringify(data);
+      const output = job.result?.output || job.result || JSON.stringify(job);
       const systemMessage: Message = {
         id: `system-${Date.now()}`,
         sender: "system",
@@ -61,7 +90,7 @@ export function ChatInterface() {
       };
       setMessages((msgs) => [...msgs, systemMessage]);
     } catch (err) {
-      setError("Failed to send task request.");
+      setError(err instanceof Error ? err.message : "Failed to send task request.");
     } finally {
       setIsSending(false);
     }